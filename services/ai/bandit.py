@@ -7,14 +7,71 @@ optimal generation strategies (temperature, candidate count, model).
 Inspired by Chronos SDO's γ-selection mechanism.
 """
 import json
-import random
 import math
-from typing import Dict, List, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Optional
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 
+import numpy as np
 
-@dataclass
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Shared generator: avoids the legacy global RandomState on every draw
+_RNG = np.random.default_rng()
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _simulate_kernel(alpha, beta, means, rounds, seed):
+        """
+        Run Thompson Sampling rounds against Bernoulli arms with known means.
+        
+        Updates alpha/beta in place and returns per-arm selection counts.
+        Seeding here touches Numba's own random state, not NumPy's.
+        """
+        if seed >= 0:
+            np.random.seed(seed)
+        k = alpha.size
+        counts = np.zeros(k, dtype=np.int64)
+        for _ in range(rounds):
+            best = 0
+            best_sample = -1.0
+            for i in range(k):
+                sample = np.random.beta(alpha[i], beta[i])
+                if sample > best_sample:
+                    best_sample = sample
+                    best = i
+            reward = 1.0 if np.random.random() < means[best] else 0.0
+            alpha[best] += reward
+            beta[best] += 1.0 - reward
+            counts[best] += 1
+        return counts
+else:
+    def _simulate_kernel(alpha, beta, means, rounds, seed):
+        """
+        Plain NumPy version of the kernel above.
+        
+        Draws from a seeded Generator, or the shared _RNG, so the global
+        np.random state is left alone.
+        """
+        rng = np.random.default_rng(seed) if seed >= 0 else _RNG
+        counts = np.zeros(alpha.size, dtype=np.int64)
+        for _ in range(rounds):
+            best = int(np.argmax(rng.beta(alpha, beta)))
+            reward = 1.0 if rng.random() < means[best] else 0.0
+            alpha[best] += reward
+            beta[best] += 1.0 - reward
+            counts[best] += 1
+        return counts
+
+
+@dataclass(slots=True)
 class Arm:
     """A bandit arm representing a generation strategy."""
     id: str
@@ -30,9 +87,12 @@ class Arm:
     total_trials: int = 0
     total_reward: float = 0.0
     
+    # Memoized alpha / (alpha + beta); cleared by update()
+    _mean_cache: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    
     def sample(self) -> float:
         """Sample from Beta distribution."""
-        return random.betavariate(self.alpha, self.beta)
+        return float(_RNG.beta(self.alpha, self.beta))
     
     def update(self, reward: float):
         """Update arm with observation. Reward should be in [0, 1]."""
@@ -44,11 +104,15 @@ class Arm:
         self.beta += (1.0 - reward)
         self.total_trials += 1
         self.total_reward += reward
+        self._mean_cache = None
     
     @property
     def mean(self) -> float:
         """Expected value of arm."""
-        return self.alpha / (self.alpha + self.beta)
+        m = self._mean_cache
+        if m is None:
+            m = self._mean_cache = self.alpha / (self.alpha + self.beta)
+        return m
     
     @property
     def ucb(self) -> float:
@@ -58,14 +122,117 @@ class Arm:
         return self.mean + math.sqrt(2 * math.log(self.total_trials + 1) / self.total_trials)
     
     def to_dict(self) -> dict:
-        return asdict(self)
+        data = asdict(self)
+        del data["_mean_cache"]
+        return data
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Arm':
         return cls(**data)
 
 
-@dataclass
+class ArmView:
+    """
+    Live view of one arm held by a ThompsonBandit.
+    
+    The bandit stores arm state as parallel NumPy arrays (structure of
+    arrays); a view reads and writes that state by index and offers the same
+    interface as Arm.
+    """
+    __slots__ = ("_bandit", "_idx")
+    
+    def __init__(self, bandit: "ThompsonBandit", idx: int):
+        self._bandit = bandit
+        self._idx = idx
+    
+    @property
+    def id(self) -> str:
+        return self._bandit._ids[self._idx]
+    
+    @property
+    def temperature(self) -> float:
+        return float(self._bandit._temperature[self._idx])
+    
+    @property
+    def candidate_count(self) -> int:
+        return int(self._bandit._candidate_count[self._idx])
+    
+    @property
+    def model_variant(self) -> str:
+        return self._bandit._model_variant[self._idx]
+    
+    @property
+    def alpha(self) -> float:
+        return float(self._bandit._alpha[self._idx])
+    
+    @alpha.setter
+    def alpha(self, value: float):
+        self._bandit._alpha[self._idx] = value
+        self._bandit._means = None
+    
+    @property
+    def beta(self) -> float:
+        return float(self._bandit._beta[self._idx])
+    
+    @beta.setter
+    def beta(self, value: float):
+        self._bandit._beta[self._idx] = value
+        self._bandit._means = None
+    
+    @property
+    def total_trials(self) -> int:
+        return int(self._bandit._trials[self._idx])
+    
+    @total_trials.setter
+    def total_trials(self, value: int):
+        self._bandit._trials[self._idx] = value
+    
+    @property
+    def total_reward(self) -> float:
+        return float(self._bandit._reward[self._idx])
+    
+    @total_reward.setter
+    def total_reward(self, value: float):
+        self._bandit._reward[self._idx] = value
+    
+    def sample(self) -> float:
+        """Sample from Beta distribution."""
+        return float(_RNG.beta(self._bandit._alpha[self._idx], self._bandit._beta[self._idx]))
+    
+    def update(self, reward: float):
+        """Update arm with observation. Reward should be in [0, 1]."""
+        self._bandit._update_index(self._idx, reward)
+    
+    @property
+    def mean(self) -> float:
+        """Expected value of arm."""
+        return float(self._bandit._get_means()[self._idx])
+    
+    @property
+    def ucb(self) -> float:
+        """Upper confidence bound for exploration."""
+        trials = self.total_trials
+        if trials == 0:
+            return float('inf')
+        return self.mean + math.sqrt(2 * math.log(trials + 1) / trials)
+    
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "temperature": self.temperature,
+            "candidate_count": self.candidate_count,
+            "model_variant": self.model_variant,
+            "alpha": self.alpha,
+            "beta": self.beta,
+            "total_trials": self.total_trials,
+            "total_reward": self.total_reward,
+        }
+    
+    def __repr__(self) -> str:
+        return f"ArmView(id={self.id!r}, alpha={self.alpha}, beta={self.beta})"
+
+
+@dataclass(slots=True)
 class GenerationStats:
     """Tracks generation statistics across sessions."""
     total_generations: int = 0
@@ -146,20 +313,36 @@ class ThompsonBandit:
         Args:
             persistence_path: Optional path to save/load state
         """
-        self.arms: Dict[str, Arm] = {}
         self.stats = GenerationStats()
         self.persistence_path = persistence_path
         
+        # Arm state as parallel arrays (structure of arrays), indexed by position
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._model_variant: List[str] = []
+        self._temperature = np.empty(0, dtype=np.float64)
+        self._candidate_count = np.empty(0, dtype=np.int64)
+        self._alpha = np.empty(0, dtype=np.float64)
+        self._beta = np.empty(0, dtype=np.float64)
+        self._trials = np.empty(0, dtype=np.int64)
+        self._reward = np.empty(0, dtype=np.float64)
+        self._views: Dict[str, ArmView] = {}
+        self._means: Optional[np.ndarray] = None  # Posterior means, cleared on any update
+        
         # Initialize default arms
         for arm_config in self.DEFAULT_ARMS:
-            arm = Arm(**arm_config)
-            self.arms[arm.id] = arm
+            self.add_arm(Arm(**arm_config))
         
         # Load persisted state if available
         if persistence_path:
             self._load()
     
-    def select_arm(self, intent_type: Optional[str] = None) -> Arm:
+    @property
+    def arms(self) -> Mapping[str, ArmView]:
+        """Read-only mapping of arm id to a live view of that arm."""
+        return MappingProxyType(self._views)
+    
+    def select_arm(self, intent_type: Optional[str] = None) -> ArmView:
         """
         Select an arm using Thompson Sampling.
         
@@ -167,31 +350,74 @@ class ThompsonBandit:
             intent_type: Optional hint for intent-aware selection
         
         Returns:
-            Selected Arm with generation parameters
+            Selected arm with generation parameters
         """
-        # Thompson Sampling: sample from each arm's Beta distribution
-        samples = [(arm_id, arm.sample()) for arm_id, arm in self.arms.items()]
+        # Thompson Sampling: one vectorized draw from every arm's Beta distribution
+        samples = _RNG.beta(self._alpha, self._beta)
         
         # Select arm with highest sample
-        best_arm_id = max(samples, key=lambda x: x[1])[0]
-        return self.arms[best_arm_id]
+        return self._views[self._ids[int(samples.argmax())]]
+    
+    def select_arms_batch(self, n: int) -> List[str]:
+        """
+        Draw n independent Thompson Sampling selections in one call.
+        
+        All rounds use the current posteriors, so this suits enumerating
+        several speculative choices before any feedback arrives.
+        
+        Returns:
+            List of n selected arm ids
+        """
+        if n <= 0:
+            return []
+        samples = _RNG.beta(self._alpha, self._beta, size=(n, len(self._ids)))
+        return [self._ids[i] for i in samples.argmax(axis=1)]
     
-    def select_arm_ucb(self, exploration_weight: float = 1.0) -> Arm:
+    def simulate(
+        self,
+        reward_means: Dict[str, float],
+        rounds: int,
+        seed: Optional[int] = None
+    ) -> Dict[str, dict]:
+        """
+        Simulate Thompson Sampling offline for convergence studies and tuning.
+        
+        Starts from the current posteriors but does not modify the bandit.
+        The hot loop is JIT-compiled with Numba when it is installed.
+        
+        Args:
+            reward_means: Success probability per arm id (missing arms get 0)
+            rounds: Number of selection rounds to simulate
+            seed: Optional seed for reproducible runs
+        
+        Returns:
+            Per-arm {"selections", "mean"} after the simulation
+        """
+        alphas = self._alpha.copy()
+        betas = self._beta.copy()
+        means = np.array([reward_means.get(arm_id, 0.0) for arm_id in self._ids], dtype=np.float64)
+        counts = _simulate_kernel(alphas, betas, means, rounds, -1 if seed is None else seed)
+        
+        return {
+            arm_id: {
+                "selections": int(counts[i]),
+                "mean": float(alphas[i] / (alphas[i] + betas[i])),
+            }
+            for i, arm_id in enumerate(self._ids)
+        }
+    
+    def select_arm_ucb(self, exploration_weight: float = 1.0) -> ArmView:
         """
         Select using Upper Confidence Bound (alternative to Thompson).
         Better for initial exploration.
         """
-        def ucb_score(arm: Arm) -> float:
-            if arm.total_trials == 0:
-                return float('inf')  # Prioritize unexplored
-            exploitation = arm.mean
-            exploration = exploration_weight * math.sqrt(
-                2 * math.log(sum(a.total_trials for a in self.arms.values()) + 1) 
-                / arm.total_trials
-            )
-            return exploitation + exploration
-        
-        return max(self.arms.values(), key=ucb_score)
+        trials = self._trials
+        means = self._get_means()
+        log_total = math.log(int(trials.sum()) + 1)
+        with np.errstate(divide="ignore"):
+            exploration = exploration_weight * np.sqrt(2 * log_total / trials)
+        scores = np.where(trials == 0, np.inf, means + exploration)  # Prioritize unexplored
+        return self._views[self._ids[int(scores.argmax())]]
     
     def update(self, arm_id: str, reward: float, intent_type: str = "unknown"):
         """
@@ -202,33 +428,73 @@ class ThompsonBandit:
             reward: Reward signal in [0, 1], typically confidence * verified
             intent_type: Type of intent for stats tracking
         """
-        if arm_id not in self.arms:
+        idx = self._index.get(arm_id)
+        if idx is None:
             return
         
-        self.arms[arm_id].update(reward)
+        self._update_index(idx, reward)
         self.stats.record_generation(intent_type, reward > 0.5, reward)
         
         # Persist if enabled
         if self.persistence_path:
             self._save()
     
+    def _update_index(self, idx: int, reward: float):
+        """Beta-Bernoulli update of the arm at idx with a reward clamped to [0, 1]."""
+        reward = max(0.0, min(1.0, reward))
+        self._alpha[idx] += reward
+        self._beta[idx] += 1.0 - reward
+        self._trials[idx] += 1
+        self._reward[idx] += reward
+        self._means = None
+    
+    def _get_means(self) -> np.ndarray:
+        """Posterior mean of every arm, recomputed only after an update."""
+        means = self._means
+        if means is None:
+            means = self._means = self._alpha / (self._alpha + self._beta)
+        return means
+    
     def get_arm_stats(self) -> List[dict]:
-        """Get statistics for all arms."""
+        """Get statistics for all arms, best mean first."""
+        means = self._get_means()
+        order = np.argsort(-means, kind="stable")
         return [
             {
-                "id": arm.id,
-                "temperature": arm.temperature,
-                "candidate_count": arm.candidate_count,
-                "trials": arm.total_trials,
-                "mean": round(arm.mean, 3),
-                "total_reward": round(arm.total_reward, 2),
+                "id": self._ids[i],
+                "temperature": float(self._temperature[i]),
+                "candidate_count": int(self._candidate_count[i]),
+                "trials": int(self._trials[i]),
+                "mean": round(float(means[i]), 3),
+                "total_reward": round(float(self._reward[i]), 2),
             }
-            for arm in sorted(self.arms.values(), key=lambda a: a.mean, reverse=True)
+            for i in order
         ]
     
     def add_arm(self, arm: Arm):
-        """Add a new arm to the bandit."""
-        self.arms[arm.id] = arm
+        """Add a new arm to the bandit, replacing any arm with the same id."""
+        idx = self._index.get(arm.id)
+        if idx is None:
+            idx = len(self._ids)
+            self._ids.append(arm.id)
+            self._index[arm.id] = idx
+            self._model_variant.append(arm.model_variant)
+            self._temperature = np.append(self._temperature, arm.temperature)
+            self._candidate_count = np.append(self._candidate_count, arm.candidate_count)
+            self._alpha = np.append(self._alpha, arm.alpha)
+            self._beta = np.append(self._beta, arm.beta)
+            self._trials = np.append(self._trials, arm.total_trials)
+            self._reward = np.append(self._reward, arm.total_reward)
+            self._views[arm.id] = ArmView(self, idx)
+        else:
+            self._model_variant[idx] = arm.model_variant
+            self._temperature[idx] = arm.temperature
+            self._candidate_count[idx] = arm.candidate_count
+            self._alpha[idx] = arm.alpha
+            self._beta[idx] = arm.beta
+            self._trials[idx] = arm.total_trials
+            self._reward[idx] = arm.total_reward
+        self._means = None
     
     def _save(self):
         """Persist state to disk."""
@@ -236,7 +502,7 @@ class ThompsonBandit:
             return
         
         state = {
-            "arms": {k: v.to_dict() for k, v in self.arms.items()},
+            "arms": {k: v.to_dict() for k, v in self._views.items()},
             "stats": asdict(self.stats)
         }
         
@@ -258,8 +524,8 @@ class ThompsonBandit:
                 state = json.load(f)
             
             # Restore arms
-            for arm_id, arm_data in state.get("arms", {}).items():
-                self.arms[arm_id] = Arm.from_dict(arm_data)
+            for arm_data in state.get("arms", {}).values():
+                self.add_arm(Arm.from_dict(arm_data))
             
             # Restore stats
             stats_data = state.get("stats", {})
@@ -7,15 +7,33 @@ Ported from UACP's gateway/internal/cache/semantic.go
 Reduces API costs by caching similar intents and their generated code.
 """
 import hashlib
-import math
 import asyncio
 import time
+from collections import OrderedDict
+from itertools import islice
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from threading import Lock, Thread
 import json
 
+import numpy as np
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+# backend="auto" switches to the HNSW index above this many entries; below
+# it the exact matmul scan is cheaper than graph traversal
+HNSW_MIN_SIZE = 1024
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF = 64
+HNSW_CANDIDATES = 8  # Neighbours checked for a same-model, unexpired entry
+
 
 @dataclass
 class CacheEntry:
@@ -24,6 +42,8 @@ class CacheEntry:
     query: str  # Original intent
     response: str  # Generated code
     model: str
+    # Left empty by SemanticCache.set: the vector lives only in the cache's
+    # embedding index, so the entry doesn't pin a Python list of floats
     embedding: List[float] = field(default_factory=list)
     hit_count: int = 0
     created_at: float = field(default_factory=time.time)
@@ -63,14 +83,172 @@ def _cosine_similarity(a: List[float], b: List[float]) -> float:
     if len(a) != len(b) or len(a) == 0:
         return 0.0
     
-    dot_product = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    norm_a = np.linalg.norm(a)
+    norm_b = np.linalg.norm(b)
     
     if norm_a == 0 or norm_b == 0:
         return 0.0
     
-    return dot_product / (norm_a * norm_b)
+    return float(a @ b / (norm_a * norm_b))
+
+
+def _normalized(embedding: List[float]) -> Optional[np.ndarray]:
+    """Unit-length float32 copy of an embedding, or None for a zero vector."""
+    vector = np.array(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return None
+    vector /= norm
+    return vector
+
+
+def _quantize_int8(vector: np.ndarray) -> tuple:
+    """Symmetric int8 quantization: returns (codes, scale) with vector ~= codes * scale."""
+    max_abs = float(np.max(np.abs(vector)))
+    scale = max_abs / 127.0
+    codes = np.round(np.clip(vector / max_abs, -1.0, 1.0) * 127.0).astype(np.int8)
+    return codes, scale
+
+
+class _EmbeddingIndex:
+    """
+    Unit-length embeddings of one dimension, searchable by dot product.
+    
+    Row i of _matrix holds the embedding of _slot_keys[i]; freed rows are
+    zeroed and reused. Capacity doubles as needed. With precision="int8"
+    rows are stored as int8 codes with a per-row scale in _scales, a quarter
+    of the fp32 footprint. With backend="hnsw" the vectors live in an
+    approximate nearest neighbour graph (_ann) labelled by slot instead,
+    and _matrix is unused. Callers hold the cache lock.
+    """
+    
+    def __init__(self, dim: int, precision: str, backend: str, max_size: int):
+        self.dim = dim
+        self.precision = precision
+        self.backend = backend
+        self.max_size = max_size
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._ann = None
+        self._slot_keys: List[Optional[str]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self.reset()
+    
+    def __len__(self) -> int:
+        return len(self._slot_of)
+    
+    def reset(self):
+        """Drop every vector, keeping the matrix buffers allocated for reuse."""
+        if self.backend == "hnsw":
+            self._ann = hnswlib.Index(space="cosine", dim=self.dim)
+            self._ann.init_index(
+                max_elements=self.max_size, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M
+            )
+            self._ann.set_ef(HNSW_EF)
+        elif self._matrix is None:
+            int8 = self.precision == "int8"
+            self._matrix = np.zeros((16, self.dim), dtype=np.int8 if int8 else np.float32)
+            if int8:
+                self._scales = np.zeros(16, dtype=np.float32)
+        else:
+            used = len(self._slot_keys)
+            self._matrix[:used] = 0
+            if self._scales is not None:
+                self._scales[:used] = 0
+        self._slot_keys.clear()
+        self._slot_of.clear()
+        self._free_slots.clear()
+    
+    def add(self, key: str, vector: np.ndarray):
+        """Index a unit-length vector under key."""
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_keys[slot] = key
+        else:
+            slot = len(self._slot_keys)
+            if self._matrix is not None and slot == len(self._matrix):
+                grown = np.zeros((2 * slot, self.dim), dtype=self._matrix.dtype)
+                grown[:slot] = self._matrix
+                self._matrix = grown
+                if self._scales is not None:
+                    scales = np.zeros(2 * slot, dtype=np.float32)
+                    scales[:slot] = self._scales
+                    self._scales = scales
+            self._slot_keys.append(key)
+        if self._ann is not None:
+            # Re-adding a freed slot's label overwrites and undeletes it
+            self._ann.add_items(vector[np.newaxis, :], np.array([slot]))
+        elif self._scales is not None:
+            self._matrix[slot], self._scales[slot] = _quantize_int8(vector)
+        else:
+            self._matrix[slot] = vector
+        self._slot_of[key] = slot
+    
+    def remove(self, key: str) -> bool:
+        """Free key's slot; False if key is not in this index."""
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return False
+        if self._ann is not None:
+            self._ann.mark_deleted(slot)
+        else:
+            self._matrix[slot] = 0
+        self._slot_keys[slot] = None
+        self._free_slots.append(slot)
+        return True
+    
+    def best_match(
+        self,
+        query: np.ndarray,
+        model: str,
+        entries: Dict[str, "CacheEntry"],
+        threshold: float
+    ) -> Optional["CacheEntry"]:
+        """Most similar live entry for model at or above threshold."""
+        if self._ann is not None:
+            return self._best_ann_match(query, model, entries, threshold)
+        
+        count = len(self._slot_keys)
+        if self._scales is not None:
+            # numpy has no int8 GEMV; accumulate the codes in int32, then rescale
+            codes, scale = _quantize_int8(query)
+            dots = self._matrix[:count] @ codes.astype(np.int32)
+            scores = dots * (self._scales[:count] * scale)
+        else:
+            scores = self._matrix[:count] @ query
+        # Freed rows are zero, so requiring a positive score also skips them
+        candidates = np.flatnonzero((scores >= threshold) & (scores > 0))
+        # Best first; skip rows for other models or expired entries
+        for slot in candidates[np.argsort(-scores[candidates], kind="stable")]:
+            entry = entries[self._slot_keys[slot]]
+            if entry.model == model and not entry.is_expired:
+                return entry
+        return None
+    
+    def _best_ann_match(
+        self,
+        query: np.ndarray,
+        model: str,
+        entries: Dict[str, "CacheEntry"],
+        threshold: float
+    ) -> Optional["CacheEntry"]:
+        """HNSW variant of best_match: check the nearest few neighbours."""
+        live = len(self._slot_of)
+        if not live:
+            return None
+        
+        labels, distances = self._ann.knn_query(query, k=min(HNSW_CANDIDATES, live))
+        for slot, distance in zip(labels[0], distances[0]):
+            # Cosine distance, nearest first
+            if 1.0 - distance < threshold:
+                break
+            entry = entries[self._slot_keys[slot]]
+            if entry.model == model and not entry.is_expired:
+                return entry
+        return None
 
 
 class SemanticCache:
@@ -79,7 +257,8 @@ class SemanticCache:
     
     Features:
     - Exact match lookup by key
-    - Semantic similarity search for near-misses
+    - Semantic similarity search for near-misses (one matrix-vector
+      product over L2-normalized embeddings, so cosine is a dot product)
     - TTL-based expiration
     - LRU eviction when at capacity
     - Background cleanup thread
@@ -102,14 +281,37 @@ class SemanticCache:
         max_size: int = 1000,
         default_ttl_seconds: int = 3600,
         similarity_threshold: float = 0.92,
-        enable_cleanup: bool = True
+        enable_cleanup: bool = True,
+        cache_precision: str = "fp32",
+        backend: str = "auto"
     ):
-        self.entries: Dict[str, CacheEntry] = {}
+        # Kept in LRU order (least recently used first)
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
         self.max_size = max_size
         self.default_ttl = default_ttl_seconds
         self.similarity_threshold = similarity_threshold
         self._lock = Lock()
         
+        if cache_precision not in ("fp32", "int8"):
+            raise ValueError(f"Unknown cache_precision: {cache_precision}")
+        self.cache_precision = cache_precision
+        
+        if backend not in ("auto", "matmul", "hnsw"):
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == "hnsw":
+            if not HNSWLIB_AVAILABLE:
+                raise ImportError("backend='hnsw' requires hnswlib")
+            if cache_precision != "fp32":
+                raise ValueError("backend='hnsw' only supports cache_precision='fp32'")
+        elif backend == "auto":
+            use_hnsw = HNSWLIB_AVAILABLE and cache_precision == "fp32" and max_size > HNSW_MIN_SIZE
+            backend = "hnsw" if use_hnsw else "matmul"
+        self.backend = backend
+        
+        # One embedding index per dimension; a query is only ever similar to
+        # entries of its own dimension (see _cosine_similarity)
+        self._indexes: Dict[int, _EmbeddingIndex] = {}
+        
         # Stats
         self._hits = 0
         self._misses = 0
@@ -138,6 +340,8 @@ class SemanticCache:
             CacheEntry if found, None otherwise
         """
         key = _generate_key(query, model)
+        # Normalize outside the lock; stored rows are already unit length
+        query_vector = _normalized(embedding) if embedding else None
         
         with self._lock:
             # Exact match
@@ -145,29 +349,19 @@ class SemanticCache:
                 entry = self.entries[key]
                 if not entry.is_expired:
                     entry.touch()
+                    self.entries.move_to_end(key)
                     self._hits += 1
                     return entry
                 else:
-                    del self.entries[key]
+                    self._remove(key)
             
             # Semantic similarity search (if embedding provided)
-            if embedding and len(embedding) > 0:
-                best_match: Optional[CacheEntry] = None
-                best_score = 0.0
-                
-                for entry in self.entries.values():
-                    if entry.is_expired or not entry.embedding:
-                        continue
-                    if entry.model != model:
-                        continue
-                    
-                    score = _cosine_similarity(embedding, entry.embedding)
-                    if score > best_score and score >= self.similarity_threshold:
-                        best_score = score
-                        best_match = entry
+            if query_vector is not None:
+                best_match = self._best_semantic_match(query_vector, model)
                 
                 if best_match:
                     best_match.touch()
+                    self.entries.move_to_end(best_match.key)
                     self._semantic_hits += 1
                     self._hits += 1
                     return best_match
@@ -196,16 +390,21 @@ class SemanticCache:
             query=query,
             response=response,
             model=model,
-            embedding=embedding or [],
             ttl_seconds=ttl_seconds or self.default_ttl
         )
+        vector = _normalized(embedding) if embedding else None
         
         with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            
             # Evict if at capacity
             while len(self.entries) >= self.max_size:
                 self._evict_one()
             
             self.entries[key] = entry
+            if vector is not None:
+                self._index(key, vector)
         
         return key
     
@@ -213,14 +412,16 @@ class SemanticCache:
         """Delete a specific entry."""
         with self._lock:
             if key in self.entries:
-                del self.entries[key]
+                self._remove(key)
                 return True
             return False
     
     def clear(self):
-        """Clear all entries."""
+        """Clear all entries, keeping the index buffers allocated for reuse."""
         with self._lock:
             self.entries.clear()
+            for index in self._indexes.values():
+                index.reset()
             self._hits = 0
             self._misses = 0
             self._semantic_hits = 0
@@ -244,23 +445,40 @@ class SemanticCache:
     def list_entries(self, limit: int = 20) -> List[dict]:
         """List recent cache entries."""
         with self._lock:
-            sorted_entries = sorted(
-                self.entries.values(),
-                key=lambda e: e.last_access,
-                reverse=True
-            )
-            return [e.to_dict() for e in sorted_entries[:limit]]
+            return [e.to_dict() for e in islice(reversed(self.entries.values()), limit)]
     
     def _evict_one(self):
         """Evict the least recently used entry (must hold lock)."""
         if not self.entries:
             return
         
-        oldest_key = min(
-            self.entries.keys(),
-            key=lambda k: self.entries[k].last_access
-        )
-        del self.entries[oldest_key]
+        self._remove(next(iter(self.entries)))
+    
+    def _remove(self, key: str):
+        """Drop an entry and free its embedding row (must hold lock)."""
+        del self.entries[key]
+        for dim, index in self._indexes.items():
+            if index.remove(key):
+                if not index:
+                    # Nothing of this dimension is cached any more
+                    del self._indexes[dim]
+                break
+    
+    def _index(self, key: str, vector: np.ndarray):
+        """Index an entry's unit-length embedding under its key (must hold lock)."""
+        index = self._indexes.get(len(vector))
+        if index is None:
+            index = self._indexes[len(vector)] = _EmbeddingIndex(
+                len(vector), self.cache_precision, self.backend, self.max_size
+            )
+        index.add(key, vector)
+    
+    def _best_semantic_match(self, query: np.ndarray, model: str) -> Optional[CacheEntry]:
+        """Most similar live entry for model at or above the threshold (must hold lock)."""
+        index = self._indexes.get(len(query))
+        if index is None:
+            return None
+        return index.best_match(query, model, self.entries, self.similarity_threshold)
     
     def _cleanup_loop(self):
         """Background thread for cleaning expired entries."""
@@ -276,7 +494,7 @@ class SemanticCache:
                 if entry.is_expired
             ]
             for key in expired:
-                del self.entries[key]
+                self._remove(key)
     
     def to_json(self) -> str:
         """Serialize cache for debugging."""
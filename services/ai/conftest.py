@@ -0,0 +1,88 @@
+"""
+Root pytest configuration for AXIOM AI Services.
+
+Fixtures shared by the suites under tests/ live in tests/conftest.py.
+"""
+import asyncio
+import os
+
+import pytest
+
+# Integration tests that build their own candidates can run without live
+# LLM calls; tests that truly need a provider still skip without an API key
+os.environ.setdefault("AXIOM_TEST_MOCK", "1")
+
+# Run async tests on uvloop (shipped with uvicorn[standard]) like the services do
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """Keep tests without an xdist_group on their file's worker under --dist=loadgroup.
+
+    Explicit groups (e.g. the per-class groups in test_phase3.py) spread one file
+    across workers; everything else keeps the old loadfile behaviour so
+    module-scoped fixtures and event loops are built once per file.
+    """
+    for item in items:
+        if item.get_closest_marker("xdist_group") is None:
+            item.add_marker(pytest.mark.xdist_group(name=item.location[0]))
+
+
+class _Context:
+    """Async context manager yielding a fixed value."""
+    
+    def __init__(self, value=None):
+        self.value = value
+    
+    async def __aenter__(self):
+        return self.value
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _FakeConn:
+    """Just enough of asyncpg.Connection for the event store: canned results, recorded writes."""
+    
+    def __init__(self):
+        self.rows = []
+        self.row = {"max_seq": 0}
+        self.executed = []
+        self.copies = []
+    
+    async def execute(self, query, *args):
+        self.executed.append((query, args))
+        return "OK"
+    
+    async def fetch(self, query, *args):
+        return self.rows
+    
+    async def fetchrow(self, query, *args):
+        return self.row
+    
+    async def copy_records_to_table(self, table_name, *, records, columns=None):
+        self.copies.append((table_name, list(records), columns))
+    
+    def transaction(self):
+        return _Context()
+
+
+class _FakePool:
+    """Pool handing out one shared _FakeConn."""
+    
+    def __init__(self, conn):
+        self.conn = conn
+    
+    def acquire(self):
+        return _Context(self.conn)
+
+
+@pytest.fixture
+def mock_pool():
+    """Fake asyncpg pool; tests set ``mock_pool.conn.rows`` / ``.row`` and inspect ``.copies``."""
+    return _FakePool(_FakeConn())
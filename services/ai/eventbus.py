@@ -10,13 +10,13 @@ Streams:
 - METRICS: Performance metrics with 24-hour retention
 """
 import os
-import json
 import asyncio
-from typing import Optional, Dict, Any, List, Callable, Awaitable
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import nats
+import orjson
 from nats.js.api import StreamConfig, ConsumerConfig, AckPolicy, DeliverPolicy, RetentionPolicy
 from nats.errors import ConnectionClosedError, TimeoutError, NoRespondersError
 
@@ -94,6 +94,10 @@ class JetStreamEventBus:
         self._nc: Optional[nats.NATS] = None
         self._js = None
         self._subscriptions = []
+        
+        # Fire-and-forget publishes awaiting their JetStream ack
+        self._pending_publishes: set = set()
+        self.max_pending_publishes = 1024
     
     async def connect(self) -> bool:
         """Connect to NATS and initialize JetStream."""
@@ -137,7 +141,7 @@ class JetStreamEventBus:
     async def publish(
         self,
         subject: str,
-        data: Dict[str, Any],
+        data: Union[Dict[str, Any], bytes],
         headers: Optional[Dict[str, str]] = None
     ) -> Optional[str]:
         """
@@ -145,7 +149,7 @@ class JetStreamEventBus:
         
         Args:
             subject: Subject to publish to (e.g., "gen.created", "audit.ivcu")
-            data: Message payload as dict
+            data: Message payload as a dict or a pre-encoded JSON object
             headers: Optional headers
             
         Returns:
@@ -156,11 +160,7 @@ class JetStreamEventBus:
             return None
         
         try:
-            payload = json.dumps({
-                **data,
-                "_timestamp": datetime.utcnow().isoformat(),
-                "_subject": subject
-            }).encode()
+            payload = self._encode(subject, data)
             
             ack = await self._js.publish(subject, payload, headers=headers)
             return str(ack.seq)
@@ -169,6 +169,58 @@ class JetStreamEventBus:
             print(f"Failed to publish to {subject}: {e}")
             return None
     
+    def publish_nowait(
+        self,
+        subject: str,
+        data: Union[Dict[str, Any], bytes],
+        headers: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Publish without waiting for the JetStream ack.
+        
+        The publish runs in the background; failures are logged. Payloads
+        are encoded exactly as in publish().
+        
+        Returns:
+            False if not connected or too many publishes are already in
+            flight, in which case the caller should fall back to publish()
+        """
+        if not self._js or len(self._pending_publishes) >= self.max_pending_publishes:
+            return False
+        
+        payload = self._encode(subject, data)
+        task = asyncio.ensure_future(self._js.publish(subject, payload, headers=headers))
+        self._pending_publishes.add(task)
+        
+        def _done(t: asyncio.Future):
+            self._pending_publishes.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                print(f"Failed to publish to {subject}: {t.exception()}")
+        
+        task.add_done_callback(_done)
+        return True
+    
+    @staticmethod
+    def _encode(subject: str, data: Union[Dict[str, Any], bytes]) -> bytes:
+        """
+        Serialize a payload with the standard envelope fields.
+        
+        A pre-encoded JSON object (e.g. SDO.to_json_bytes()) gets the same
+        fields spliced in before its closing brace, so it is not re-encoded.
+        """
+        envelope = {
+            "_timestamp": datetime.utcnow().isoformat(),
+            "_subject": subject
+        }
+        if not isinstance(data, bytes):
+            return orjson.dumps({**data, **envelope})
+        body = data.rstrip()
+        if not (body.startswith(b"{") and body.endswith(b"}")):
+            raise ValueError("Pre-encoded payload must be a JSON object")
+        body = body[:-1].rstrip()
+        separator = b"" if body == b"{" else b","
+        return body + separator + orjson.dumps(envelope)[1:]
+    
     async def subscribe(
         self,
         subject: str,
@@ -197,7 +249,7 @@ class JetStreamEventBus:
         
         async def message_handler(msg):
             try:
-                data = json.loads(msg.data.decode())
+                data = orjson.loads(msg.data)
                 await callback(data)
                 await msg.ack()
             except Exception as e:
@@ -267,7 +319,7 @@ class JetStreamEventBus:
             try:
                 fetched = await sub.fetch(limit, timeout=5)
                 for msg in fetched:
-                    data = json.loads(msg.data.decode())
+                    data = orjson.loads(msg.data)
                     messages.append({
                         **data,
                         "_seq": msg.metadata.sequence.stream,
@@ -399,7 +451,7 @@ async def close_nats():
 async def publish(subject: str, payload: bytes):
     """Publish a message to NATS (legacy interface)."""
     bus = await get_event_bus()
-    data = json.loads(payload.decode()) if isinstance(payload, bytes) else payload
+    data = orjson.loads(payload) if isinstance(payload, bytes) else payload
     await bus.publish(subject, data)
 
 
@@ -408,7 +460,7 @@ async def subscribe(subject: str, cb):
     bus = await get_event_bus()
     # Wrap callback to match old interface
     async def wrapper(msg):
-        await cb(type('Msg', (), {'subject': msg.get('_subject'), 'data': json.dumps(msg).encode()})())
+        await cb(type('Msg', (), {'subject': msg.get('_subject'), 'data': orjson.dumps(msg)})())
     await bus.subscribe(
         subject,
         StreamName.GENERATIONS,
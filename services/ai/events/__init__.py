@@ -1,10 +1,11 @@
-from .model import IVCUEvent, IVCUState, EventType
+from .model import IVCUEvent, IVCUState, EventType, project_many
 from .store import IVCUEventStore, get_event_store
 
 __all__ = [
     "IVCUEvent",
     "IVCUState",
     "EventType",
+    "project_many",
     "IVCUEventStore",
     "get_event_store"
 ]
@@ -3,12 +3,16 @@ IVCU Event Models
 
 Defines the events and state projections for the Event Sourcing system.
 """
+import time
 import uuid
-import json
 from enum import Enum
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
+from itertools import groupby
+from operator import attrgetter
+
+import orjson
 
 class EventType(str, Enum):
     """IVCU Event Types per Architecture v2.0"""
@@ -24,6 +28,42 @@ class EventType(str, Enum):
     COST_INCURRED = "cost_incurred"
 
 
+# Event type by stored value, for decoding rows without an Enum call each
+_EVENT_TYPES: Dict[str, EventType] = {event_type.value: event_type for event_type in EventType}
+
+
+# Event timestamps are integer microseconds since the Unix epoch (UTC); they
+# become datetimes only at the API and database boundaries
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def now_us() -> int:
+    """Current time in epoch microseconds."""
+    return time.time_ns() // 1000
+
+
+def us_to_datetime(timestamp_us: int) -> datetime:
+    """Convert epoch microseconds to an aware UTC datetime."""
+    return _EPOCH + timedelta(microseconds=timestamp_us)
+
+
+def decode_event_data(value: Any) -> Dict[str, Any]:
+    """
+    Decode an event_data column value.
+    
+    asyncpg hands JSONB back as text unless a codec is registered on the
+    pool; orjson parses it in C. Already-decoded values pass through.
+    """
+    if isinstance(value, (str, bytes)):
+        return orjson.loads(value)
+    return value
+
+
+def encode_event_data(event_data: Dict[str, Any]) -> str:
+    """Encode event_data as JSON text for a JSONB parameter or COPY record."""
+    return orjson.dumps(event_data).decode()
+
+
 @dataclass
 class IVCUEvent:
     """
@@ -35,7 +75,7 @@ class IVCUEvent:
     sequence_number: int
     event_type: EventType
     event_data: Dict[str, Any]
-    timestamp: datetime
+    timestamp: int  # epoch microseconds
     actor_id: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
@@ -45,22 +85,40 @@ class IVCUEvent:
             "sequence_number": self.sequence_number,
             "event_type": self.event_type.value if isinstance(self.event_type, EventType) else self.event_type,
             "event_data": self.event_data,
-            "timestamp": self.timestamp.isoformat() if isinstance(self.timestamp, datetime) else self.timestamp,
+            "timestamp": us_to_datetime(self.timestamp).isoformat(),
             "actor_id": self.actor_id
         }
     
     @classmethod
     def from_row(cls, row: Any) -> 'IVCUEvent':
-        """Create event from database row (asyncpg Record)."""
-        return cls(
-            id=str(row['id']),
-            ivcu_id=str(row['ivcu_id']),
-            sequence_number=row['sequence_number'],
-            event_type=EventType(row['event_type']),
-            event_data=json.loads(row['event_data']) if isinstance(row['event_data'], str) else row['event_data'],
-            timestamp=row['timestamp'],
-            actor_id=str(row['actor_id']) if row['actor_id'] else None
-        )
+        """Create event from database row (asyncpg Record, timestamp in epoch microseconds)."""
+        return cls.from_rows([row])[0]
+    
+    @classmethod
+    def from_rows(cls, rows: List[Any]) -> List['IVCUEvent']:
+        """
+        Create events from database rows in one tight pass.
+        
+        Replays fetch whole streams, so this skips the per-event __init__
+        call and Enum lookup by filling each instance's __dict__ directly.
+        """
+        new = object.__new__
+        event_types = _EVENT_TYPES
+        events = []
+        for row in rows:
+            event = new(cls)
+            actor_id = row['actor_id']
+            event.__dict__.update(
+                id=str(row['id']),
+                ivcu_id=str(row['ivcu_id']),
+                sequence_number=row['sequence_number'],
+                event_type=event_types[row['event_type']],
+                event_data=decode_event_data(row['event_data']),
+                timestamp=row['timestamp'],
+                actor_id=str(actor_id) if actor_id else None
+            )
+            events.append(event)
+        return events
 
 
 @dataclass
@@ -82,18 +140,36 @@ class IVCUState:
     proof_certificate: Optional[Dict[str, Any]] = None
     status: str = "draft"
     total_cost: float = 0.0
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    created_at: Optional[int] = None  # epoch microseconds
+    updated_at: Optional[int] = None  # epoch microseconds
+    # Candidate id -> positions in candidates, built by the first verification
+    # of an apply_events run and kept current for the rest of that run only
+    _candidate_positions: Optional[Dict[Any, List[int]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def apply_event(self, event: IVCUEvent) -> 'IVCUState':
         """Apply an event to produce new state. Immutable - returns new state."""
+        return self.apply_events([event])
+    
+    def apply_events(self, events: List[IVCUEvent]) -> 'IVCUState':
+        """
+        Apply a run of events to produce new state. Immutable - returns new state.
+        
+        The state is copied once for the whole run and then updated in place,
+        instead of being copied again for every event. The copy is shallow:
+        candidate dicts are shared with the source state and handlers replace
+        a candidate rather than mutating it, so cached snapshots stay cheap.
+        Handlers never read version or updated_at, so both are advanced once
+        for the whole run.
+        """
         new_state = IVCUState(
             id=self.id,
-            version=self.version + 1,
+            version=self.version,
             raw_intent=self.raw_intent,
             parsed_intent=self.parsed_intent,
             contracts=self.contracts.copy(),
-            candidates=[c.copy() for c in self.candidates], # Deepish copy
+            candidates=self.candidates.copy(),
             selected_candidate_id=self.selected_candidate_id,
             code=self.code,
             language=self.language,
@@ -103,61 +179,118 @@ class IVCUState:
             status=self.status,
             total_cost=self.total_cost,
             created_at=self.created_at,
-            updated_at=event.timestamp
+            updated_at=self.updated_at
         )
-        
-        data = event.event_data
-        
-        if event.event_type == EventType.INTENT_CREATED:
-            new_state.raw_intent = data.get("raw_intent")
-            new_state.parsed_intent = data.get("parsed_intent")
-            new_state.language = data.get("language", "python")
-            new_state.status = "draft"
-            new_state.created_at = event.timestamp
-            
-        elif event.event_type == EventType.CONTRACT_ADDED:
-            contract = data.get("contract", {})
-            new_state.contracts.append(contract)
-            
-        elif event.event_type == EventType.CANDIDATE_GENERATED:
-            candidate = {
-                "id": data.get("candidate_id"),
-                "code": data.get("code"),
-                "confidence": data.get("confidence", 0.0),
-                "model_id": data.get("model_id"),
-                "reasoning": data.get("reasoning"),
-                "verification_passed": False,
-                "verification_score": 0.0
-            }
-            new_state.candidates.append(candidate)
-            new_state.status = "generating"
-            
-        elif event.event_type == EventType.VERIFICATION_COMPLETED:
-            candidate_id = data.get("candidate_id")
-            for cand in new_state.candidates:
-                if cand.get("id") == candidate_id:
-                    cand["verification_passed"] = data.get("passed", False)
-                    cand["verification_score"] = data.get("score", 0.0)
-                    cand["verification_result"] = data.get("results")
-            new_state.status = "verifying"
-            
-        elif event.event_type == EventType.CANDIDATE_SELECTED:
-            new_state.selected_candidate_id = data.get("candidate_id")
-            new_state.code = data.get("code")
-            new_state.confidence = data.get("confidence", 0.0)
-            new_state.verification_result = data.get("verification_result")
-            new_state.status = "verified"
-            
-        elif event.event_type == EventType.INTENT_REFINED:
-            new_state.raw_intent = data.get("new_intent", new_state.raw_intent)
-            new_state.parsed_intent = data.get("new_parsed_intent", new_state.parsed_intent)
-            if data.get("clear_candidates", False):
-                new_state.candidates = []
-                new_state.selected_candidate_id = None
-                new_state.code = None
-                new_state.status = "draft"
-        
-        elif event.event_type == EventType.COST_INCURRED:
-            new_state.total_cost += data.get("amount", 0.0)
-            
+        for event in events:
+            new_state._apply(event)
+        if events:
+            new_state.version += len(events)
+            new_state.updated_at = events[-1].timestamp
         return new_state
+    
+    def _apply(self, event: IVCUEvent):
+        """Apply one event's handler in place; only called on a private copy."""
+        handler = _EVENT_HANDLERS.get(event.event_type)
+        if handler is not None:
+            handler(self, event.event_data, event)
+    
+    def _on_intent_created(self, data: Dict[str, Any], event: IVCUEvent):
+        self.raw_intent = data.get("raw_intent")
+        self.parsed_intent = data.get("parsed_intent")
+        self.language = data.get("language", "python")
+        self.status = "draft"
+        self.created_at = event.timestamp
+    
+    def _on_contract_added(self, data: Dict[str, Any], event: IVCUEvent):
+        contract = data.get("contract", {})
+        self.contracts.append(contract)
+    
+    def _on_candidate_generated(self, data: Dict[str, Any], event: IVCUEvent):
+        candidate = {
+            "id": data.get("candidate_id"),
+            "code": data.get("code"),
+            "confidence": data.get("confidence", 0.0),
+            "model_id": data.get("model_id"),
+            "reasoning": data.get("reasoning"),
+            "verification_passed": False,
+            "verification_score": 0.0
+        }
+        self.candidates.append(candidate)
+        if self._candidate_positions is not None:
+            self._candidate_positions.setdefault(candidate["id"], []).append(len(self.candidates) - 1)
+        self.status = "generating"
+    
+    def _on_verification_completed(self, data: Dict[str, Any], event: IVCUEvent):
+        candidate_id = data.get("candidate_id")
+        candidates = self.candidates
+        positions = self._candidate_positions
+        if positions is None:
+            # One scan per run instead of one per verification event
+            positions = self._candidate_positions = {}
+            for i, cand in enumerate(candidates):
+                positions.setdefault(cand.get("id"), []).append(i)
+        for i in positions.get(candidate_id, ()):
+            # Copy-on-write: the old dict may belong to a snapshot
+            candidates[i] = {
+                **candidates[i],
+                "verification_passed": data.get("passed", False),
+                "verification_score": data.get("score", 0.0),
+                "verification_result": data.get("results")
+            }
+        self.status = "verifying"
+    
+    def _on_candidate_selected(self, data: Dict[str, Any], event: IVCUEvent):
+        self.selected_candidate_id = data.get("candidate_id")
+        self.code = data.get("code")
+        self.confidence = data.get("confidence", 0.0)
+        self.verification_result = data.get("verification_result")
+        self.status = "verified"
+    
+    def _on_intent_refined(self, data: Dict[str, Any], event: IVCUEvent):
+        self.raw_intent = data.get("new_intent", self.raw_intent)
+        self.parsed_intent = data.get("new_parsed_intent", self.parsed_intent)
+        if data.get("clear_candidates", False):
+            self.candidates = []
+            self._candidate_positions = None
+            self.selected_candidate_id = None
+            self.code = None
+            self.status = "draft"
+    
+    def _on_cost_incurred(self, data: Dict[str, Any], event: IVCUEvent):
+        self.total_cost += data.get("amount", 0.0)
+
+
+# Projection handlers by event type; types without one only bump the version.
+# EventType is a str Enum, so raw value strings find the same entries.
+_EVENT_HANDLERS: Dict[EventType, Callable[[IVCUState, Dict[str, Any], IVCUEvent], None]] = {
+    EventType.INTENT_CREATED: IVCUState._on_intent_created,
+    EventType.CONTRACT_ADDED: IVCUState._on_contract_added,
+    EventType.CANDIDATE_GENERATED: IVCUState._on_candidate_generated,
+    EventType.VERIFICATION_COMPLETED: IVCUState._on_verification_completed,
+    EventType.CANDIDATE_SELECTED: IVCUState._on_candidate_selected,
+    EventType.INTENT_REFINED: IVCUState._on_intent_refined,
+    EventType.COST_INCURRED: IVCUState._on_cost_incurred,
+}
+
+# Group key for project_many; C-level instead of a lambda per event
+_IVCU_ID = attrgetter("ivcu_id")
+
+
+def project_many(
+    events: List[IVCUEvent],
+    states: Optional[Dict[str, IVCUState]] = None
+) -> Dict[str, IVCUState]:
+    """
+    Project states for many IVCUs in one pass over their events.
+    
+    Events should be grouped by ivcu_id and ordered by sequence number
+    within each IVCU (e.g. sorted by (ivcu_id, sequence_number)); each
+    consecutive run is folded with a single copy of that IVCU's state.
+    Existing states, if given, are used as starting points and left
+    untouched.
+    """
+    projected = dict(states) if states else {}
+    for ivcu_id, run in groupby(events, key=_IVCU_ID):
+        state = projected.get(ivcu_id) or IVCUState(id=ivcu_id)
+        projected[ivcu_id] = state.apply_events(list(run))
+    return projected
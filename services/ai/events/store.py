@@ -4,11 +4,10 @@ IVCU Event Store
 Persistence layer for IVCU events.
 """
 import uuid
-import json
 import asyncio
-from typing import Optional, List, Dict, Any, Tuple
-from datetime import datetime
-from .model import IVCUEvent, IVCUState, EventType
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, NamedTuple, Tuple
+from .model import IVCUEvent, IVCUState, EventType, encode_event_data, now_us, us_to_datetime
 
 # Try import asyncpg
 try:
@@ -18,19 +17,75 @@ except ImportError:
     ASYNCPG_AVAILABLE = False
 
 
+# Column order of ivcu_events rows written by COPY
+_EVENT_COLUMNS = [
+    "id", "ivcu_id", "sequence_number", "event_type", "event_data", "timestamp", "actor_id"
+]
+
+
+# Hot-path queries. asyncpg prepares each distinct query text once per
+# connection and reuses the plan from its statement cache, so these stay
+# fixed strings rather than being built per call.
+_STREAM_HEAD_SQL = """
+    SELECT COALESCE(MAX(sequence_number), 0) as max_seq
+    FROM ivcu_events
+    WHERE ivcu_id = $1
+"""
+
+_SELECT_EVENTS_SQL = """
+    SELECT id, ivcu_id, sequence_number, event_type, event_data,
+           (EXTRACT(EPOCH FROM timestamp) * 1000000)::BIGINT AS timestamp, actor_id
+    FROM ivcu_events
+    WHERE ivcu_id = $1
+      AND sequence_number > $2
+      AND ($3::INTEGER IS NULL OR sequence_number <= $3)
+    ORDER BY sequence_number ASC
+"""
+
+
 class ConcurrencyError(Exception):
     """Raised when optimistic concurrency check fails."""
     pass
 
 
+class _PendingAppend(NamedTuple):
+    """An append_event call waiting in the flush queue."""
+    ivcu_id: str
+    event_type: EventType
+    event_data: Dict[str, Any]
+    actor_id: Optional[str]
+    expected_version: Optional[int]
+    future: asyncio.Future
+
+
 class IVCUEventStore:
     """
     Event Store for IVCU events.
     """
     
-    def __init__(self, pool=None):
+    # Upper bound on queued appends coalesced into one flush
+    MAX_BATCH = 512
+    
+    # Projected states are cached every SNAPSHOT_EVERY versions so get_state
+    # only replays the tail of a stream
+    SNAPSHOT_EVERY = 50
+    MAX_SNAPSHOTS = 1024
+    
+    def __init__(self, pool=None, max_flush_delay_ms: float = 0.0):
         self.pool = pool
         self._memory_events: Dict[str, List[IVCUEvent]] = {} # Fallback memory store via dict for dev/test
+        
+        # Appends are queued and written by a background flusher, which
+        # coalesces concurrent callers into one batch per stream. With a
+        # delay of 0 it flushes as soon as the queue runs dry.
+        self.max_flush_delay_ms = max_flush_delay_ms
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._flusher: Optional[asyncio.Task] = None
+        
+        # LRU of (ivcu_id, version) -> state; events are append-only, so a
+        # snapshot never goes stale
+        self._snapshots: "OrderedDict[Tuple[str, int], IVCUState]" = OrderedDict()
+        self._snapshot_heads: Dict[str, int] = {}  # Highest snapshot version per IVCU
     
     async def initialize_schema(self):
         """Create event store tables if they don't exist."""
@@ -70,9 +125,114 @@ class IVCUEventStore:
     ) -> Optional[IVCUEvent]:
         """
         Append a new event to the store.
+        
+        Waits until the event is written; concurrent calls share a batch.
+        """
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            # (Re)start on this loop; a queue left by a dead flusher is never drained
+            self._queue = asyncio.Queue()
+            self._flusher = loop.create_task(self._flush_loop())
+        
+        future = loop.create_future()
+        await self._queue.put(_PendingAppend(ivcu_id, event_type, event_data, actor_id, expected_version, future))
+        return await future
+
+    async def close(self):
+        """Write any queued appends and stop the background flusher."""
+        if self._flusher is None:
+            return
+        await self._queue.join()
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+
+    async def _flush_loop(self):
+        """Drain queued appends and write them in batches."""
+        while True:
+            batch = [await self._queue.get()]
+            await self._fill_batch(batch)
+            try:
+                # Streams are independent; appends within a stream stay in order
+                streams: Dict[str, List[_PendingAppend]] = {}
+                for item in batch:
+                    streams.setdefault(item.ivcu_id, []).append(item)
+                await asyncio.gather(*(self._flush_stream(items) for items in streams.values()))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _fill_batch(self, batch: List[_PendingAppend]):
+        """Add queued appends to batch, waiting up to max_flush_delay_ms for more."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_flush_delay_ms / 1000
+        while len(batch) < self.MAX_BATCH:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                return
+
+    async def _flush_stream(self, items: List[_PendingAppend]):
+        """Write one stream's queued appends, grouping runs that can share a batch."""
+        group: List[_PendingAppend] = []
+        for item in items:
+            # A version check or a new actor needs its own batch
+            if group and (
+                item.expected_version is not None
+                or group[0].expected_version is not None
+                or item.actor_id != group[0].actor_id
+            ):
+                await self._write_group(group)
+                group = []
+            group.append(item)
+        await self._write_group(group)
+
+    async def _write_group(self, group: List[_PendingAppend]):
+        """Append a run of queued events and resolve their callers."""
+        head = group[0]
+        try:
+            events = await self.append_events(
+                head.ivcu_id,
+                [(item.event_type, item.event_data) for item in group],
+                head.actor_id,
+                head.expected_version
+            )
+        except Exception as e:
+            for item in group:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        for item, event in zip(group, events):
+            if not item.future.done():
+                item.future.set_result(event)
+
+    async def append_events(
+        self,
+        ivcu_id: str,
+        events: List[Tuple[EventType, Dict[str, Any]]],
+        actor_id: Optional[str] = None,
+        expected_version: Optional[int] = None
+    ) -> List[IVCUEvent]:
         """
-        timestamp = datetime.utcnow()
-        event_id = str(uuid.uuid4())
+        Append several events to one IVCU stream atomically.
+        
+        All rows go in with a single COPY inside one transaction, so the
+        commit and network round trip are paid once per batch, not per event.
+        """
+        if not events:
+            return []
+        
+        timestamp = now_us()
+        event_ids = [str(uuid.uuid4()) for _ in events]
         
         # 1. DB Implementation
         if self.pool and ASYNCPG_AVAILABLE:
@@ -80,36 +240,41 @@ class IVCUEventStore:
                 async with self.pool.acquire() as conn:
                     async with conn.transaction():
                         # Get next sequence number
-                        result = await conn.fetchrow("""
-                            SELECT COALESCE(MAX(sequence_number), 0) as max_seq
-                            FROM ivcu_events
-                            WHERE ivcu_id = $1
-                        """, uuid.UUID(ivcu_id))
+                        result = await conn.fetchrow(_STREAM_HEAD_SQL, uuid.UUID(ivcu_id))
                         
                         current_version = result['max_seq']
                         
                         if expected_version is not None and current_version != expected_version:
                             raise ConcurrencyError(f"Expected {expected_version}, got {current_version}")
                         
-                        next_seq = current_version + 1
-                        
-                        await conn.execute("""
-                            INSERT INTO ivcu_events 
-                                (id, ivcu_id, sequence_number, event_type, event_data, timestamp, actor_id)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7)
-                        """,
-                            uuid.UUID(event_id),
-                            uuid.UUID(ivcu_id),
-                            next_seq,
-                            event_type.value,
-                            json.dumps(event_data),
-                            timestamp,
-                            uuid.UUID(actor_id) if actor_id else None
+                        ivcu_uuid = uuid.UUID(ivcu_id)
+                        actor_uuid = uuid.UUID(actor_id) if actor_id else None
+                        written_at = us_to_datetime(timestamp)
+                        await conn.copy_records_to_table(
+                            "ivcu_events",
+                            records=[
+                                (
+                                    uuid.UUID(event_id),
+                                    ivcu_uuid,
+                                    current_version + i,
+                                    event_type.value,
+                                    encode_event_data(event_data),
+                                    written_at,
+                                    actor_uuid
+                                )
+                                for i, (event_id, (event_type, event_data))
+                                in enumerate(zip(event_ids, events), start=1)
+                            ],
+                            columns=_EVENT_COLUMNS
                         )
                         
-                        return IVCUEvent(event_id, ivcu_id, next_seq, event_type, event_data, timestamp, actor_id)
+                        return [
+                            IVCUEvent(event_id, ivcu_id, current_version + i, event_type, event_data, timestamp, actor_id)
+                            for i, (event_id, (event_type, event_data))
+                            in enumerate(zip(event_ids, events), start=1)
+                        ]
             except Exception as e:
-                print(f"Failed to append event to DB: {e}")
+                print(f"Failed to append events to DB: {e}")
                 # Fallthrough to memory? Or fail? 
                 # For this dev phase, let's fallthrough implies we assume dev mode if DB fails often
                 # But typically we should error. I will fallthrough for robustness in this specific agent flow.
@@ -121,38 +286,87 @@ class IVCUEventStore:
         current_version = len(self._memory_events[ivcu_id])
         if expected_version is not None and current_version != expected_version:
              raise ConcurrencyError(f"Expected {expected_version}, got {current_version}")
-             
-        next_seq = current_version + 1
-        event = IVCUEvent(event_id, ivcu_id, next_seq, event_type, event_data, timestamp, actor_id)
-        self._memory_events[ivcu_id].append(event)
         
-        return event
+        appended = [
+            IVCUEvent(event_id, ivcu_id, current_version + i, event_type, event_data, timestamp, actor_id)
+            for i, (event_id, (event_type, event_data)) in enumerate(zip(event_ids, events), start=1)
+        ]
+        self._memory_events[ivcu_id].extend(appended)
+        
+        return appended
 
-    async def get_events(self, ivcu_id: str) -> List[IVCUEvent]:
-        """Get all events for an IVCU."""
+    async def get_events(
+        self,
+        ivcu_id: str,
+        after_version: int = 0,
+        up_to_version: Optional[int] = None
+    ) -> List[IVCUEvent]:
+        """Get events for an IVCU, optionally limited to a version range."""
         if self.pool and ASYNCPG_AVAILABLE:
             try:
                 async with self.pool.acquire() as conn:
-                    rows = await conn.fetch("""
-                        SELECT id, ivcu_id, sequence_number, event_type, event_data, timestamp, actor_id
-                        FROM ivcu_events
-                        WHERE ivcu_id = $1
-                        ORDER BY sequence_number ASC
-                    """, uuid.UUID(ivcu_id))
-                    return [IVCUEvent.from_row(row) for row in rows]
+                    rows = await conn.fetch(
+                        _SELECT_EVENTS_SQL, uuid.UUID(ivcu_id), after_version, up_to_version
+                    )
+                    return IVCUEvent.from_rows(rows)
             except Exception as e:
                 print(f"Failed to get events from DB: {e}")
         
-        return self._memory_events.get(ivcu_id, [])
-
-    async def get_state(self, ivcu_id: str) -> IVCUState:
-        """Reconstruct state from events."""
-        events = await self.get_events(ivcu_id)
-        state = IVCUState(id=ivcu_id)
-        for event in events:
-            state = state.apply_event(event)
+        # Sequence numbers start at 1, so version v is at index v - 1
+        return self._memory_events.get(ivcu_id, [])[after_version:up_to_version]
+
+    async def get_state(self, ivcu_id: str, up_to_version: Optional[int] = None) -> IVCUState:
+        """
+        Reconstruct state from events, optionally as of an earlier version.
+        
+        Replay starts from the nearest cached snapshot, so only the events
+        after it are fetched and applied. The caller always gets its own
+        copy, never a cached snapshot object.
+        """
+        state = self._nearest_snapshot(ivcu_id, up_to_version) or IVCUState(id=ivcu_id)
+        if up_to_version is not None and state.version >= up_to_version:
+            return state.apply_events([])
+        
+        events = await self.get_events(ivcu_id, after_version=state.version, up_to_version=up_to_version)
+        
+        # Fold in runs that end on snapshot boundaries; each run copies the
+        # state once, so every cached snapshot is its own object
+        start = 0
+        while start < len(events):
+            end = start + self.SNAPSHOT_EVERY - state.version % self.SNAPSHOT_EVERY
+            state = state.apply_events(events[start:end])
+            if state.version % self.SNAPSHOT_EVERY == 0:
+                self._store_snapshot(state)
+            start = end
+        if state.version % self.SNAPSHOT_EVERY == 0:
+            # No tail after the last snapshot: don't hand out the cached object
+            return state.apply_events([])
         return state
 
+    def _nearest_snapshot(self, ivcu_id: str, up_to_version: Optional[int]) -> Optional[IVCUState]:
+        """Latest cached state for ivcu_id at or below up_to_version."""
+        head = self._snapshot_heads.get(ivcu_id)
+        if head is None:
+            return None
+        version = head if up_to_version is None else min(head, up_to_version)
+        version -= version % self.SNAPSHOT_EVERY
+        while version > 0:
+            state = self._snapshots.get((ivcu_id, version))
+            if state is not None:
+                self._snapshots.move_to_end((ivcu_id, version))
+                return state
+            version -= self.SNAPSHOT_EVERY
+        return None
+
+    def _store_snapshot(self, state: IVCUState):
+        """Cache a projected state, evicting the least recently used snapshot."""
+        self._snapshots[(state.id, state.version)] = state
+        self._snapshots.move_to_end((state.id, state.version))
+        if state.version > self._snapshot_heads.get(state.id, 0):
+            self._snapshot_heads[state.id] = state.version
+        while len(self._snapshots) > self.MAX_SNAPSHOTS:
+            self._snapshots.popitem(last=False)
+
 # Singleton
 _event_store = None
 
@@ -4,11 +4,14 @@ gRPC Verification Service Implementation
 Provides streaming verification progress and quick synchronous Tier 0 checks.
 """
 import asyncio
+import hashlib
 import time
-from typing import AsyncIterator, Optional, Dict, Any, List
+from collections import OrderedDict
+from typing import AsyncIterator, Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 
 import grpc
+import orjson
 from grpc import aio
 
 
@@ -22,6 +25,9 @@ class VerificationServicer:
     - Quick Tier 0 synchronous verification
     """
     
+    # QuickVerify results kept for re-submitted code (e.g. retries)
+    QUICK_VERIFY_CACHE_SIZE = 1024
+    
     def __init__(self, orchestra=None):
         """
         Initialize the verification servicer.
@@ -30,6 +36,7 @@ class VerificationServicer:
             orchestra: VerificationOrchestra instance
         """
         self.orchestra = orchestra
+        self._quick_cache: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
     
     async def VerifyStream(
         self,
@@ -266,11 +273,27 @@ class VerificationServicer:
         """
         Quick Tier 0 only verification.
         
-        Synchronous, <10ms target for real-time feedback.
+        Synchronous, <10ms target for real-time feedback. Results are
+        cached by language and code digest, so identical code is only
+        parsed and analyzed once. The cache holds the JSON encoding, so
+        every caller decodes its own copy of the nested lists and dicts.
         """
         code = request.get("code", "")
         language = request.get("language", "python")
         
+        key = (language, hashlib.blake2b(code.encode(), digest_size=16).digest())
+        cached = self._quick_cache.get(key)
+        if cached is None:
+            cached = self._quick_cache[key] = orjson.dumps(await self._quick_verify(code, language))
+            if len(self._quick_cache) > self.QUICK_VERIFY_CACHE_SIZE:
+                self._quick_cache.popitem(last=False)
+        else:
+            self._quick_cache.move_to_end(key)
+        
+        return orjson.loads(cached)
+    
+    async def _quick_verify(self, code: str, language: str) -> dict:
+        """Uncached Tier 0 verification behind QuickVerify."""
         try:
             from verification import verify_tier0
             
@@ -4,11 +4,12 @@ SDO History System for Undo/Rollback
 Manages snapshots of SDO state for reversible operations.
 Each modification creates a snapshot that can be restored.
 """
-import json
 import uuid
 import time
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, asdict
+
+import orjson
 from datetime import datetime
 from pathlib import Path
 
@@ -20,18 +21,28 @@ class Snapshot:
     sdo_id: str
     timestamp: float
     operation: str  # What operation created this snapshot
-    state: Dict[str, Any]  # Serialized SDO state
+    state_blob: bytes  # SDO state as compact orjson-encoded JSON
     parent_id: Optional[str] = None  # Previous snapshot in chain
     
     @property
     def created_at(self) -> datetime:
         return datetime.fromtimestamp(self.timestamp)
     
+    @property
+    def state(self) -> Dict[str, Any]:
+        """Decoded SDO state; each call returns a fresh dict."""
+        return orjson.loads(self.state_blob)
+    
     def to_dict(self) -> dict:
-        return asdict(self)
+        data = asdict(self)
+        del data["state_blob"]
+        data["state"] = self.state
+        return data
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Snapshot':
+        data = dict(data)
+        data["state_blob"] = orjson.dumps(data.pop("state"), default=str)
         return cls(**data)
 
 
@@ -95,7 +106,7 @@ class SDOHistory:
             sdo_id=sdo_id,
             timestamp=time.time(),
             operation=operation,
-            state=self._serialize_sdo(sdo),
+            state_blob=self._serialize_sdo(sdo),
             parent_id=parent_id
         )
         
@@ -206,16 +217,22 @@ class SDOHistory:
         if sdo_id in self._current:
             del self._current[sdo_id]
     
-    def _serialize_sdo(self, sdo) -> Dict[str, Any]:
-        """Serialize SDO to dict (handles Pydantic models)."""
+    def _serialize_sdo(self, sdo) -> bytes:
+        """
+        Serialize SDO to compact JSON bytes (handles Pydantic models).
+        
+        Encoding once is cheaper than deep-copying the model and the bytes
+        take far less memory than the equivalent dict across long histories.
+        """
         if hasattr(sdo, 'model_dump'):
-            return sdo.model_dump()
+            state = sdo.model_dump(mode="json")
         elif hasattr(sdo, 'dict'):
-            return sdo.dict()
+            state = sdo.dict()
         elif hasattr(sdo, '__dict__'):
-            return {k: v for k, v in sdo.__dict__.items() if not k.startswith('_')}
+            state = {k: v for k, v in sdo.__dict__.items() if not k.startswith('_')}
         else:
             raise ValueError(f"Cannot serialize SDO: {type(sdo)}")
+        return orjson.dumps(state, default=str)
     
     def _persist_snapshot(self, snapshot: Snapshot):
         """Save snapshot to disk."""
@@ -226,8 +243,7 @@ class SDOHistory:
         sdo_dir.mkdir(parents=True, exist_ok=True)
         
         filepath = sdo_dir / f"{snapshot.id}.json"
-        with open(filepath, 'w') as f:
-            json.dump(snapshot.to_dict(), f, indent=2, default=str)
+        filepath.write_bytes(orjson.dumps(snapshot.to_dict(), default=str, option=orjson.OPT_INDENT_2))
     
     def load_history(self, sdo_id: str):
         """Load snapshots from disk for an SDO."""
@@ -241,8 +257,7 @@ class SDOHistory:
         snapshots = []
         for filepath in sdo_dir.glob("*.json"):
             try:
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
+                data = orjson.loads(filepath.read_bytes())
                 snapshots.append(Snapshot.from_dict(data))
             except Exception as e:
                 print(f"Failed to load snapshot {filepath}: {e}")
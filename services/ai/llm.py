@@ -4,7 +4,9 @@ Handles interactions with real LLM providers (DeepSeek, OpenAI, Anthropic, Googl
 Includes embedding generation for vector memory.
 """
 from typing import Optional, Dict, List, Any, AsyncIterator
+import hashlib
 import os
+import numpy as np
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
@@ -188,8 +190,8 @@ class LLMService:
             1536-dimensional embedding vector
         """
         if not self.embeddings:
-            # Return zero vector as fallback (for testing without API key)
-            return [0.0] * 1536
+            # Deterministic stand-in (for testing without API key)
+            return self._mock_embedding(text)
             
         try:
             embedding = await self.embeddings.aembed_query(text)
@@ -198,6 +200,20 @@ class LLMService:
             print(f"Embedding generation failed: {e}")
             return [0.0] * 1536
         
+    def _mock_embedding(self, text: str, dim: int = 1536) -> List[float]:
+        """
+        Unit-length pseudo-random embedding seeded from the text.
+        
+        Equal texts embed identically and different texts are near-orthogonal,
+        so similarity search behaves sensibly without a provider (a zero
+        vector has no defined cosine).
+        """
+        digest = hashlib.blake2b(text.encode(), digest_size=32).digest()
+        rng = np.random.default_rng(int.from_bytes(digest[:8], "little"))
+        vector = rng.standard_normal(dim).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+        return vector.tolist()
+    
     async def parse_intent(self, raw_intent: str) -> Dict[str, Any]:
         """
         Parse raw natural language intent into structured format.
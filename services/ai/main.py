@@ -25,6 +25,7 @@ from economics import EconomicsService, CostEstimate
 from verification import VerificationOrchestra, VerificationResult
 from knowledge import KnowledgeService
 from database import DatabaseService
+from skill_profile import get_skill_service
 import eventbus
 from graph_memory import get_graph_memory
 from model_config import DynamicModelConfig, init_model_config, get_model_config
@@ -205,6 +206,9 @@ async def lifespan(app: FastAPI):
     else:
         print("WARNING: Database service failed to connect")
 
+    # Skill profiles are persisted write-behind to the database
+    get_skill_service(database_service).start_write_behind()
+
     # Initialize Dynamic Model Config
     global model_config
     if database_service.pool:
@@ -244,6 +248,7 @@ async def lifespan(app: FastAPI):
     print("Shutting down AXIOM AI Service...")
     if projection_engine:
         await projection_engine.stop()
+    await get_skill_service().stop_write_behind()
     await database_service.close()
 
 
@@ -277,6 +282,12 @@ class ParseIntentResponse(BaseModel):
     extracted_constraints: List[str]
     sdo_id: str
 
+class ParseIntentBatchRequest(BaseModel):
+    queries: List[ParseIntentRequest]
+
+# Upper bound on concurrent LLM calls made for one batch request
+BATCH_LLM_CONCURRENCY = 50
+
 class GenerateRequest(BaseModel):
     sdo_id: str
     intent: Optional[str] = None # Optional override
@@ -361,6 +372,23 @@ async def parse_intent(request: ParseIntentRequest):
     Parse raw natural language intent into structured format using LLM.
     Creates a new SDO instance.
     """
+    return await _parse_intent(request)
+
+@app.post("/parse-intent/batch", response_model=List[ParseIntentResponse])
+async def parse_intent_batch(request: ParseIntentBatchRequest):
+    """
+    Parse several intents in one request, creating one SDO per intent.
+    LLM calls run concurrently, at most BATCH_LLM_CONCURRENCY at a time.
+    """
+    semaphore = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+    
+    async def parse_one(query: ParseIntentRequest) -> ParseIntentResponse:
+        async with semaphore:
+            return await _parse_intent(query)
+    
+    return await asyncio.gather(*(parse_one(query) for query in request.queries))
+
+async def _parse_intent(request: ParseIntentRequest) -> ParseIntentResponse:
     # 1. Call LLM to parse intent
     parsed_result = await llm_service.parse_intent(request.intent)
     
@@ -1424,6 +1452,9 @@ class VerifyProofResponse(BaseModel):
     signature_valid: bool
     errors: List[str] = []
 
+class VerifyProofBatchRequest(BaseModel):
+    items: List[VerifyProofRequest]
+
 class ExportBundleRequest(BaseModel):
     sdo_id: str
     candidate_id: Optional[str] = None
@@ -1493,9 +1524,25 @@ async def verify_proof(request: VerifyProofRequest):
     """
     Verify a proof independently.
     """
-    from verification import get_proof_generator, VerificationProof
+    from verification import get_proof_generator
+    
+    return _verify_proof(get_proof_generator(), request)
+
+
+@app.post("/proof/verify/batch", response_model=List[VerifyProofResponse])
+async def verify_proof_batch(request: VerifyProofBatchRequest):
+    """
+    Verify several proofs in one request.
+    Verification is CPU-bound, so the items are checked in turn.
+    """
+    from verification import get_proof_generator
     
     proof_gen = get_proof_generator()
+    return [_verify_proof(proof_gen, item) for item in request.items]
+
+
+def _verify_proof(proof_gen, request: VerifyProofRequest) -> VerifyProofResponse:
+    from verification import VerificationProof
     
     # Reconstruct proof from dict
     proof = VerificationProof(
@@ -23,6 +23,7 @@ from .catalog import (
 from .cost_oracle import (
     CostEstimate,
     UsageRecord,
+    UsageAgg,
     CostOracle,
     get_cost_oracle
 )
@@ -55,6 +56,7 @@ __all__ = [
     # Cost Oracle
     "CostEstimate",
     "UsageRecord",
+    "UsageAgg",
     "CostOracle",
     "get_cost_oracle",
     
@@ -6,12 +6,22 @@ Implements accuracy-first routing per Architecture v2.1.
 
 Core Philosophy: "Low accuracy models are expensive because verification failures trigger regeneration."
 """
+import sys
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from decimal import Decimal
 
 
+# Decimal constants for the per-request cost math, built once instead of per call
+_PER_1M = Decimal(1_000_000)
+
+# Retry multipliers by HumanEval floor (highest first), with Decimal twins
+_RETRY_MULTIPLIERS = ((90, 1.1), (80, 1.3), (70, 1.6), (0, 2.0))
+_RETRY_MULTIPLIER_DECIMALS = {m: Decimal(str(m)) for _, m in _RETRY_MULTIPLIERS}
+
+
 class ModelTier(str, Enum):
     """Model classification tiers per Architecture v2.1"""
     LOCAL = "local"           # Privacy + Speed (runs on user hardware)
@@ -32,9 +42,9 @@ class TaskType(str, Enum):
     SIMPLE_EDIT = "simple_edit"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelSpec:
-    """Specification for an LLM model."""
+    """Specification for an LLM model (immutable once registered)."""
     id: str                          # Unique identifier
     name: str                        # Display name
     provider: str                    # openai, anthropic, google, deepseek, etc.
@@ -64,9 +74,34 @@ class ModelSpec:
     available: bool = True
     deprecated: bool = False
     
+    # Derived at construction; the spec is frozen so these never go stale
+    _recommended: frozenset = field(init=False, repr=False, compare=False)
+    _not_recommended: frozenset = field(init=False, repr=False, compare=False)
+    _retry_multiplier: float = field(init=False, repr=False, compare=False)
+    
     def __post_init__(self):
+        # Frozen dataclass: normalize fields through object.__setattr__
+        # Ids key MODEL_CATALOG and every catalog_cached lookup; intern them so
+        # interned callers match on identity before any string compare
+        object.__setattr__(self, "id", sys.intern(self.id))
         if not self.api_model_name:
-            self.api_model_name = self.id
+            object.__setattr__(self, "api_model_name", self.id)
+        # Provider strings are compared on every routing filter; intern them
+        object.__setattr__(self, "provider", sys.intern(self.provider))
+        # Prices feed Decimal math on every estimate; normalize them once
+        if not isinstance(self.input_price, Decimal):
+            object.__setattr__(self, "input_price", Decimal(str(self.input_price)))
+        if not isinstance(self.output_price, Decimal):
+            object.__setattr__(self, "output_price", Decimal(str(self.output_price)))
+        object.__setattr__(self, "_recommended", frozenset(self.recommended_for))
+        object.__setattr__(self, "_not_recommended", frozenset(self.not_recommended_for))
+        # 1.1 = ~10% retry overhead ... 2.0 = ~100% (expect many failures)
+        multiplier = _RETRY_MULTIPLIERS[-1][1]
+        for floor, candidate in _RETRY_MULTIPLIERS:
+            if self.humaneval_score >= floor:
+                multiplier = candidate
+                break
+        object.__setattr__(self, "_retry_multiplier", multiplier)
     
     @property
     def effective_cost_multiplier(self) -> float:
@@ -74,25 +109,25 @@ class ModelSpec:
         Cost multiplier based on expected verification success rate.
         Lower accuracy = more retries = higher effective cost.
         """
-        if self.humaneval_score >= 90:
-            return 1.1  # ~10% retry overhead
-        elif self.humaneval_score >= 80:
-            return 1.3  # ~30% retry overhead
-        elif self.humaneval_score >= 70:
-            return 1.6  # ~60% retry overhead
-        else:
-            return 2.0  # ~100% retry overhead (expect many failures)
+        return self._retry_multiplier
+    
+    def supports_task(self, task_type: TaskType) -> bool:
+        """Whether the model is usable for a task (not explicitly ruled out)."""
+        return task_type not in self._not_recommended
+    
+    def is_recommended_for(self, task_type: TaskType) -> bool:
+        """Whether the model is explicitly recommended for a task."""
+        return task_type in self._recommended
     
     def estimate_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
         """Estimate cost for a request."""
-        input_cost = (Decimal(input_tokens) / 1_000_000) * self.input_price
-        output_cost = (Decimal(output_tokens) / 1_000_000) * self.output_price
-        return input_cost + output_cost
+        # int * Decimal avoids building a Decimal per token count
+        return (input_tokens * self.input_price + output_tokens * self.output_price) / _PER_1M
     
     def estimate_effective_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
         """Estimate cost including expected retries."""
         base_cost = self.estimate_cost(input_tokens, output_tokens)
-        return base_cost * Decimal(str(self.effective_cost_multiplier))
+        return base_cost * _RETRY_MULTIPLIER_DECIMALS[self._retry_multiplier]
 
 
 # =============================================================================
@@ -101,10 +136,72 @@ class ModelSpec:
 
 MODEL_CATALOG: Dict[str, ModelSpec] = {}
 
+# Accuracy tiers, lowest first (used for auto-upgrade on failure)
+TIER_ORDER: Tuple[ModelTier, ...] = (
+    ModelTier.LOCAL, ModelTier.BALANCED, ModelTier.HIGH_ACCURACY, ModelTier.FRONTIER
+)
+
+# Lookup indexes over MODEL_CATALOG, rebuilt whenever a model is registered
+_BY_TIER: Dict[ModelTier, Tuple[ModelSpec, ...]] = {}
+_NEXT_TIER_OF: Dict[str, ModelSpec] = {}
+_MODEL_SUMMARIES: Tuple[Dict[str, Any], ...] = ()
+_CATALOG_CACHES: List[Any] = []
+
+
+def catalog_cached(fn):
+    """
+    Memoize a pure function of the catalog (plus its arguments).
+    
+    The cache is cleared whenever a model is registered.
+    """
+    cached = lru_cache(maxsize=1024)(fn)
+    _CATALOG_CACHES.append(cached)
+    return cached
+
+
+def _rebuild_indexes():
+    """Recompute the per-tier and next-tier indexes from MODEL_CATALOG."""
+    global _MODEL_SUMMARIES
+    for cache in _CATALOG_CACHES:
+        cache.cache_clear()
+    
+    _MODEL_SUMMARIES = tuple(
+        {
+            "id": m.id,
+            "name": m.name,
+            "provider": m.provider,
+            "tier": m.tier.value,
+            "humaneval": m.humaneval_score,
+            "input_price": float(m.input_price),
+            "output_price": float(m.output_price),
+            "context_window": m.context_window,
+            "available": m.available
+        }
+        for m in MODEL_CATALOG.values()
+    )
+    
+    _BY_TIER.clear()
+    for tier in TIER_ORDER:
+        _BY_TIER[tier] = tuple(m for m in MODEL_CATALOG.values() if m.tier == tier and m.available)
+    
+    # Highest accuracy model in the next tier that has any available models
+    best_by_tier = {
+        tier: max(models, key=lambda m: m.humaneval_score)
+        for tier, models in _BY_TIER.items() if models
+    }
+    _NEXT_TIER_OF.clear()
+    for model in MODEL_CATALOG.values():
+        if model.tier not in TIER_ORDER:
+            continue
+        next_idx = TIER_ORDER.index(model.tier) + 1
+        if next_idx < len(TIER_ORDER) and TIER_ORDER[next_idx] in best_by_tier:
+            _NEXT_TIER_OF[model.id] = best_by_tier[TIER_ORDER[next_idx]]
+
 
 def register_model(model: ModelSpec):
     """Register a model in the catalog."""
     MODEL_CATALOG[model.id] = model
+    _rebuild_indexes()
 
 
 # -----------------------------------------------------------------------------
@@ -318,16 +415,18 @@ def get_model(model_id: str) -> Optional[ModelSpec]:
     return MODEL_CATALOG.get(model_id)
 
 
-def get_models_by_tier(tier: ModelTier) -> List[ModelSpec]:
-    """Get all models in a tier."""
-    return [m for m in MODEL_CATALOG.values() if m.tier == tier and m.available]
+def get_models_by_tier(tier: ModelTier) -> Tuple[ModelSpec, ...]:
+    """Get all models in a tier (the shared, immutable index entry)."""
+    return _BY_TIER.get(tier, ())
 
 
-def get_models_by_provider(provider: str) -> List[ModelSpec]:
-    """Get all models from a provider."""
-    return [m for m in MODEL_CATALOG.values() if m.provider == provider and m.available]
+@catalog_cached
+def get_models_by_provider(provider: str) -> Tuple[ModelSpec, ...]:
+    """Get all available models from a provider."""
+    return tuple(m for m in MODEL_CATALOG.values() if m.provider == provider and m.available)
 
 
+@catalog_cached
 def get_recommended_model(task_type: TaskType, tier: Optional[ModelTier] = None) -> Optional[ModelSpec]:
     """Get the recommended model for a task type."""
     candidates = []
@@ -337,9 +436,9 @@ def get_recommended_model(task_type: TaskType, tier: Optional[ModelTier] = None)
             continue
         if tier and model.tier != tier:
             continue
-        if task_type in model.not_recommended_for:
+        if not model.supports_task(task_type):
             continue
-        if task_type in model.recommended_for:
+        if model.is_recommended_for(task_type):
             candidates.append((model, 2))  # Explicitly recommended
         else:
             candidates.append((model, 1))  # Not explicitly against
@@ -357,41 +456,17 @@ def get_default_model() -> ModelSpec:
     return MODEL_CATALOG.get("deepseek-v3") or list(MODEL_CATALOG.values())[0]
 
 
-def get_next_tier_model(current_model: ModelSpec) -> Optional[ModelSpec]:
-    """Get a model from the next accuracy tier (for auto-upgrade on failure)."""
-    tier_order = [ModelTier.LOCAL, ModelTier.BALANCED, ModelTier.HIGH_ACCURACY, ModelTier.FRONTIER]
-    
-    try:
-        current_idx = tier_order.index(current_model.tier)
-    except ValueError:
-        return None
-    
-    if current_idx >= len(tier_order) - 1:
-        return None  # Already at highest tier
-    
-    next_tier = tier_order[current_idx + 1]
-    next_tier_models = get_models_by_tier(next_tier)
+def get_next_tier_model(current_model: Union[ModelSpec, str]) -> Optional[ModelSpec]:
+    """
+    Get a model from the next accuracy tier (for auto-upgrade on failure).
     
-    if not next_tier_models:
-        return None
-    
-    # Return highest accuracy model in next tier
-    return max(next_tier_models, key=lambda m: m.humaneval_score)
+    Accepts a ModelSpec or a model ID. Returns the highest accuracy model in
+    the next tier, or None at the highest tier.
+    """
+    model_id = current_model if isinstance(current_model, str) else current_model.id
+    return _NEXT_TIER_OF.get(model_id)
 
 
 def list_all_models() -> List[Dict[str, Any]]:
-    """List all models with their key info."""
-    return [
-        {
-            "id": m.id,
-            "name": m.name,
-            "provider": m.provider,
-            "tier": m.tier.value,
-            "humaneval": m.humaneval_score,
-            "input_price": float(m.input_price),
-            "output_price": float(m.output_price),
-            "context_window": m.context_window,
-            "available": m.available
-        }
-        for m in MODEL_CATALOG.values()
-    ]
+    """List all models with their key info (summaries are built once per registration)."""
+    return [dict(summary) for summary in _MODEL_SUMMARIES]
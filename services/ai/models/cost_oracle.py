@@ -9,11 +9,113 @@ Key insight: "Model A ($0.05, 50% pass) -> Real Cost $0.10 (2 runs)
 """
 from decimal import Decimal
 from typing import Dict, Optional, Tuple, List
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from bisect import bisect_left
 import asyncio
 
-from .catalog import ModelSpec, MODEL_CATALOG, get_model, ModelTier
+from .catalog import ModelSpec, MODEL_CATALOG, get_model, ModelTier, catalog_cached
+
+
+# Shared Decimal constants for the accumulation paths
+_D_HUNDRED = Decimal(100)
+
+# Tracked usage is accumulated as integer nano-USD. Catalog prices have at
+# most three decimals per 1M tokens, so every request cost is a whole number
+# of nano-USD and int sums stay exact without Decimal arithmetic.
+NANOS_PER_USD = 1_000_000_000
+_D_NANOS = Decimal(NANOS_PER_USD)
+
+
+def _to_nanos(amount: Decimal) -> int:
+    """Convert a USD Decimal to integer nano-USD."""
+    return int((amount * _D_NANOS).to_integral_value())
+
+
+def _from_nanos(nanos: int) -> Decimal:
+    """Convert integer nano-USD back to a USD Decimal at the API boundary."""
+    return Decimal(nanos) / _D_NANOS
+
+
+@catalog_cached
+def _recommend_model(
+    input_tokens: int,
+    output_tokens: int,
+    max_cost: Optional[Decimal],
+    min_accuracy: Optional[float]
+) -> Optional[str]:
+    """Best model for a token budget and constraints; depends only on the catalog."""
+    candidates = []
+    
+    for model_id, model in MODEL_CATALOG.items():
+        if not model.available:
+            continue
+        
+        effective_cost = model.estimate_effective_cost(input_tokens, output_tokens)
+        
+        # Apply constraints
+        if max_cost and effective_cost > max_cost:
+            continue
+        
+        if min_accuracy and model.humaneval_score < min_accuracy:
+            continue
+        
+        # Score: prioritize accuracy, then cost efficiency
+        score = model.humaneval_score - float(effective_cost) * 10
+        candidates.append((model_id, score, effective_cost))
+    
+    if not candidates:
+        return None
+    
+    # Return highest scoring model
+    candidates.sort(key=lambda x: -x[1])
+    return candidates[0][0]
+
+
+@catalog_cached
+def _model_alternatives(
+    model_id: str,
+    input_tokens: int,
+    output_tokens: int
+) -> Tuple[Tuple[Dict, ...], Tuple[Dict, ...]]:
+    """Top cheaper and more accurate alternatives to a model; depends only on the catalog."""
+    model = MODEL_CATALOG[model_id]
+    effective_cost = model.estimate_effective_cost(input_tokens, output_tokens)
+    cheaper_alternatives = []
+    more_accurate_alternatives = []
+    
+    for other_id, other_model in MODEL_CATALOG.items():
+        if other_id == model_id or not other_model.available:
+            continue
+        
+        other_effective = other_model.estimate_effective_cost(input_tokens, output_tokens)
+        
+        # Cheaper effective cost
+        if other_effective < effective_cost:
+            cheaper_alternatives.append({
+                "model_id": other_id,
+                "model_name": other_model.name,
+                "tier": other_model.tier.value,
+                "effective_cost_usd": float(other_effective),
+                "savings_usd": float(effective_cost - other_effective),
+                "humaneval": other_model.humaneval_score
+            })
+        
+        # More accurate (higher HumanEval)
+        if other_model.humaneval_score > model.humaneval_score:
+            more_accurate_alternatives.append({
+                "model_id": other_id,
+                "model_name": other_model.name,
+                "tier": other_model.tier.value,
+                "effective_cost_usd": float(other_effective),
+                "humaneval": other_model.humaneval_score,
+                "accuracy_gain": other_model.humaneval_score - model.humaneval_score
+            })
+    
+    # Sort alternatives and keep the top 3
+    cheaper_alternatives.sort(key=lambda x: x["effective_cost_usd"])
+    more_accurate_alternatives.sort(key=lambda x: -x["humaneval"])
+    return tuple(cheaper_alternatives[:3]), tuple(more_accurate_alternatives[:3])
 
 
 @dataclass
@@ -71,6 +173,32 @@ class UsageRecord:
     verification_passed: bool
     attempts: int
     timestamp: datetime
+    cost_nanos: int = 0  # Same cost in nano-USD, for aggregation
+
+
+@dataclass
+class UsageAgg:
+    """Running usage totals, updated as each record is added."""
+    requests: int = 0
+    cost_nanos: int = 0
+    attempts: int = 0
+    passed: int = 0
+    
+    def add(self, record: UsageRecord):
+        self.requests += 1
+        self.cost_nanos += record.cost_nanos
+        self.attempts += record.attempts
+        if record.verification_passed:
+            self.passed += 1
+    
+    def since(self, earlier: "UsageAgg") -> "UsageAgg":
+        """Totals accumulated after an earlier snapshot of this aggregate."""
+        return UsageAgg(
+            requests=self.requests - earlier.requests,
+            cost_nanos=self.cost_nanos - earlier.cost_nanos,
+            attempts=self.attempts - earlier.attempts,
+            passed=self.passed - earlier.passed
+        )
 
 
 class CostOracle:
@@ -98,8 +226,13 @@ class CostOracle:
     def __init__(self):
         self.usage_history: List[UsageRecord] = []
         self.daily_budgets: Dict[str, Decimal] = {}  # user_id -> daily budget
-        self.daily_usage: Dict[str, Decimal] = {}    # user_id -> today's usage
-        self._last_reset: datetime = datetime.utcnow().replace(hour=0, minute=0, second=0)
+        # (user_id, day) -> usage that day; only today's entries are kept
+        self._by_user_date: Dict[Tuple[str, date], UsageAgg] = {}
+        # model_id -> all-time totals, plus per-record timestamps and the
+        # totals *before* each record so a time window is one bisect away
+        self._by_model: Dict[str, UsageAgg] = {}
+        self._model_marks: Dict[str, Tuple[List[datetime], List[UsageAgg]]] = {}
+        self._last_reset: datetime = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
     
     def estimate_cost(
         self,
@@ -126,6 +259,72 @@ class CostOracle:
         if not model:
             raise ValueError(f"Unknown model: {model_id}")
         
+        budget, current_usage = self._budget_state(user_id)
+        return self._estimate(model, intent_text, complexity, include_alternatives, budget, current_usage)
+    
+    def estimate_cost_batch(
+        self,
+        model_ids: List[str],
+        intent_texts: List[str],
+        complexities: Optional[List[str]] = None,
+        user_id: Optional[str] = None,
+        include_alternatives: bool = True
+    ) -> List[CostEstimate]:
+        """
+        Estimate many generation requests at once.
+        
+        Equivalent to calling estimate_cost for each (model_id, intent_text,
+        complexity) triple, but each distinct model is resolved once and the
+        user's budget state is read once for the whole batch.
+        
+        Args:
+            model_ids: Model to use for each request
+            intent_texts: Intent text for each request
+            complexities: Complexity for each request (default: all "medium")
+            user_id: User ID for budget tracking
+            include_alternatives: Whether to include cheaper/better alternatives
+            
+        Returns:
+            One estimate per request, in order
+        """
+        if complexities is None:
+            complexities = ["medium"] * len(model_ids)
+        if not len(model_ids) == len(intent_texts) == len(complexities):
+            raise ValueError("model_ids, intent_texts and complexities must have the same length")
+        
+        models = {model_id: get_model(model_id) for model_id in set(model_ids)}
+        unknown = sorted(model_id for model_id, model in models.items() if not model)
+        if unknown:
+            raise ValueError(f"Unknown model: {unknown[0]}")
+        
+        budget, current_usage = self._budget_state(user_id)
+        return [
+            self._estimate(models[model_id], intent_text, complexity, include_alternatives, budget, current_usage)
+            for model_id, intent_text, complexity in zip(model_ids, intent_texts, complexities)
+        ]
+    
+    def _budget_state(self, user_id: Optional[str]) -> Tuple[Optional[Decimal], Decimal]:
+        """(daily budget, today's spend) for a user; no budget without a user_id."""
+        if not user_id:
+            return None, Decimal(0)
+        self._maybe_reset_daily()
+        budget = self.daily_budgets.get(user_id)
+        if not budget:
+            return None, Decimal(0)
+        return budget, _from_nanos(self._today_cost_nanos(user_id))
+    
+    def _estimate(
+        self,
+        model: ModelSpec,
+        intent_text: str,
+        complexity: str,
+        include_alternatives: bool,
+        budget: Optional[Decimal],
+        current_usage: Decimal
+    ) -> CostEstimate:
+        """Build one estimate for a resolved model and budget state."""
+        model_id = model.id
+        
         # Estimate tokens
         input_tokens = int(len(intent_text) * self.TOKENS_PER_CHAR) + 500  # +500 for system prompt
         output_tokens = self.OUTPUT_TOKENS_BY_COMPLEXITY.get(complexity, 500)
@@ -141,55 +340,20 @@ class CostOracle:
         more_accurate_alternatives = []
         
         if include_alternatives:
-            for other_id, other_model in MODEL_CATALOG.items():
-                if other_id == model_id or not other_model.available:
-                    continue
-                
-                other_effective = other_model.estimate_effective_cost(input_tokens, output_tokens)
-                
-                # Cheaper effective cost
-                if other_effective < effective_cost:
-                    cheaper_alternatives.append({
-                        "model_id": other_id,
-                        "model_name": other_model.name,
-                        "tier": other_model.tier.value,
-                        "effective_cost_usd": float(other_effective),
-                        "savings_usd": float(effective_cost - other_effective),
-                        "humaneval": other_model.humaneval_score
-                    })
-                
-                # More accurate (higher HumanEval)
-                if other_model.humaneval_score > model.humaneval_score:
-                    more_accurate_alternatives.append({
-                        "model_id": other_id,
-                        "model_name": other_model.name,
-                        "tier": other_model.tier.value,
-                        "effective_cost_usd": float(other_effective),
-                        "humaneval": other_model.humaneval_score,
-                        "accuracy_gain": other_model.humaneval_score - model.humaneval_score
-                    })
-            
-            # Sort alternatives
-            cheaper_alternatives.sort(key=lambda x: x["effective_cost_usd"])
-            more_accurate_alternatives.sort(key=lambda x: -x["humaneval"])
-            
-            # Limit to top 3
-            cheaper_alternatives = cheaper_alternatives[:3]
-            more_accurate_alternatives = more_accurate_alternatives[:3]
+            cheaper, more_accurate = _model_alternatives(model_id, input_tokens, output_tokens)
+            # Copies, so callers cannot alter the cached entries
+            cheaper_alternatives = [dict(alt) for alt in cheaper]
+            more_accurate_alternatives = [dict(alt) for alt in more_accurate]
         
         # Check budget
         budget_remaining = None
         budget_usage_percent = None
         within_budget = True
         
-        if user_id:
-            self._maybe_reset_daily()
-            budget = self.daily_budgets.get(user_id)
-            if budget:
-                current_usage = self.daily_usage.get(user_id, Decimal("0"))
-                budget_remaining = budget - current_usage
-                budget_usage_percent = float((current_usage + effective_cost) / budget * 100)
-                within_budget = (current_usage + effective_cost) <= budget
+        if budget:
+            budget_remaining = budget - current_usage
+            budget_usage_percent = float((current_usage + effective_cost) / budget * _D_HUNDRED)
+            within_budget = (current_usage + effective_cost) <= budget
         
         return CostEstimate(
             model_id=model_id,
@@ -223,6 +387,7 @@ class CostOracle:
             return
         
         cost = model.estimate_cost(input_tokens, output_tokens) * attempts
+        cost_nanos = _to_nanos(cost)
         
         record = UsageRecord(
             model_id=model_id,
@@ -231,16 +396,30 @@ class CostOracle:
             cost=cost,
             verification_passed=verification_passed,
             attempts=attempts,
-            timestamp=datetime.utcnow()
+            timestamp=datetime.utcnow(),
+            cost_nanos=cost_nanos
         )
         
         self.usage_history.append(record)
         
+        # Update the per-model aggregates
+        totals = self._by_model.get(model_id)
+        if totals is None:
+            totals = self._by_model[model_id] = UsageAgg()
+            self._model_marks[model_id] = ([], [])
+        timestamps, before = self._model_marks[model_id]
+        timestamps.append(record.timestamp)
+        before.append(replace(totals))
+        totals.add(record)
+        
         # Update daily usage
         if user_id:
             self._maybe_reset_daily()
-            current = self.daily_usage.get(user_id, Decimal("0"))
-            self.daily_usage[user_id] = current + cost
+            key = (user_id, self._last_reset.date())
+            daily = self._by_user_date.get(key)
+            if daily is None:
+                daily = self._by_user_date[key] = UsageAgg()
+            daily.add(record)
     
     def set_daily_budget(self, user_id: str, budget: Decimal):
         """Set daily budget for a user."""
@@ -249,7 +428,7 @@ class CostOracle:
     def get_daily_usage(self, user_id: str) -> Dict:
         """Get daily usage summary for a user."""
         self._maybe_reset_daily()
-        usage = self.daily_usage.get(user_id, Decimal("0"))
+        usage = _from_nanos(self._today_cost_nanos(user_id))
         budget = self.daily_budgets.get(user_id)
         
         return {
@@ -257,7 +436,7 @@ class CostOracle:
             "daily_usage_usd": float(usage),
             "daily_budget_usd": float(budget) if budget else None,
             "budget_remaining_usd": float(budget - usage) if budget else None,
-            "usage_percent": float(usage / budget * 100) if budget else None
+            "usage_percent": float(usage / budget * _D_HUNDRED) if budget else None
         }
     
     def get_usage_stats(self, since: Optional[datetime] = None) -> Dict:
@@ -265,36 +444,25 @@ class CostOracle:
         if since is None:
             since = datetime.utcnow() - timedelta(days=7)
         
-        relevant = [r for r in self.usage_history if r.timestamp >= since]
+        by_model: Dict[str, UsageAgg] = {}
+        for model_id, totals in self._by_model.items():
+            timestamps, before = self._model_marks[model_id]
+            idx = bisect_left(timestamps, since)
+            if idx < len(timestamps):
+                by_model[model_id] = totals.since(before[idx])
         
-        if not relevant:
+        if not by_model:
             return {"total_cost": 0, "total_requests": 0}
         
-        by_model: Dict[str, Dict] = {}
-        for record in relevant:
-            if record.model_id not in by_model:
-                by_model[record.model_id] = {
-                    "requests": 0,
-                    "total_cost": Decimal("0"),
-                    "total_attempts": 0,
-                    "passed": 0
-                }
-            
-            by_model[record.model_id]["requests"] += 1
-            by_model[record.model_id]["total_cost"] += record.cost
-            by_model[record.model_id]["total_attempts"] += record.attempts
-            if record.verification_passed:
-                by_model[record.model_id]["passed"] += 1
-        
         return {
-            "total_cost_usd": float(sum(r.cost for r in relevant)),
-            "total_requests": len(relevant),
+            "total_cost_usd": sum(s.cost_nanos for s in by_model.values()) / NANOS_PER_USD,
+            "total_requests": sum(s.requests for s in by_model.values()),
             "by_model": {
                 model_id: {
-                    "requests": stats["requests"],
-                    "total_cost_usd": float(stats["total_cost"]),
-                    "avg_attempts": stats["total_attempts"] / stats["requests"],
-                    "success_rate": stats["passed"] / stats["requests"] * 100
+                    "requests": stats.requests,
+                    "total_cost_usd": stats.cost_nanos / NANOS_PER_USD,
+                    "avg_attempts": stats.attempts / stats.requests,
+                    "success_rate": stats.passed / stats.requests * 100
                 }
                 for model_id, stats in by_model.items()
             }
@@ -314,39 +482,19 @@ class CostOracle:
         """
         input_tokens = int(len(intent_text) * self.TOKENS_PER_CHAR) + 500
         output_tokens = self.OUTPUT_TOKENS_BY_COMPLEXITY.get(complexity, 500)
-        
-        candidates = []
-        
-        for model_id, model in MODEL_CATALOG.items():
-            if not model.available:
-                continue
-            
-            effective_cost = model.estimate_effective_cost(input_tokens, output_tokens)
-            
-            # Apply constraints
-            if max_cost and effective_cost > max_cost:
-                continue
-            
-            if min_accuracy and model.humaneval_score < min_accuracy:
-                continue
-            
-            # Score: prioritize accuracy, then cost efficiency
-            score = model.humaneval_score - float(effective_cost) * 10
-            candidates.append((model_id, score, effective_cost))
-        
-        if not candidates:
-            return None
-        
-        # Return highest scoring model
-        candidates.sort(key=lambda x: -x[1])
-        return candidates[0][0]
+        return _recommend_model(input_tokens, output_tokens, max_cost, min_accuracy)
     
     def _maybe_reset_daily(self):
         """Reset daily counters if it's a new day."""
-        now = datetime.utcnow().replace(hour=0, minute=0, second=0)
+        now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
         if now > self._last_reset:
-            self.daily_usage.clear()
+            self._by_user_date.clear()
             self._last_reset = now
+    
+    def _today_cost_nanos(self, user_id: str) -> int:
+        """Today's tracked spend for a user, in nano-USD."""
+        daily = self._by_user_date.get((user_id, self._last_reset.date()))
+        return daily.cost_nanos if daily else 0
 
 
 # Singleton instance
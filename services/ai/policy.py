@@ -6,7 +6,11 @@ Inspired by UACP's gateway/internal/policy/
 
 Enforces rules on intents and generated code to prevent dangerous patterns.
 """
+import ast
+import hashlib
 import re
+from bisect import bisect_right
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Callable
 from dataclasses import dataclass, field
 from enum import Enum
@@ -82,6 +86,40 @@ class PolicyResult:
         }
 
 
+# Parsed code by content hash. Several post-generation rules inspect the
+# same AST, so the code is parsed once per distinct input, not once per rule.
+_AST_CACHE: "OrderedDict[str, Optional[ast.Module]]" = OrderedDict()
+_AST_CACHE_SIZE = 1024
+
+
+def parse_code(code: str) -> Optional[ast.Module]:
+    """Parse Python code (cached); None if it is not valid Python."""
+    key = hashlib.sha256(code.encode()).hexdigest()
+    if key in _AST_CACHE:
+        _AST_CACHE.move_to_end(key)
+        return _AST_CACHE[key]
+    
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        tree = None
+    
+    _AST_CACHE[key] = tree
+    if len(_AST_CACHE) > _AST_CACHE_SIZE:
+        _AST_CACHE.popitem(last=False)
+    return tree
+
+
+def _function_defs(tree: ast.Module) -> List[ast.AST]:
+    """All function definitions in a tree, in source order."""
+    functions = [
+        node for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+    functions.sort(key=lambda node: node.lineno)
+    return functions
+
+
 class PolicyRule(ABC):
     """Abstract base class for policy rules."""
     
@@ -128,6 +166,12 @@ class BlockDangerousIntentsRule(PolicyRule):
         r"\bcrypto\s*(mine|mining)\b",
     ]
     
+    # All patterns as one alternation, so an intent is scanned once;
+    # group p<i> identifies which pattern matched
+    _DANGEROUS_RE = re.compile(
+        "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(DANGEROUS_PATTERNS))
+    )
+    
     @property
     def id(self) -> str:
         return "pre-001"
@@ -146,18 +190,17 @@ class BlockDangerousIntentsRule(PolicyRule):
     
     def check(self, content: str, context: Dict[str, Any]) -> List[PolicyViolation]:
         violations = []
-        content_lower = content.lower()
         
-        for pattern in self.DANGEROUS_PATTERNS:
-            if re.search(pattern, content_lower):
-                violations.append(PolicyViolation(
-                    rule_id=self.id,
-                    rule_name=self.name,
-                    severity=self.severity,
-                    message=f"Intent contains potentially dangerous pattern: {pattern}",
-                    suggestion="Rephrase your intent to be more specific and safe"
-                ))
-                break  # One violation is enough
+        match = self._DANGEROUS_RE.search(content.lower())
+        if match:  # One violation is enough
+            pattern = self.DANGEROUS_PATTERNS[int(match.lastgroup[1:])]
+            violations.append(PolicyViolation(
+                rule_id=self.id,
+                rule_name=self.name,
+                severity=self.severity,
+                message=f"Intent contains potentially dangerous pattern: {pattern}",
+                suggestion="Rephrase your intent to be more specific and safe"
+            ))
         
         return violations
 
@@ -169,6 +212,14 @@ class BlockDangerousIntentsRule(PolicyRule):
 class NoEvalExecRule(PolicyRule):
     """Block eval() and exec() usage."""
     
+    # One pass over the whole code finds both calls
+    _CALL_RE = re.compile(r'\b(?P<eval>eval)\s*\(|\b(?P<exec>exec)\s*\(')
+    
+    _MESSAGES = {
+        "eval": ("Use of eval() is not allowed", "Use ast.literal_eval() for safe literal parsing"),
+        "exec": ("Use of exec() is not allowed", "Refactor to avoid dynamic code execution"),
+    }
+    
     @property
     def id(self) -> str:
         return "post-001"
@@ -186,33 +237,34 @@ class NoEvalExecRule(PolicyRule):
         return PolicySeverity.CRITICAL
     
     def check(self, content: str, context: Dict[str, Any]) -> List[PolicyViolation]:
-        violations = []
+        matches = list(self._CALL_RE.finditer(content))
+        if not matches:
+            return []
         
-        # Match eval/exec not in strings or comments
-        for i, line in enumerate(content.split('\n'), 1):
-            line_stripped = line.strip()
-            if line_stripped.startswith('#'):
+        # Offsets where each line starts, to map matches back to line numbers
+        line_starts = [0]
+        line_starts.extend(m.end() for m in re.finditer('\n', content))
+        
+        # Match eval/exec outside comment lines; at most one of each per line
+        found = set()
+        for match in matches:
+            line_no = bisect_right(line_starts, match.start())
+            start = line_starts[line_no - 1]
+            if content[start:match.start()].lstrip().startswith('#'):
                 continue
-            
-            if re.search(r'\beval\s*\(', line):
-                violations.append(PolicyViolation(
-                    rule_id=self.id,
-                    rule_name=self.name,
-                    severity=self.severity,
-                    message="Use of eval() is not allowed",
-                    location=f"line {i}",
-                    suggestion="Use ast.literal_eval() for safe literal parsing"
-                ))
-            
-            if re.search(r'\bexec\s*\(', line):
-                violations.append(PolicyViolation(
-                    rule_id=self.id,
-                    rule_name=self.name,
-                    severity=self.severity,
-                    message="Use of exec() is not allowed",
-                    location=f"line {i}",
-                    suggestion="Refactor to avoid dynamic code execution"
-                ))
+            found.add((line_no, match.lastgroup))
+        
+        violations = []
+        for line_no, call in sorted(found):
+            message, suggestion = self._MESSAGES[call]
+            violations.append(PolicyViolation(
+                rule_id=self.id,
+                rule_name=self.name,
+                severity=self.severity,
+                message=message,
+                location=f"line {line_no}",
+                suggestion=suggestion
+            ))
         
         return violations
 
@@ -283,6 +335,25 @@ class RequireTypeHintsRule(PolicyRule):
         return PolicySeverity.WARNING
     
     def check(self, content: str, context: Dict[str, Any]) -> List[PolicyViolation]:
+        tree = parse_code(content)
+        if tree is None:
+            return self._check_lines(content)
+        
+        return [
+            PolicyViolation(
+                rule_id=self.id,
+                rule_name=self.name,
+                severity=self.severity,
+                message=f"Function '{node.name}' is missing return type hint",
+                location=f"line {node.lineno}",
+                suggestion="Add return type, e.g., '-> str:' or '-> None:'"
+            )
+            for node in _function_defs(tree)
+            if node.returns is None
+        ]
+    
+    def _check_lines(self, content: str) -> List[PolicyViolation]:
+        """Line heuristic for code that does not parse."""
         violations = []
         
         # Simple heuristic: functions without -> return type
@@ -325,6 +396,26 @@ class MaxFunctionLengthRule(PolicyRule):
         return PolicySeverity.WARNING
     
     def check(self, content: str, context: Dict[str, Any]) -> List[PolicyViolation]:
+        tree = parse_code(content)
+        if tree is None:
+            return self._check_lines(content)
+        
+        violations = []
+        for node in _function_defs(tree):
+            length = node.end_lineno - node.lineno + 1
+            if length > self.MAX_LINES:
+                violations.append(PolicyViolation(
+                    rule_id=self.id,
+                    rule_name=self.name,
+                    severity=self.severity,
+                    message=f"Function '{node.name}' is {length} lines (max: {self.MAX_LINES})",
+                    location=f"line {node.lineno}",
+                    suggestion="Consider breaking into smaller functions"
+                ))
+        return violations
+    
+    def _check_lines(self, content: str) -> List[PolicyViolation]:
+        """Line heuristic for code that does not parse."""
         violations = []
         lines = content.split('\n')
         
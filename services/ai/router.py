@@ -8,8 +8,9 @@ Routes requests to optimal models based on intent complexity and cost constraint
 """
 import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from dataclasses import dataclass, field, replace
 from enum import Enum
 import time
 from threading import Lock
@@ -79,9 +80,13 @@ class LLMProvider(ABC):
 class MockProvider(LLMProvider):
     """Mock provider for testing without API keys."""
     
+    # Canned responses are memoized per (model, messages), LRU-bounded
+    RESPONSE_CACHE_SIZE = 1024
+    
     def __init__(self, name: str = "mock", latency_ms: float = 100):
         self._name = name
         self._latency = latency_ms
+        self._resp_cache: "OrderedDict[Tuple, ChatResponse]" = OrderedDict()
     
     @property
     def name(self) -> str:
@@ -92,8 +97,22 @@ class MockProvider(LLMProvider):
         return ["mock-fast", "mock-quality"]
     
     async def chat(self, request: ChatRequest) -> ChatResponse:
+        # The simulated latency is part of the mock, so hits still wait
         await asyncio.sleep(self._latency / 1000)
         
+        key = (request.model, tuple((m.role, m.content) for m in request.messages))
+        cached = self._resp_cache.get(key)
+        if cached is None:
+            cached = self._resp_cache[key] = self._build_response(request)
+            if len(self._resp_cache) > self.RESPONSE_CACHE_SIZE:
+                self._resp_cache.popitem(last=False)
+        else:
+            self._resp_cache.move_to_end(key)
+        
+        # Callers get their own copy to mutate
+        return replace(cached, usage=dict(cached.usage))
+    
+    def _build_response(self, request: ChatRequest) -> ChatResponse:
         # Generate mock response based on last message
         last_msg = request.messages[-1].content if request.messages else ""
         
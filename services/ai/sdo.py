@@ -2,12 +2,14 @@
 Semantic Development Object (SDO)
 The core unit of AXIOM's AI logic. Encapsulates intent, state, and generation history.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import List, Optional, Dict, Any, Union
 import time
 import hashlib
 from enum import Enum
 
+import orjson
+
 class SDOStatus(str, Enum):
     DRAFT = "draft"
     PARSING = "parsing"
@@ -80,6 +82,20 @@ class SDO(BaseModel):
     history: List[GenerationStep] = []
     created_at: float = Field(default_factory=time.time)
     updated_at: float = Field(default_factory=time.time)
+    
+    # Memoized JSON encoding, see to_json_bytes()
+    _json_bytes: Optional[bytes] = PrivateAttr(default=None)
+
+    def to_json_bytes(self, refresh: bool = False) -> bytes:
+        """
+        JSON-encode the SDO with orjson, reusing the previous encoding.
+        
+        Meant for finished SDOs that are published or logged several times.
+        Pass refresh=True if the SDO changed since the last call.
+        """
+        if self._json_bytes is None or refresh:
+            self._json_bytes = orjson.dumps(self.model_dump(mode="json"))
+        return self._json_bytes
 
     def add_step(self, step_type: str, content: Dict[str, Any], confidence: float, model: str):
         self.history.append(GenerationStep(
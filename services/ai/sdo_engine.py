@@ -60,7 +60,8 @@ class SDOEngine:
         enable_policy: bool = True,
 
         database_service: Any = None,
-        stream_callback: Any = None
+        stream_callback: Any = None,
+        orchestra: Optional[VerificationOrchestra] = None
     ):
         self.llm = llm_service
         self.knowledge = knowledge_service
@@ -68,7 +69,7 @@ class SDOEngine:
         self.stream_callback = stream_callback
 
         self.learner = LearnerModel(knowledge_service, llm_service, database_service) # Phase E
-        self.orchestra = VerificationOrchestra()
+        self.orchestra = orchestra or VerificationOrchestra()
         self.event_store: Optional[IVCUEventStore] = None
 
         
@@ -100,6 +101,9 @@ class SDOEngine:
         self._success_count = 0
         self._cache_hits = 0
         
+        # Fire-and-forget tasks (write-behind saves) kept alive until done
+        self._background_tasks: set = set()
+        
     def _init_rag(self):
         """Initialize Tier 3 Memory (GraphRAG)"""
         try:
@@ -837,9 +841,9 @@ class SDOEngine:
         )
         
         # 3. Retrieve relevant context (similar to standard flow but maybe focused on the difference)
-        # For now, reuse standard search
-        docs = await self.knowledge.search(prompt + " " + base_sdo.raw_intent)
-        variant_sdo.retrieved_context = [d.content for d in docs[:2]]
+        # For now, reuse standard search. The prompt below does not depend on it,
+        # so the search runs alongside the LLM call.
+        search_task = asyncio.create_task(self.knowledge.search(prompt + " " + base_sdo.raw_intent))
         
         # 4. Generate Code
         # We use a specific system prompt for counterfactuals to encourage exploration
@@ -863,7 +867,13 @@ class SDOEngine:
         Output the complete rewritten code.
         """
         
-        response = await self.llm.complete(user_prompt, system_prompt=system_prompt)
+        try:
+            response = await self.llm.complete(user_prompt, system_prompt=system_prompt)
+        except BaseException:
+            search_task.cancel()
+            raise
+        docs = await search_task
+        variant_sdo.retrieved_context = [d.content for d in docs[:2]]
         
         # 5. Create Candidate
         candidate = Candidate(
@@ -885,12 +895,28 @@ class SDOEngine:
         variant_sdo.code = candidate.code
         variant_sdo.status = SDOStatus.VERIFIED if vr.valid else SDOStatus.FAILED
         
-        # Persist
+        # Persist in the background (write-behind); the variant is returned immediately
         if self.db:
-            await self.db.save_sdo(variant_sdo.model_dump())
+            self._spawn_background(
+                self.db.save_sdo(variant_sdo.model_dump()),
+                f"save counterfactual {variant_sdo.id}"
+            )
             
         return variant_sdo
     
+    def _spawn_background(self, coro, label: str) -> asyncio.Task:
+        """Run a coroutine without awaiting it, logging any failure."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        
+        def _done(t: asyncio.Task):
+            self._background_tasks.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                print(f"SDO_ENGINE: Background task failed ({label}): {t.exception()}")
+        
+        task.add_done_callback(_done)
+        return task
+    
     def _get_intent_type(self, sdo: SDO) -> str:
         """Extract intent type for stats tracking."""
         if sdo.parsed_intent and isinstance(sdo.parsed_intent, dict):
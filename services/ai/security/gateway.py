@@ -8,13 +8,24 @@ Input/output filtering to ensure secure AI operations:
 - License compliance checking
 - Rate limiting
 """
+import logging
 import re
+import threading
 import time
 from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict
 
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    hyperscan = None
+    HYPERSCAN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 
 class ThreatLevel(str, Enum):
     """Threat severity levels."""
@@ -34,6 +45,16 @@ class FilterType(str, Enum):
     RATE_LIMIT = "rate_limit"
 
 
+# Severity rank for each threat level, used to pick the highest finding
+_THREAT_ORDER: Dict[ThreatLevel, int] = {
+    ThreatLevel.NONE: 0,
+    ThreatLevel.LOW: 1,
+    ThreatLevel.MEDIUM: 2,
+    ThreatLevel.HIGH: 3,
+    ThreatLevel.CRITICAL: 4,
+}
+
+
 @dataclass
 class SecurityFinding:
     """A security finding from filtering."""
@@ -52,17 +73,19 @@ class SecurityResult:
     findings: List[SecurityFinding] = field(default_factory=list)
     sanitized_content: Optional[str] = None
     processing_time_ms: float = 0.0
+    _highest: ThreatLevel = field(default=ThreatLevel.NONE, init=False, repr=False)
+    
+    def __post_init__(self):
+        # Findings are final once the result is built, so rank them once
+        self._highest = max(
+            (f.threat_level for f in self.findings),
+            key=_THREAT_ORDER.__getitem__,
+            default=ThreatLevel.NONE
+        )
     
     @property
     def highest_threat(self) -> ThreatLevel:
-        if not self.findings:
-            return ThreatLevel.NONE
-        levels = [ThreatLevel.NONE, ThreatLevel.LOW, ThreatLevel.MEDIUM, ThreatLevel.HIGH, ThreatLevel.CRITICAL]
-        max_level = ThreatLevel.NONE
-        for f in self.findings:
-            if levels.index(f.threat_level) > levels.index(max_level):
-                max_level = f.threat_level
-        return max_level
+        return self._highest
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -116,6 +139,21 @@ class SecurityGateway:
         "password_assignment": r'(?i)(password|passwd|pwd)\s*[:=]\s*[\'"][^\'"]+[\'"]',
     }
     
+    # Literals every match of a secret pattern must contain. Checked with
+    # plain substring tests before the regex runs; lowercase literals are
+    # matched against lowercased content for the (?i) patterns.
+    SECRET_LITERALS = {
+        "aws_key": ("AKIA",),
+        "aws_secret": ("aws",),
+        "github_token": ("ghp_", "gho_", "ghu_", "ghs_", "ghr_"),
+        "google_api": ("AIza",),
+        "jwt": ("eyJ",),
+        "private_key": ("PRIVATE KEY",),
+        "slack_token": ("xox",),
+        "generic_api_key": ("api", "secret"),
+        "password_assignment": ("pass", "pwd"),
+    }
+    
     # Prompt Injection Patterns
     INJECTION_PATTERNS = [
         r'(?i)ignore\s+(previous|all|above)\s+instructions?',
@@ -134,6 +172,9 @@ class SecurityGateway:
         "copyleft": r'(?i)\bcopyleft\b',
     }
     
+    # Content shorter than this cannot match any pattern worth scanning for
+    MIN_SCAN_LENGTH = 4
+    
     def __init__(
         self,
         block_pii: bool = True,
@@ -156,6 +197,75 @@ class SecurityGateway:
             "pro": 100,
             "enterprise": 1000
         }
+        
+        # Optional Hyperscan database covering the secret and PII patterns
+        self._hs_keys: List[Tuple[FilterType, str]] = []
+        self._hs_db = self._build_hyperscan_db()
+        
+        # Combined output regexes keyed by the selected pattern set
+        self._output_regex_cache: Dict[Tuple[Tuple[str, str], ...], "re.Pattern"] = {}
+    
+    def _build_hyperscan_db(self):
+        """Compile secret and PII patterns into one Hyperscan database."""
+        if not HYPERSCAN_AVAILABLE:
+            return None
+        
+        expressions, flags = [], []
+        keys: List[Tuple[FilterType, str]] = []
+        for filter_type, patterns in (
+            (FilterType.SECRETS, self.SECRET_PATTERNS),
+            (FilterType.PII, self.PII_PATTERNS),
+        ):
+            for name, pattern in patterns.items():
+                # UCP gives \d and \w the Unicode meaning they have in re. It
+                # does not support \b, so drop word boundaries: the scan only
+                # picks candidates and re confirms them, so looser is safe.
+                flag = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+                if pattern.startswith("(?i)"):
+                    pattern = pattern[4:]
+                    flag |= hyperscan.HS_FLAG_CASELESS
+                pattern = pattern.replace(r"\b", "")
+                expressions.append(pattern.encode())
+                flags.append(flag)
+                keys.append((filter_type, name))
+        
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=expressions,
+                ids=list(range(len(expressions))),
+                elements=len(expressions),
+                flags=flags
+            )
+        except Exception as e:
+            logger.warning("Hyperscan compile failed, using re: %s", e)
+            return None
+        
+        self._hs_keys = keys
+        return db
+    
+    def _scan_candidates(self, content: str) -> Optional[set]:
+        """
+        Return the (filter_type, name) pairs whose pattern occurs in content.
+        
+        Hyperscan only tells us which patterns match; exact spans still come
+        from ``re`` so findings and masking are unchanged. Returns None when
+        Hyperscan is unavailable or content is not valid UTF-8 (e.g. lone
+        surrogates), so the caller falls back to ``re`` for everything.
+        """
+        if self._hs_db is None:
+            return None
+        
+        matched: set = set()
+        
+        def _collect(pattern_id, start, end, flags, context):
+            matched.add(self._hs_keys[pattern_id])
+        
+        try:
+            self._hs_db.scan(content.encode("utf-8"), match_event_handler=_collect)
+        except Exception:
+            return None
+        return matched
     
     def check_input(
         self,
@@ -186,16 +296,17 @@ class SecurityGateway:
             if rate_result:
                 findings.append(rate_result)
         
-        # 2. Prompt injection detection
-        if self.block_injection:
-            injection_findings = self._detect_injection(content)
-            findings.extend(injection_findings)
-        
-        # 3. PII detection (warn, don't block inputs)
-        pii_findings = self._detect_pii(content)
-        for f in pii_findings:
-            f.threat_level = ThreatLevel.LOW  # Downgrade for inputs
-        findings.extend(pii_findings)
+        if content and len(content) >= self.MIN_SCAN_LENGTH:
+            # 2. Prompt injection detection
+            if self.block_injection:
+                injection_findings = self._detect_injection(content)
+                findings.extend(injection_findings)
+            
+            # 3. PII detection (warn, don't block inputs)
+            pii_findings = self._detect_pii(content, self._scan_candidates(content))
+            for f in pii_findings:
+                f.threat_level = ThreatLevel.LOW  # Downgrade for inputs
+            findings.extend(pii_findings)
         
         # Determine if allowed
         critical_findings = [f for f in findings if f.threat_level in [ThreatLevel.HIGH, ThreatLevel.CRITICAL]]
@@ -226,23 +337,16 @@ class SecurityGateway:
             SecurityResult with findings and sanitized content
         """
         start_time = time.time()
-        findings = []
-        sanitized = content
+        if not content or len(content) < self.MIN_SCAN_LENGTH:
+            # Nothing this short can carry a secret, PII or license text
+            return SecurityResult(
+                allowed=True,
+                sanitized_content=content,
+                processing_time_ms=(time.time() - start_time) * 1000
+            )
         
-        # 1. Secret detection (critical)
-        if self.block_secrets:
-            secret_findings, sanitized = self._detect_and_mask_secrets(sanitized, mask_secrets)
-            findings.extend(secret_findings)
-        
-        # 2. PII detection
-        if self.block_pii:
-            pii_findings, sanitized = self._detect_and_mask_pii(sanitized, mask_pii)
-            findings.extend(pii_findings)
-        
-        # 3. License compliance
-        if self.check_license:
-            license_findings = self._check_license_compliance(content)
-            findings.extend(license_findings)
+        # Secrets (critical), PII and license compliance in one combined scan
+        findings, sanitized = self._scan_output(content, mask_pii, mask_secrets)
         
         # Always allow outputs but include warnings
         return SecurityResult(
@@ -267,10 +371,19 @@ class SecurityGateway:
                 ))
         return findings
     
-    def _detect_pii(self, content: str) -> List[SecurityFinding]:
+    @staticmethod
+    def _may_contain_pii(content: str) -> bool:
+        """Every PII pattern needs either an '@' or a digit to match."""
+        return "@" in content or any(c.isdigit() for c in content)
+    
+    def _detect_pii(self, content: str, candidates: Optional[set] = None) -> List[SecurityFinding]:
         """Detect PII patterns."""
         findings = []
+        if not self._may_contain_pii(content):
+            return findings
         for pii_type, pattern in self.PII_PATTERNS.items():
+            if candidates is not None and (FilterType.PII, pii_type) not in candidates:
+                continue
             matches = re.finditer(pattern, content)
             for match in matches:
                 findings.append(SecurityFinding(
@@ -282,59 +395,110 @@ class SecurityGateway:
                 ))
         return findings
     
-    def _detect_and_mask_pii(self, content: str, mask: bool) -> Tuple[List[SecurityFinding], str]:
-        """Detect and optionally mask PII."""
-        findings = []
-        sanitized = content
+    def _output_patterns(self, content: str) -> Tuple[Tuple[str, str], ...]:
+        """
+        Pick the output patterns worth running against content.
         
-        for pii_type, pattern in self.PII_PATTERNS.items():
-            matches = list(re.finditer(pattern, content))
-            for match in matches:
-                findings.append(SecurityFinding(
-                    filter_type=FilterType.PII,
-                    threat_level=ThreatLevel.MEDIUM,
-                    description=f"Found {pii_type.replace('_', ' ')}",
-                    location=f"Position {match.start()}-{match.end()}",
-                    masked_content=f"[{pii_type.upper()}_MASKED]"
-                ))
-                if mask:
-                    sanitized = sanitized.replace(match.group(), f"[{pii_type.upper()}_MASKED]")
+        Returns (group_name, pattern) pairs; group names are prefixed with
+        their category (sec_/pii_/lic_). Secret patterns are narrowed by the
+        Hyperscan candidates or, failing that, the literal prefilter.
+        """
+        candidates = self._scan_candidates(content)
+        selected: List[Tuple[str, str]] = []
         
-        return findings, sanitized
+        if self.block_secrets:
+            lowered = content.lower() if candidates is None else content
+            for secret_type, pattern in self.SECRET_PATTERNS.items():
+                if candidates is not None:
+                    if (FilterType.SECRETS, secret_type) not in candidates:
+                        continue
+                else:
+                    haystack = lowered if pattern.startswith("(?i)") else content
+                    literals = self.SECRET_LITERALS.get(secret_type)
+                    if literals and not any(lit in haystack for lit in literals):
+                        continue
+                selected.append((f"sec_{secret_type}", pattern))
+        
+        if self.block_pii and self._may_contain_pii(content):
+            for pii_type, pattern in self.PII_PATTERNS.items():
+                if candidates is not None and (FilterType.PII, pii_type) not in candidates:
+                    continue
+                selected.append((f"pii_{pii_type}", pattern))
+        
+        if self.check_license:
+            for license_type, pattern in self.LICENSE_PATTERNS.items():
+                selected.append((f"lic_{license_type}", pattern))
+        
+        return tuple(selected)
     
-    def _detect_and_mask_secrets(self, content: str, mask: bool) -> Tuple[List[SecurityFinding], str]:
-        """Detect and optionally mask secrets."""
-        findings = []
-        sanitized = content
+    def _output_regex(self, patterns: Tuple[Tuple[str, str], ...]) -> "re.Pattern":
+        """Compile (and cache) one alternation over the selected patterns."""
+        regex = self._output_regex_cache.get(patterns)
+        if regex is None:
+            parts = []
+            for name, pattern in patterns:
+                # Inline flags are only legal at the start of a whole regex,
+                # so scope them to the group
+                if pattern.startswith("(?i)"):
+                    pattern = f"(?i:{pattern[4:]})"
+                parts.append(f"(?P<{name}>{pattern})")
+            regex = re.compile("|".join(parts))
+            self._output_regex_cache[patterns] = regex
+        return regex
+    
+    def _scan_output(
+        self,
+        content: str,
+        mask_pii: bool,
+        mask_secrets: bool
+    ) -> Tuple[List[SecurityFinding], str]:
+        """Detect secrets, PII and license text and mask in a single pass."""
+        findings: List[SecurityFinding] = []
+        patterns = self._output_patterns(content)
+        if not patterns:
+            return findings, content
         
-        for secret_type, pattern in self.SECRET_PATTERNS.items():
-            matches = list(re.finditer(pattern, content))
-            for match in matches:
+        licenses_seen = set()
+        
+        def _handle(match: "re.Match") -> str:
+            category, name = match.lastgroup.split("_", 1)
+            location = f"Position {match.start()}-{match.end()}"
+            
+            if category == "sec":
                 findings.append(SecurityFinding(
                     filter_type=FilterType.SECRETS,
                     threat_level=ThreatLevel.CRITICAL,
-                    description=f"Potential {secret_type.replace('_', ' ')} detected",
-                    location=f"Position {match.start()}-{match.end()}",
+                    description=f"Potential {name.replace('_', ' ')} detected",
+                    location=location,
                     suggestion="This secret should be removed from the output",
                     masked_content="[SECRET_REDACTED]"
                 ))
-                if mask:
-                    sanitized = sanitized.replace(match.group(), "[SECRET_REDACTED]")
-        
-        return findings, sanitized
-    
-    def _check_license_compliance(self, content: str) -> List[SecurityFinding]:
-        """Check for potential license compliance issues."""
-        findings = []
-        for license_type, pattern in self.LICENSE_PATTERNS.items():
-            if re.search(pattern, content):
+                return "[SECRET_REDACTED]" if mask_secrets else match.group()
+            
+            if category == "pii":
+                masked = f"[{name.upper()}_MASKED]"
+                findings.append(SecurityFinding(
+                    filter_type=FilterType.PII,
+                    threat_level=ThreatLevel.MEDIUM,
+                    description=f"Found {name.replace('_', ' ')}",
+                    location=location,
+                    masked_content=masked
+                ))
+                return masked if mask_pii else match.group()
+            
+            # License text is reported once per license and never masked
+            if name not in licenses_seen:
+                licenses_seen.add(name)
                 findings.append(SecurityFinding(
                     filter_type=FilterType.LICENSE,
                     threat_level=ThreatLevel.LOW,
-                    description=f"Code may contain {license_type.upper()} licensed content",
+                    description=f"Code may contain {name.upper()} licensed content",
                     suggestion="Review license compatibility with your project"
                 ))
-        return findings
+            return match.group()
+        
+        sanitized = self._output_regex(patterns).sub(_handle, content)
+        return findings, sanitized
     
     def _check_rate_limit(self, user_id: str, plan: str) -> Optional[SecurityFinding]:
         """Check rate limits for a user."""
@@ -364,11 +528,14 @@ class SecurityGateway:
 
 # Singleton instance
 _security_gateway: Optional[SecurityGateway] = None
+_gateway_lock = threading.Lock()
 
 
 def get_security_gateway() -> SecurityGateway:
-    """Get or create security gateway singleton."""
+    """Get or create security gateway singleton (thread-safe)."""
     global _security_gateway
     if _security_gateway is None:
-        _security_gateway = SecurityGateway()
+        with _gateway_lock:
+            if _security_gateway is None:
+                _security_gateway = SecurityGateway()
     return _security_gateway
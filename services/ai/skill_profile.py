@@ -13,11 +13,17 @@ The profile learns from:
 - Verification preferences
 - Error recovery patterns
 """
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import ClassVar, Dict, List, Any, Optional
 from enum import Enum
+import asyncio
+import bisect
+import heapq
 import math
+import time
 
 
 class SkillLevel(str, Enum):
@@ -28,6 +34,21 @@ class SkillLevel(str, Enum):
     EXPERT = "expert"           # Deep expertise
 
 
+# Score cut-offs between consecutive skill levels (0-100 scale)
+_SCORE_THRESHOLDS = (40, 65, 85)
+_LEVEL_BY_IDX = (
+    SkillLevel.NOVICE,
+    SkillLevel.INTERMEDIATE,
+    SkillLevel.ADVANCED,
+    SkillLevel.EXPERT,
+)
+
+
+def level_for_score(score: float) -> SkillLevel:
+    """Map a 0-100 score onto its skill level."""
+    return _LEVEL_BY_IDX[bisect.bisect_right(_SCORE_THRESHOLDS, score)]
+
+
 class SkillDomain(str, Enum):
     """Domains for skill tracking."""
     INTENT_AUTHORING = "intent_authoring"
@@ -40,7 +61,15 @@ class SkillDomain(str, Enum):
     PERFORMANCE = "performance"
 
 
-@dataclass
+def _parse_timestamp(value: str) -> float:
+    """Epoch seconds from a to_dict() ISO timestamp; naive values are UTC."""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+@dataclass(slots=True)
 class DomainSkill:
     """Skill level for a specific domain."""
     domain: SkillDomain
@@ -48,10 +77,10 @@ class DomainSkill:
     score: float = 0.0  # 0-100
     confidence: float = 0.5  # How confident we are in this assessment
     sample_count: int = 0  # Number of samples used for assessment
-    last_updated: datetime = field(default_factory=datetime.utcnow)
+    last_updated: float = field(default_factory=time.time)  # epoch seconds
     
-    # Learning rate params (exponential moving average)
-    learning_rate: float = 0.1
+    # Learning rate params (exponential moving average), shared by all skills
+    learning_rate: ClassVar[float] = 0.1
     
     def update_score(self, performance_signal: float):
         """
@@ -67,16 +96,9 @@ class DomainSkill:
         self.score = (1 - self.learning_rate) * self.score + self.learning_rate * performance_signal
         
         # Update level based on score
-        if self.score >= 85:
-            self.level = SkillLevel.EXPERT
-        elif self.score >= 65:
-            self.level = SkillLevel.ADVANCED
-        elif self.score >= 40:
-            self.level = SkillLevel.INTERMEDIATE
-        else:
-            self.level = SkillLevel.NOVICE
+        self.level = level_for_score(self.score)
         
-        self.last_updated = datetime.utcnow()
+        self.last_updated = time.time()
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -85,11 +107,23 @@ class DomainSkill:
             "score": round(self.score, 2),
             "confidence": round(self.confidence, 2),
             "sample_count": self.sample_count,
-            "last_updated": self.last_updated.isoformat()
+            "last_updated": datetime.fromtimestamp(self.last_updated, timezone.utc).isoformat()
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DomainSkill":
+        """Rebuild a skill from its to_dict() form."""
+        return cls(
+            domain=SkillDomain(data["domain"]),
+            level=SkillLevel(data["level"]),
+            score=data["score"],
+            confidence=data["confidence"],
+            sample_count=data["sample_count"],
+            last_updated=_parse_timestamp(data["last_updated"])
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class UserSkillProfile:
     """
     Complete user skill profile for adaptive UI.
@@ -97,10 +131,30 @@ class UserSkillProfile:
     Tracks expertise across domains and provides recommendations
     for UI complexity and feature exposure.
     """
+    # Per-level UI settings
+    INTERFACE_COMPLEXITY = {
+        SkillLevel.NOVICE: "simplified",
+        SkillLevel.INTERMEDIATE: "standard",
+        SkillLevel.ADVANCED: "full",
+        SkillLevel.EXPERT: "power",
+    }
+    VERIFICATION_DETAIL = {
+        SkillLevel.NOVICE: "summary",
+        SkillLevel.INTERMEDIATE: "standard",
+        SkillLevel.ADVANCED: "detailed",
+        SkillLevel.EXPERT: "detailed",
+    }
+    CODE_COMPLEXITY_LIMITS = {
+        SkillLevel.NOVICE: 10,
+        SkillLevel.INTERMEDIATE: 25,
+        SkillLevel.ADVANCED: 50,
+        SkillLevel.EXPERT: 100,
+    }
+    
     user_id: str
     org_id: str
     
-    # Per-domain skills
+    # Per-domain skills, created lazily on first update
     skills: Dict[SkillDomain, DomainSkill] = field(default_factory=dict)
     
     # Overall level (computed from domain skills)
@@ -113,56 +167,58 @@ class UserSkillProfile:
     # Feature usage tracking
     feature_usage: Dict[str, int] = field(default_factory=dict)
     
-    # Timestamps
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    # Timestamps (epoch seconds, rendered as ISO in to_dict)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    
+    # Running totals behind the weighted overall score
+    _weighted_sum: float = field(default=0.0, init=False, repr=False)
+    _total_weight: float = field(default=0.0, init=False, repr=False)
+    
+    # Last get_ui_recommendations() result, cleared whenever a skill changes
+    _recommendations: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
     
     def __post_init__(self):
-        # Initialize all domain skills if not present
-        for domain in SkillDomain:
-            if domain not in self.skills:
-                self.skills[domain] = DomainSkill(domain=domain)
+        for skill in self.skills.values():
+            weight = skill.confidence * skill.sample_count
+            self._weighted_sum += skill.score * weight
+            self._total_weight += weight
     
     def update_skill(self, domain: SkillDomain, performance_signal: float):
         """Update a specific domain skill."""
         if domain not in self.skills:
             self.skills[domain] = DomainSkill(domain=domain)
         
-        self.skills[domain].update_score(performance_signal)
+        skill = self.skills[domain]
+        old_weight = skill.confidence * skill.sample_count
+        old_contrib = skill.score * old_weight
+        
+        skill.update_score(performance_signal)
+        
+        new_weight = skill.confidence * skill.sample_count
+        self._weighted_sum += skill.score * new_weight - old_contrib
+        self._total_weight += new_weight - old_weight
+        
         self._recalculate_overall()
-        self.updated_at = datetime.utcnow()
+        self._recommendations = None
+        self.updated_at = time.time()
     
     def _recalculate_overall(self):
-        """Recalculate overall skill level from domain skills."""
+        """Recalculate overall skill level from the running domain totals."""
         if not self.skills:
             return
         
         # Weighted average (give more weight to high-confidence skills)
-        total_weight = 0.0
-        weighted_sum = 0.0
-        
-        for skill in self.skills.values():
-            weight = skill.confidence * skill.sample_count
-            weighted_sum += skill.score * weight
-            total_weight += weight
-        
-        if total_weight > 0:
-            self.overall_score = weighted_sum / total_weight
+        if self._total_weight > 0:
+            self.overall_score = self._weighted_sum / self._total_weight
         
         # Determine overall level
-        if self.overall_score >= 85:
-            self.overall_level = SkillLevel.EXPERT
-        elif self.overall_score >= 65:
-            self.overall_level = SkillLevel.ADVANCED
-        elif self.overall_score >= 40:
-            self.overall_level = SkillLevel.INTERMEDIATE
-        else:
-            self.overall_level = SkillLevel.NOVICE
+        self.overall_level = level_for_score(self.overall_score)
     
     def record_feature_usage(self, feature_name: str):
         """Record usage of a feature."""
         self.feature_usage[feature_name] = self.feature_usage.get(feature_name, 0) + 1
-        self.updated_at = datetime.utcnow()
+        self.updated_at = time.time()
     
     def get_ui_recommendations(self) -> Dict[str, Any]:
         """
@@ -173,8 +229,20 @@ class UserSkillProfile:
         - Feature visibility
         - Help level
         - Suggested tutorials
+        
+        The result is cached until a skill changes; callers get their own
+        copy, including the suggestion list.
         """
-        recommendations = {
+        if self._recommendations is None:
+            self._recommendations = self._build_recommendations()
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in self._recommendations.items()
+        }
+    
+    def _build_recommendations(self) -> Dict[str, Any]:
+        """Compute UI recommendations from the current skills."""
+        return {
             "interface_complexity": self._get_complexity_level(),
             "show_advanced_features": self.overall_level in [SkillLevel.ADVANCED, SkillLevel.EXPERT],
             "show_tutorials": self.overall_level in [SkillLevel.NOVICE, SkillLevel.INTERMEDIATE],
@@ -190,19 +258,10 @@ class UserSkillProfile:
             # Suggested next steps
             "suggested_learning": self._get_learning_suggestions(),
         }
-        
-        return recommendations
     
     def _get_complexity_level(self) -> str:
         """Get recommended interface complexity."""
-        if self.overall_level == SkillLevel.NOVICE:
-            return "simplified"
-        elif self.overall_level == SkillLevel.INTERMEDIATE:
-            return "standard"
-        elif self.overall_level == SkillLevel.ADVANCED:
-            return "full"
-        else:
-            return "power"
+        return self.INTERFACE_COMPLEXITY.get(self.overall_level, "power")
     
     def _get_verification_detail_level(self) -> str:
         """Get verification detail level based on verification skill."""
@@ -210,35 +269,23 @@ class UserSkillProfile:
         if not verification_skill:
             return "summary"
         
-        if verification_skill.level in [SkillLevel.ADVANCED, SkillLevel.EXPERT]:
-            return "detailed"
-        elif verification_skill.level == SkillLevel.INTERMEDIATE:
-            return "standard"
-        else:
-            return "summary"
+        return self.VERIFICATION_DETAIL.get(verification_skill.level, "summary")
     
     def _get_code_complexity_limit(self) -> int:
         """Get recommended max code complexity."""
-        complexity_map = {
-            SkillLevel.NOVICE: 10,
-            SkillLevel.INTERMEDIATE: 25,
-            SkillLevel.ADVANCED: 50,
-            SkillLevel.EXPERT: 100
-        }
-        return complexity_map.get(self.overall_level, 25)
+        return self.CODE_COMPLEXITY_LIMITS.get(self.overall_level, 25)
     
     def _get_learning_suggestions(self) -> List[str]:
         """Get suggested learning topics based on weak areas."""
-        suggestions = []
-        
-        # Find domains with low scores
-        for domain, skill in sorted(self.skills.items(), key=lambda x: x[1].score):
-            if skill.score < 50 and skill.sample_count > 5:
-                suggestions.append(f"Practice {domain.value.replace('_', ' ')}")
-                if len(suggestions) >= 3:
-                    break
-        
-        return suggestions
+        # Find the three weakest domains with enough samples
+        candidates = [
+            (domain, skill) for domain, skill in self.skills.items()
+            if skill.score < 50 and skill.sample_count > 5
+        ]
+        return [
+            f"Practice {domain.value.replace('_', ' ')}"
+            for domain, skill in heapq.nsmallest(3, candidates, key=lambda x: x[1].score)
+        ]
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -250,33 +297,137 @@ class UserSkillProfile:
             "preferences": self.preferences,
             "feature_usage": self.feature_usage,
             "ui_recommendations": self.get_ui_recommendations(),
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
+            "created_at": datetime.fromtimestamp(self.created_at, timezone.utc).isoformat(),
+            "updated_at": datetime.fromtimestamp(self.updated_at, timezone.utc).isoformat()
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UserSkillProfile":
+        """Rebuild a profile from its to_dict() form, as stored in skill_profiles."""
+        skills = [DomainSkill.from_dict(skill) for skill in data.get("skills", {}).values()]
+        profile = cls(
+            user_id=data["user_id"],
+            org_id=data["org_id"],
+            skills={skill.domain: skill for skill in skills},
+            preferences=dict(data.get("preferences", {})),
+            feature_usage=dict(data.get("feature_usage", {})),
+            created_at=_parse_timestamp(data["created_at"]),
+            updated_at=_parse_timestamp(data["updated_at"])
+        )
+        profile._recalculate_overall()
+        return profile
 
 
 class SkillProfileService:
     """
     Service for managing user skill profiles.
+    
+    Profiles live in a bounded LRU cache backed by the skill_profiles table:
+    a cache miss loads the stored profile. Updates mark a profile dirty and
+    are persisted in batches by flush() (write-behind) rather than on every
+    update. A dirty profile evicted from the cache stays in _dirty until it
+    is written, and a miss takes it back from there instead of reloading a
+    stale copy.
     """
     
-    def __init__(self, db_service=None):
+    def __init__(self, db_service=None, max_size: int = 10_000, flush_interval: float = 5.0):
         self.db = db_service
-        self._cache: Dict[str, UserSkillProfile] = {}
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._cache: "OrderedDict[str, UserSkillProfile]" = OrderedDict()
+        self._dirty: Dict[str, UserSkillProfile] = {}
+        self._flushing: Dict[str, UserSkillProfile] = {}
+        self._lock = Lock()
+        self._flush_task: Optional[asyncio.Task] = None
     
-    def get_profile(self, user_id: str, org_id: str) -> UserSkillProfile:
-        """Get or create a user skill profile."""
+    async def get_profile(self, user_id: str, org_id: str) -> UserSkillProfile:
+        """Get a user's skill profile: cached, else stored, else a new one."""
         cache_key = f"{org_id}:{user_id}"
         
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        with self._lock:
+            profile = self._cached(cache_key)
+        if profile is not None:
+            return profile
         
-        # Create new profile
-        profile = UserSkillProfile(user_id=user_id, org_id=org_id)
+        profile = await self._load(user_id, org_id) or UserSkillProfile(user_id=user_id, org_id=org_id)
+        with self._lock:
+            # A concurrent miss may have cached the profile while this one loaded
+            return self._cached(cache_key) or self._insert(cache_key, profile)
+    
+    def _cached(self, cache_key: str) -> Optional[UserSkillProfile]:
+        """Profile held in memory, including evicted unsaved ones (must hold lock)."""
+        profile = self._cache.get(cache_key)
+        if profile is not None:
+            self._cache.move_to_end(cache_key)
+            return profile
+        profile = self._dirty.get(cache_key) or self._flushing.get(cache_key)
+        if profile is not None:
+            self._insert(cache_key, profile)
+        return profile
+    
+    def _insert(self, cache_key: str, profile: UserSkillProfile) -> UserSkillProfile:
+        """Cache a profile, evicting the least recently used (must hold lock)."""
         self._cache[cache_key] = profile
+        while len(self._cache) > self.max_size:
+            # Dirty profiles stay referenced in _dirty until flushed
+            self._cache.popitem(last=False)
         return profile
     
-    def update_from_verification(
+    async def _load(self, user_id: str, org_id: str) -> Optional[UserSkillProfile]:
+        """Stored profile, if any. Errors propagate so a fresh profile never overwrites it."""
+        if self.db is None:
+            return None
+        data = await self.db.get_skill_profile(org_id, user_id)
+        return UserSkillProfile.from_dict(data) if data else None
+    
+    def _mark_dirty(self, profile: UserSkillProfile):
+        with self._lock:
+            self._dirty[f"{profile.org_id}:{profile.user_id}"] = profile
+    
+    async def flush(self) -> int:
+        """Persist all profiles changed since the last flush."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            self._flushing = dirty
+        
+        try:
+            if not dirty or self.db is None:
+                return 0
+            
+            for key, profile in dirty.items():
+                try:
+                    await self.db.save_skill_profile(profile.to_dict())
+                except Exception as e:
+                    print(f"Failed to persist skill profile {key}: {e}")
+                    with self._lock:
+                        self._dirty.setdefault(key, profile)
+            return len(dirty)
+        finally:
+            with self._lock:
+                self._flushing = {}
+    
+    def start_write_behind(self):
+        """Start the background flush loop on the running event loop."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def stop_write_behind(self):
+        """Stop the background flush loop and persist outstanding changes."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+    
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    async def update_from_verification(
         self,
         user_id: str,
         org_id: str,
@@ -284,15 +435,16 @@ class SkillProfileService:
         confidence: float
     ):
         """Update profile based on verification outcome."""
-        profile = self.get_profile(user_id, org_id)
+        profile = await self.get_profile(user_id, org_id)
         
         # Calculate performance signal
         signal = confidence * 100 if verification_passed else (1 - confidence) * 50
         
         profile.update_skill(SkillDomain.VERIFICATION, signal)
         profile.update_skill(SkillDomain.CODE_REVIEW, signal * 0.8)
+        self._mark_dirty(profile)
     
-    def update_from_intent(
+    async def update_from_intent(
         self,
         user_id: str,
         org_id: str,
@@ -300,31 +452,36 @@ class SkillProfileService:
         parse_success: bool
     ):
         """Update profile based on intent parsing."""
-        profile = self.get_profile(user_id, org_id)
+        profile = await self.get_profile(user_id, org_id)
         
         # Higher complexity successful intents = higher skill
         signal = min(100, intent_complexity * 10) if parse_success else 30
         
         profile.update_skill(SkillDomain.INTENT_AUTHORING, signal)
+        self._mark_dirty(profile)
     
-    def record_feature_use(
+    async def record_feature_use(
         self,
         user_id: str,
         org_id: str,
         feature: str
     ):
         """Record feature usage for learning preferences."""
-        profile = self.get_profile(user_id, org_id)
+        profile = await self.get_profile(user_id, org_id)
         profile.record_feature_usage(feature)
+        self._mark_dirty(profile)
 
 
 # Global service instance
 _skill_service: Optional[SkillProfileService] = None
+_skill_service_lock = Lock()
 
 
 def get_skill_service(db_service=None) -> SkillProfileService:
-    """Get or create the skill profile service."""
+    """Get or create the skill profile service (thread-safe)."""
     global _skill_service
     if _skill_service is None:
-        _skill_service = SkillProfileService(db_service)
+        with _skill_service_lock:
+            if _skill_service is None:
+                _skill_service = SkillProfileService(db_service)
     return _skill_service
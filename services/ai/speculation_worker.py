@@ -2,11 +2,11 @@
 import asyncio
 import os
 import signal
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from sdo_engine import SDOEngine
 from sdo import SDO
-from eventbus import EventBus
+from eventbus import JetStreamEventBus
 from economics import get_economics_service
 import uuid
 
@@ -16,39 +16,83 @@ class SpeculationWorker:
     when the system is idle or when probable intents are predicted.
     """
     
-    def __init__(self, sdo_engine: SDOEngine):
+    # Upper bound on triggers drained into one batch
+    MAX_BATCH = 16
+    
+    def __init__(self, sdo_engine: SDOEngine, num_workers: int = 2, queue_size: int = 256):
         self.engine = sdo_engine
-        self.bus = EventBus()
+        self.bus = JetStreamEventBus()
         self.running = False
+        self._stop_event = asyncio.Event()
+        
+        # Triggers are queued by the subscription callbacks and drained in batches
+        self.num_workers = num_workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._workers: List[asyncio.Task] = []
+        
+        # Caps speculations in flight on the shared engine to protect LLM budget
+        self._sem = asyncio.Semaphore(int(os.getenv("SPEC_CONCURRENCY", "4")))
         
     async def start(self):
         """Start the worker and subscriptions."""
-        await self.bus.connect()
+        if not await self.bus.connect():
+            return
         self.running = True
+        self._workers = [asyncio.create_task(self._drain()) for _ in range(self.num_workers)]
         
-        # Subscribe to speculation triggers
-        await self.bus.subscribe("speculation.trigger", self.handle_trigger)
-        await self.bus.subscribe("user.intent.predicted", self.handle_prediction)
+        # Subscribe to speculation triggers. No stream covers these subjects,
+        # so they are plain NATS subscriptions on the bus connection.
+        await self.bus._nc.subscribe("speculation.trigger", cb=self.handle_trigger)
+        await self.bus._nc.subscribe("user.intent.predicted", cb=self.handle_prediction)
         
         print("Speculation Worker started. Listening for events...")
         
-        # Keep alive
-        while self.running:
-            await asyncio.sleep(1)
+        # Keep alive until stop() is requested
+        await self._stop_event.wait()
             
     async def stop(self):
         """Stop the worker."""
         self.running = False
+        self._stop_event.set()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
         await self.bus.close()
         
     async def handle_trigger(self, msg):
-        """Handle manual or system trigger for speculation."""
+        """Handle manual or system trigger for speculation by queueing it."""
+        # Simple parsing, assuming JSON-like or just prompt text
+        # In real implementations, use properly typed messages
+        data = msg.data.decode()
+        print(f"Received speculation trigger: {data}")
         try:
-            data = msg.data.decode()
-            # Simple parsing, assuming JSON-like or just prompt text
-            # In real implementations, use properly typed messages
-            print(f"Received speculation trigger: {data}")
+            self._queue.put_nowait(data)
+        except asyncio.QueueFull:
+            print("Speculation queue full, dropping trigger.")
+    
+    async def _drain(self):
+        """Pull queued triggers in batches and run the distinct ones concurrently."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
             
+            # Identical prompts in the same burst only need one speculation
+            prompts = list(dict.fromkeys(batch))
+            try:
+                await asyncio.gather(*(self._run_one(p) for p in prompts))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _run_one(self, data: str):
+        """Run one speculative generation for a trigger payload."""
+        async with self._sem:
+            await self._speculate(data)
+    
+    async def _speculate(self, data: str):
+        try:
             # Create a speculative SDO
             sdo = SDO(
                 id=str(uuid.uuid4()),
@@ -64,8 +108,11 @@ class SpeculationWorker:
             
             if result.status == "verified":
                 print(f"Speculation successful! Generated candidate: {result.selected_candidate_id}")
-                # Publish success so main system can cache it
-                await self.bus.publish("speculation.success", str(result.model_dump_json()).encode())
+                # Publish success so main system can cache it; only wait on the
+                # bus when it cannot take the message immediately
+                payload = result.to_json_bytes()
+                if not self.bus.publish_nowait("speculation.success", payload):
+                    await self.bus.publish("speculation.success", payload)
             else:
                 print("Speculation failed or low confidence.")
                 
@@ -95,16 +142,27 @@ if __name__ == "__main__":
     
     engine = SDOEngine(llm_service=llm, enable_cache=True)
     
-    worker = SpeculationWorker(engine)
-    
-    loop = asyncio.get_event_loop()
+    async def main():
+        # Build the worker inside the running loop so its queue, semaphore
+        # and stop event all belong to it
+        worker = SpeculationWorker(engine)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker._stop_event.set)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(worker.start())
+        finally:
+            await worker.stop()
     
-    def signal_handler():
-        asyncio.create_task(worker.stop())
-        
-    loop.add_signal_handler(signal.SIGINT, signal_handler)
+    # uvloop (shipped with uvicorn[standard]) is a faster drop-in event loop
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     
     try:
-        loop.run_until_complete(worker.start())
+        asyncio.run(main())
     except KeyboardInterrupt:
         pass
@@ -3,62 +3,54 @@ Test suite for Thompson Sampling Bandit
 
 Tests the bandit algorithm for proper arm selection and learning behavior.
 """
+import importlib.util
 import unittest
 import sys
 import os
+
+import numpy as np
+import pytest
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from bandit import ThompsonBandit, Arm, GenerationStats, SpeculativeExecutor
+from bandit import ThompsonBandit, Arm, ArmView, GenerationStats, SpeculativeExecutor
 
 
-class TestArm(unittest.TestCase):
+class TestArm:
     """Test the Arm (bandit arm) class."""
     
     def test_arm_creation(self):
         arm = Arm(id="test", temperature=0.5, candidate_count=3)
-        self.assertEqual(arm.id, "test")
-        self.assertEqual(arm.temperature, 0.5)
-        self.assertEqual(arm.candidate_count, 3)
-        self.assertEqual(arm.alpha, 1.0)  # Prior
-        self.assertEqual(arm.beta, 1.0)   # Prior
-    
-    def test_arm_update_success(self):
+        assert arm.id == "test"
+        assert arm.temperature == 0.5
+        assert arm.candidate_count == 3
+        assert arm.alpha == 1.0  # Prior
+        assert arm.beta == 1.0   # Prior
+    
+    @pytest.mark.parametrize("reward,exp_alpha,exp_beta", [
+        (1.0, 2.0, 1.0),  # Full success
+        (0.0, 1.0, 2.0),  # Full failure
+        (0.7, 1.7, 1.3),  # Partial success
+    ])
+    def test_arm_update(self, reward, exp_alpha, exp_beta):
         arm = Arm(id="test", temperature=0.5, candidate_count=3)
-        arm.update(reward=1.0)  # Full success
+        arm.update(reward=reward)
         
-        self.assertEqual(arm.total_trials, 1)
-        self.assertEqual(arm.alpha, 2.0)  # 1 + 1
-        self.assertEqual(arm.beta, 1.0)   # 1 + 0
-    
-    def test_arm_update_failure(self):
-        arm = Arm(id="test", temperature=0.5, candidate_count=3)
-        arm.update(reward=0.0)  # Full failure
-        
-        self.assertEqual(arm.total_trials, 1)
-        self.assertEqual(arm.alpha, 1.0)  # 1 + 0
-        self.assertEqual(arm.beta, 2.0)   # 1 + 1
-    
-    def test_arm_update_partial(self):
-        arm = Arm(id="test", temperature=0.5, candidate_count=3)
-        arm.update(reward=0.7)  # Partial success
-        
-        self.assertEqual(arm.total_trials, 1)
-        self.assertAlmostEqual(arm.alpha, 1.7)  # 1 + 0.7
-        self.assertAlmostEqual(arm.beta, 1.3)   # 1 + 0.3
+        assert arm.total_trials == 1
+        assert arm.alpha == pytest.approx(exp_alpha)
+        assert arm.beta == pytest.approx(exp_beta)
     
     def test_arm_sample_in_range(self):
         arm = Arm(id="test", temperature=0.5, candidate_count=3)
-        for _ in range(100):
-            sample = arm.sample()
-            self.assertGreaterEqual(sample, 0.0)
-            self.assertLessEqual(sample, 1.0)
+        samples = np.asarray([arm.sample() for _ in range(100)])
+        assert ((samples >= 0.0) & (samples <= 1.0)).all()
     
     def test_arm_mean_calculation(self):
         arm = Arm(id="test", temperature=0.5, candidate_count=3)
-        self.assertEqual(arm.mean, 0.5)  # alpha / (alpha + beta) = 1/2
+        assert arm.mean == 0.5  # alpha / (alpha + beta) = 1/2
         
         arm.update(1.0)  # Alpha becomes 2
-        self.assertAlmostEqual(arm.mean, 2/3)  # 2 / 3
+        assert arm.mean == pytest.approx(2/3)  # 2 / 3
 
 
 class TestThompsonBandit(unittest.TestCase):
@@ -74,9 +66,20 @@ class TestThompsonBandit(unittest.TestCase):
         bandit = ThompsonBandit()
         arm = bandit.select_arm()
         
-        self.assertIsInstance(arm, Arm)
+        self.assertIsInstance(arm, ArmView)
         self.assertIn(arm.id, bandit.arms)
     
+    def test_bandit_select_arms_batch(self):
+        bandit = ThompsonBandit()
+        bandit.arms["balanced_3"].alpha = 500.0  # Near-certain winner
+        
+        chosen = bandit.select_arms_batch(20)
+        
+        self.assertEqual(len(chosen), 20)
+        self.assertTrue(all(arm_id in bandit.arms for arm_id in chosen))
+        self.assertEqual(chosen.count("balanced_3"), 20)
+        self.assertEqual(bandit.select_arms_batch(0), [])
+    
     def test_bandit_update(self):
         bandit = ThompsonBandit()
         arm = bandit.select_arm()
@@ -87,6 +90,18 @@ class TestThompsonBandit(unittest.TestCase):
         self.assertEqual(arm.total_trials, initial_trials + 1)
         self.assertEqual(bandit.stats.total_generations, 1)
     
+    def test_bandit_mean_tracks_updates(self):
+        bandit = ThompsonBandit()
+        arm = bandit.arms["balanced_3"]
+        self.assertEqual(arm.mean, 0.5)
+        
+        bandit.update("balanced_3", reward=1.0)
+        self.assertAlmostEqual(arm.mean, 2/3)
+        
+        arm.beta = 6.0
+        self.assertAlmostEqual(arm.mean, 0.25)
+        self.assertEqual(bandit.get_arm_stats()[-1]["id"], "balanced_3")
+    
     def test_bandit_convergence(self):
         """Test that bandit learns to prefer the best arm."""
         bandit = ThompsonBandit()
@@ -109,6 +124,18 @@ class TestThompsonBandit(unittest.TestCase):
         balanced_3_mean = bandit.arms["balanced_3"].mean
         self.assertGreater(balanced_3_mean, 0.5, "balanced_3 should have learned high value")
     
+    def test_bandit_simulate(self):
+        bandit = ThompsonBandit()
+        means = {arm_id: 0.1 for arm_id in bandit.arms}
+        means["balanced_3"] = 0.9
+        
+        result = bandit.simulate(means, rounds=2000, seed=7)
+        
+        self.assertEqual(sum(r["selections"] for r in result.values()), 2000)
+        best = max(result, key=lambda arm_id: result[arm_id]["selections"])
+        self.assertEqual(best, "balanced_3")
+        self.assertEqual(bandit.arms["balanced_3"].total_trials, 0)  # Bandit untouched
+    
     def test_bandit_stats_tracking(self):
         bandit = ThompsonBandit()
         
@@ -123,6 +150,44 @@ class TestThompsonBandit(unittest.TestCase):
         self.assertIn("modify", bandit.stats.intent_type_stats)
 
 
+class TestSimulate:
+    """Test offline simulation with and without the Numba kernel."""
+    
+    @pytest.fixture(params=["default", "no_numba"])
+    def bandit_module(self, request, monkeypatch):
+        if request.param == "default":
+            return sys.modules[ThompsonBandit.__module__]
+        # Load a separate copy with numba hidden to exercise the NumPy kernel
+        monkeypatch.setitem(sys.modules, "numba", None)
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bandit.py")
+        spec = importlib.util.spec_from_file_location("bandit_no_numba", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        assert not module.NUMBA_AVAILABLE
+        return module
+    
+    def test_simulate_leaves_global_random_state(self, bandit_module):
+        bandit = bandit_module.ThompsonBandit()
+        means = {arm_id: 0.5 for arm_id in bandit.arms}
+        np.random.seed(123)
+        expected = np.random.random()
+        
+        np.random.seed(123)
+        first = bandit.simulate(means, rounds=200, seed=7)
+        assert np.random.random() == expected
+        assert bandit.simulate(means, rounds=200, seed=7) == first
+    
+    def test_simulate_converges(self, bandit_module):
+        bandit = bandit_module.ThompsonBandit()
+        means = {arm_id: 0.1 for arm_id in bandit.arms}
+        means["balanced_3"] = 0.9
+        
+        result = bandit.simulate(means, rounds=2000, seed=7)
+        
+        assert sum(r["selections"] for r in result.values()) == 2000
+        assert max(result, key=lambda arm_id: result[arm_id]["selections"]) == "balanced_3"
+
+
 class TestGenerationStats(unittest.TestCase):
     """Test the GenerationStats class."""
     
@@ -175,5 +240,5 @@ if __name__ == "__main__":
     print("=" * 60)
     print()
     
-    # Run tests
-    unittest.main(verbosity=2)
+    # Run tests (pytest collects both the pytest-style and unittest classes)
+    sys.exit(pytest.main(["-v", __file__]))
@@ -13,6 +13,9 @@ import sys
 import os
 import time
 import traceback
+
+import pytest
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import all modules
@@ -29,6 +32,27 @@ from policy import PolicyEngine, check_code, check_intent
 from knowledge import KnowledgeService
 
 
+# Steps that call a live provider need a key; the full flow also runs under AXIOM_TEST_MOCK
+_HAS_KEY = bool(os.getenv("OPENAI_API_KEY"))
+
+
+def _require_llm(allow_mock: bool = False):
+    """Skip the calling test fast instead of paying LLM init and retry timeouts offline."""
+    if not _HAS_KEY and not (allow_mock and os.getenv("AXIOM_TEST_MOCK")):
+        pytest.skip("no API key, skipping live LLM tests")
+
+
+# Shared across phases: the orchestra sets up every verifier tier (and the
+# tier 1 gRPC channel), so build it once per run rather than once per test
+_ORCHESTRA = None
+
+
+def _get_orchestra() -> VerificationOrchestra:
+    global _ORCHESTRA
+    _ORCHESTRA = _ORCHESTRA or VerificationOrchestra()
+    return _ORCHESTRA
+
+
 def print_header(title: str):
     print("\n" + "=" * 60)
     print(f"  {title}")
@@ -41,6 +65,7 @@ def print_step(step: str, status: str = "..."):
 
 async def test_phase1_foundation():
     """Test Phase 1: Foundation components."""
+    # Builds LLMService and MemoryService but never calls a provider, so it runs offline
     print_header("PHASE 1: Foundation")
     results = {"passed": 0, "failed": 0}
     
@@ -83,7 +108,7 @@ async def test_phase1_foundation():
     
     # 4. Verification Orchestra
     try:
-        orchestra = VerificationOrchestra()
+        orchestra = _get_orchestra()
         code = "def factorial(n: int) -> int:\n    return 1 if n <= 1 else n * factorial(n-1)"
         result = await orchestra.verify(code, "test", "python", run_tier2=False)
         assert result.tier_1_passed is not None
@@ -282,13 +307,14 @@ def run_command(cmd):
 
 async def test_full_sdo_flow():
     """Test complete SDO flow with all Phase 3 components."""
+    _require_llm(allow_mock=True)
     print_header("FULL SDO FLOW (Integration)")
     results = {"passed": 0, "failed": 0}
     
     try:
         # Initialize full engine
         llm = LLMService()
-        engine = SDOEngine(llm, enable_cache=True, enable_policy=True)
+        engine = SDOEngine(llm, enable_cache=True, enable_policy=True, orchestra=_get_orchestra())
         
         # Create SDO
         sdo = SDO(
@@ -384,14 +410,29 @@ async def run_all_tests():
     total_passed = 0
     total_failed = 0
     
-    # Run all test phases
-    for test_fn in [
-        test_phase1_foundation,
-        test_phase2_adaptive,
-        test_phase3_intelligence,
-        test_full_sdo_flow
-    ]:
-        results = await test_fn()
+    # Phases 1-3 are independent, so run them concurrently; a phase that
+    # raises counts as one failure without cancelling the others
+    phase_results = await asyncio.gather(
+        test_phase1_foundation(),
+        test_phase2_adaptive(),
+        test_phase3_intelligence(),
+        return_exceptions=True
+    )
+    
+    # The full flow exercises the same components end to end, so run it last
+    try:
+        phase_results.append(await test_full_sdo_flow())
+    except pytest.skip.Exception as e:
+        phase_results.append(e)
+    
+    for results in phase_results:
+        if isinstance(results, pytest.skip.Exception):
+            print_step("Phase skipped", str(results))
+            continue
+        if isinstance(results, BaseException):
+            print_step("Phase crashed", f"✗ {results}")
+            total_failed += 1
+            continue
         total_passed += results["passed"]
         total_failed += results["failed"]
     
@@ -414,5 +455,7 @@ async def run_all_tests():
 
 
 if __name__ == "__main__":
+    # The full flow uses a hand-built candidate, so it can always run mocked
+    os.environ.setdefault("AXIOM_TEST_MOCK", "1")
     success = asyncio.run(run_all_tests())
     sys.exit(0 if success else 1)
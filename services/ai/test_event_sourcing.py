@@ -5,33 +5,58 @@ Tests event store, state projection, and undo/redo functionality.
 """
 import pytest
 import asyncio
-from datetime import datetime
-from decimal import Decimal
-from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone
 import uuid
 
 # Import event sourcing components
 import sys
 sys.path.insert(0, '.')
 
-from ivcu_events import (
-    IVCUEventType,
-    IVCUEvent,
-    IVCUState,
-    IVCUStateProjector,
-    IVCUEventStore,
-    create_event
-)
+from events import EventType, IVCUEvent, IVCUState, IVCUEventStore
+from events.model import now_us
+
+
+IVCU_ID = str(uuid.UUID(int=7))
+
+
+def create_event(ivcu_id, event_type, data, version=1, user_id=None):
+    """Build an event the way the store hands them back."""
+    return IVCUEvent(
+        id=str(uuid.uuid4()),
+        ivcu_id=ivcu_id,
+        sequence_number=version,
+        event_type=event_type,
+        event_data=data,
+        timestamp=now_us(),
+        actor_id=user_id
+    )
+
+
+def project(events, up_to_version=None):
+    """Project a fresh state, optionally stopping at a version."""
+    if up_to_version is not None:
+        events = [e for e in events if e.sequence_number <= up_to_version]
+    return IVCUState(id=events[0].ivcu_id).apply_events(events)
+
+
+# Projection is pure, so one opening event serves the module
+@pytest.fixture(scope="module")
+def base_intent_event():
+    return create_event(
+        ivcu_id="test-ivcu",
+        event_type=EventType.INTENT_CREATED,
+        data={"raw_intent": "Sort", "language": "python"}
+    )
 
 
 class TestIVCUEvent:
     """Test event creation and serialization."""
-    
+
     def test_create_intent_created_event(self):
         """Test creating an intent created event."""
         event = create_event(
             ivcu_id="test-ivcu-1",
-            event_type=IVCUEventType.INTENT_CREATED,
+            event_type=EventType.INTENT_CREATED,
             data={
                 "raw_intent": "Create a function to sort a list",
                 "language": "python",
@@ -39,288 +64,261 @@ class TestIVCUEvent:
             },
             user_id="user-1"
         )
-        
+
         assert event.ivcu_id == "test-ivcu-1"
-        assert event.event_type == IVCUEventType.INTENT_CREATED
-        assert event.data["raw_intent"] == "Create a function to sort a list"
-        assert event.user_id == "user-1"
-        assert event.version == 1
-    
+        assert event.event_type == EventType.INTENT_CREATED
+        assert event.event_data["raw_intent"] == "Create a function to sort a list"
+        assert event.actor_id == "user-1"
+        assert event.sequence_number == 1
+
     def test_event_to_dict(self):
         """Test event dictionary serialization."""
         event = create_event(
             ivcu_id="test-ivcu-2",
-            event_type=IVCUEventType.CONTRACT_ADDED,
+            event_type=EventType.CONTRACT_ADDED,
             data={
-                "contract_type": "precondition",
-                "expression": "len(items) > 0"
+                "contract": {
+                    "contract_type": "precondition",
+                    "expression": "len(items) > 0"
+                }
             }
         )
-        
+
         event_dict = event.to_dict()
-        
+
         assert "id" in event_dict
         assert event_dict["ivcu_id"] == "test-ivcu-2"
         assert event_dict["event_type"] == "contract_added"
-        assert "timestamp" in event_dict
+        assert datetime.fromisoformat(event_dict["timestamp"]).tzinfo == timezone.utc
 
 
-class TestIVCUStateProjector:
+class TestIVCUStateProjection:
     """Test state projection from events."""
-    
+
     def test_project_intent_created(self):
         """Test projecting intent created event."""
-        projector = IVCUStateProjector()
-        
         event = create_event(
             ivcu_id="test-ivcu",
-            event_type=IVCUEventType.INTENT_CREATED,
+            event_type=EventType.INTENT_CREATED,
             data={
                 "raw_intent": "Sort a list",
                 "language": "python",
                 "model_id": "claude-sonnet"
             }
         )
-        
-        state = projector.project([event])
-        
-        assert state.ivcu_id == "test-ivcu"
-        assert state.intent == "Sort a list"
+
+        state = project([event])
+
+        assert state.id == "test-ivcu"
+        assert state.raw_intent == "Sort a list"
         assert state.language == "python"
-        assert state.model_id == "claude-sonnet"
-        assert state.status == "intent_created"
+        assert state.created_at == event.timestamp
+        assert state.status == "draft"
         assert state.version == 1
-    
-    def test_project_contract_added(self):
+
+    def test_project_contract_added(self, base_intent_event):
         """Test projecting contract added event."""
-        projector = IVCUStateProjector()
-        
         events = [
+            base_intent_event,
             create_event(
                 ivcu_id="test-ivcu",
-                event_type=IVCUEventType.INTENT_CREATED,
-                data={"raw_intent": "Sort", "language": "python"}
-            ),
-            create_event(
-                ivcu_id="test-ivcu",
-                event_type=IVCUEventType.CONTRACT_ADDED,
+                event_type=EventType.CONTRACT_ADDED,
                 data={
-                    "contract_type": "precondition",
-                    "expression": "items is not None"
-                }
+                    "contract": {
+                        "contract_type": "precondition",
+                        "expression": "items is not None"
+                    }
+                },
+                version=2
             )
         ]
-        
-        state = projector.project(events)
-        
+
+        state = project(events)
+
         assert len(state.contracts) == 1
         assert state.contracts[0]["contract_type"] == "precondition"
         assert state.version == 2
-    
-    def test_project_candidate_generated(self):
+
+    def test_project_candidate_generated(self, base_intent_event):
         """Test projecting candidate generation."""
-        projector = IVCUStateProjector()
-        
         events = [
+            base_intent_event,
             create_event(
                 ivcu_id="test-ivcu",
-                event_type=IVCUEventType.INTENT_CREATED,
-                data={"raw_intent": "Sort", "language": "python"}
-            ),
-            create_event(
-                ivcu_id="test-ivcu",
-                event_type=IVCUEventType.CANDIDATE_GENERATED,
+                event_type=EventType.CANDIDATE_GENERATED,
                 data={
                     "candidate_id": "cand-1",
                     "code": "def sort(items): return sorted(items)",
-                    "model_id": "deepseek-v3",
-                    "tokens_used": 50,
-                    "cost": 0.001
-                }
+                    "model_id": "deepseek-v3"
+                },
+                version=2
+            ),
+            create_event(
+                ivcu_id="test-ivcu",
+                event_type=EventType.COST_INCURRED,
+                data={"amount": 0.001},
+                version=3
             )
         ]
-        
-        state = projector.project(events)
-        
+
+        state = project(events)
+
         assert len(state.candidates) == 1
-        assert "cand-1" in state.candidates
-        assert state.candidates["cand-1"]["code"] == "def sort(items): return sorted(items)"
-        assert state.total_cost == Decimal("0.001")
-    
-    def test_project_verification_completed(self):
+        assert state.candidates[0]["id"] == "cand-1"
+        assert state.candidates[0]["code"] == "def sort(items): return sorted(items)"
+        assert state.status == "generating"
+        assert state.total_cost == pytest.approx(0.001)
+
+    def test_project_verification_completed(self, base_intent_event):
         """Test projecting verification completion."""
-        projector = IVCUStateProjector()
-        
         events = [
+            base_intent_event,
             create_event(
                 ivcu_id="test-ivcu",
-                event_type=IVCUEventType.INTENT_CREATED,
-                data={"raw_intent": "Sort", "language": "python"}
-            ),
-            create_event(
-                ivcu_id="test-ivcu",
-                event_type=IVCUEventType.CANDIDATE_GENERATED,
+                event_type=EventType.CANDIDATE_GENERATED,
                 data={
                     "candidate_id": "cand-1",
                     "code": "def sort(items): return sorted(items)",
                     "model_id": "deepseek-v3"
-                }
+                },
+                version=2
             ),
             create_event(
                 ivcu_id="test-ivcu",
-                event_type=IVCUEventType.VERIFICATION_COMPLETED,
+                event_type=EventType.VERIFICATION_COMPLETED,
                 data={
                     "candidate_id": "cand-1",
-                    "tier": "tier_1",
                     "passed": True,
-                    "confidence": 0.95
-                }
+                    "score": 0.95,
+                    "results": {"tier": "tier_1"}
+                },
+                version=3
             )
         ]
-        
-        state = projector.project(events)
-        
-        assert state.candidates["cand-1"]["verified"] == True
-        assert state.candidates["cand-1"]["verification"]["tier"] == "tier_1"
-    
-    def test_project_candidate_selected(self):
+
+        state = project(events)
+
+        assert state.candidates[0]["verification_passed"] == True
+        assert state.candidates[0]["verification_score"] == 0.95
+        assert state.candidates[0]["verification_result"]["tier"] == "tier_1"
+
+    def test_project_candidate_selected(self, base_intent_event):
         """Test projecting candidate selection."""
-        projector = IVCUStateProjector()
-        
         events = [
+            base_intent_event,
             create_event(
                 ivcu_id="test-ivcu",
-                event_type=IVCUEventType.INTENT_CREATED,
-                data={"raw_intent": "Sort", "language": "python"}
-            ),
-            create_event(
-                ivcu_id="test-ivcu",
-                event_type=IVCUEventType.CANDIDATE_GENERATED,
-                data={"candidate_id": "cand-1", "code": "def sort(): pass"}
+                event_type=EventType.CANDIDATE_GENERATED,
+                data={"candidate_id": "cand-1", "code": "def sort(): pass"},
+                version=2
             ),
             create_event(
                 ivcu_id="test-ivcu",
-                event_type=IVCUEventType.CANDIDATE_SELECTED,
-                data={"candidate_id": "cand-1"}
+                event_type=EventType.CANDIDATE_SELECTED,
+                data={"candidate_id": "cand-1", "code": "def sort(): pass"},
+                version=3
             )
         ]
-        
-        state = projector.project(events)
-        
+
+        state = project(events)
+
         assert state.selected_candidate_id == "cand-1"
-        assert state.status == "selected"
-    
+        assert state.code == "def sort(): pass"
+        assert state.status == "verified"
+
     def test_project_to_version(self):
         """Test projecting to a specific version."""
-        projector = IVCUStateProjector()
-        
         events = [
-            create_event(ivcu_id="test-ivcu", event_type=IVCUEventType.INTENT_CREATED,
-                        data={"raw_intent": "v1"}),
-            create_event(ivcu_id="test-ivcu", event_type=IVCUEventType.INTENT_REFINED,
-                        data={"refined_intent": "v2"}),
-            create_event(ivcu_id="test-ivcu", event_type=IVCUEventType.INTENT_REFINED,
-                        data={"refined_intent": "v3"})
+            create_event(ivcu_id="test-ivcu", event_type=EventType.INTENT_CREATED,
+                        data={"raw_intent": "v1"}, version=1),
+            create_event(ivcu_id="test-ivcu", event_type=EventType.INTENT_REFINED,
+                        data={"new_intent": "v2"}, version=2),
+            create_event(ivcu_id="test-ivcu", event_type=EventType.INTENT_REFINED,
+                        data={"new_intent": "v3"}, version=3)
         ]
-        
+
         # Project to version 2
-        state = projector.project(events, up_to_version=2)
-        
-        assert state.intent == "v2"
+        state = project(events, up_to_version=2)
+
+        assert state.raw_intent == "v2"
         assert state.version == 2
 
 
 class TestIVCUEventStoreUnit:
-    """Unit tests for event store (mocked database)."""
-    
-    @pytest.fixture
-    def mock_pool(self):
-        """Create a mock database pool."""
-        pool = MagicMock()
-        conn = AsyncMock()
-        pool.acquire.return_value.__aenter__.return_value = conn
-        conn.transaction.return_value.__aenter__.return_value = None
-        return pool
-    
+    """Unit tests for event store (fake database pool from conftest)."""
+
     @pytest.mark.asyncio
     async def test_append_event(self, mock_pool):
         """Test appending an event."""
         store = IVCUEventStore(mock_pool)
-        
-        event = create_event(
-            ivcu_id="test-ivcu",
-            event_type=IVCUEventType.INTENT_CREATED,
-            data={"raw_intent": "Test"}
+
+        event = await store.append_event(
+            IVCU_ID, EventType.INTENT_CREATED, {"raw_intent": "Test"}
         )
-        
-        mock_pool.acquire.return_value.__aenter__.return_value.execute = AsyncMock()
-        
-        event_id = await store.append(event)
-        
-        assert event_id == event.id
-    
+        await store.close()
+
+        assert event.ivcu_id == IVCU_ID
+        assert event.sequence_number == 1
+        records = mock_pool.conn.copies[-1][1]
+        assert records[0][0] == uuid.UUID(event.id)
+
     @pytest.mark.asyncio
     async def test_get_events_empty(self, mock_pool):
         """Test getting events for non-existent IVCU."""
         store = IVCUEventStore(mock_pool)
-        
-        mock_pool.acquire.return_value.__aenter__.return_value.fetch = AsyncMock(return_value=[])
-        
-        events = await store.get_events("non-existent")
-        
+
+        events = await store.get_events(str(uuid.uuid4()))
+
         assert events == []
 
     @pytest.mark.asyncio
     async def test_get_state(self, mock_pool):
         """Test state reconstruction from events."""
         store = IVCUEventStore(mock_pool)
-        
-        # Mock events from database
+        timestamp = now_us()
+
+        # Rows as the database returns them
         mock_rows = [
             {
-                "id": str(uuid.uuid4()),
-                "ivcu_id": "test-ivcu",
+                "id": uuid.uuid4(),
+                "ivcu_id": uuid.UUID(IVCU_ID),
+                "sequence_number": 1,
                 "event_type": "intent_created",
-                "data": '{"raw_intent": "Test", "language": "python"}',
-                "timestamp": datetime.utcnow(),
-                "version": 1,
-                "user_id": None,
-                "correlation_id": None
+                "event_data": '{"raw_intent": "Test", "language": "python"}',
+                "timestamp": timestamp,
+                "actor_id": None
             }
         ]
-        
-        mock_pool.acquire.return_value.__aenter__.return_value.fetch = AsyncMock(
-            return_value=mock_rows
-        )
-        
-        state = await store.get_state("test-ivcu")
-        
-        assert state.ivcu_id == "test-ivcu"
-        assert state.intent == "Test"
+
+        mock_pool.conn.rows = mock_rows
+
+        state = await store.get_state(IVCU_ID)
+
+        assert state.id == IVCU_ID
+        assert state.raw_intent == "Test"
         assert state.language == "python"
+        assert state.created_at == timestamp
 
 
 class TestUndoRedo:
     """Test undo/redo functionality."""
-    
-    def test_projector_undo_simulation(self):
+
+    def test_projection_undo_simulation(self):
         """Test that projecting to earlier version simulates undo."""
-        projector = IVCUStateProjector()
-        
         events = [
-            create_event(ivcu_id="test", event_type=IVCUEventType.INTENT_CREATED,
-                        data={"raw_intent": "Original"}),
-            create_event(ivcu_id="test", event_type=IVCUEventType.INTENT_REFINED,
-                        data={"refined_intent": "Refined"}),
+            create_event(ivcu_id="test", event_type=EventType.INTENT_CREATED,
+                        data={"raw_intent": "Original"}, version=1),
+            create_event(ivcu_id="test", event_type=EventType.INTENT_REFINED,
+                        data={"new_intent": "Refined"}, version=2),
         ]
-        
+
         # Current state
-        current = projector.project(events)
-        assert current.intent == "Refined"
-        
+        current = project(events)
+        assert current.raw_intent == "Refined"
+
         # "Undo" by projecting to version 1
-        undone = projector.project(events, up_to_version=1)
-        assert undone.intent == "Original"
+        undone = project(events, up_to_version=1)
+        assert undone.raw_intent == "Original"
 
 
 # Run with: pytest test_event_sourcing.py -v
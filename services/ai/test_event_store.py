@@ -0,0 +1,289 @@
+"""
+Tests for the IVCU Event Store (events package)
+
+Covers batched appends against a fake asyncpg pool and the in-memory fallback.
+"""
+import pytest
+import asyncio
+import uuid
+
+import sys
+sys.path.insert(0, '.')
+
+from events import EventType, IVCUEvent, IVCUEventStore, IVCUState, project_many
+from events.model import now_us
+from events.store import ConcurrencyError
+
+
+IVCU_ID = str(uuid.UUID(int=1))
+
+
+@pytest.fixture
+def mock_pool(mock_pool):
+    """Fake database pool whose stream already holds two events."""
+    mock_pool.conn.row = {"max_seq": 2}
+    return mock_pool
+
+
+class TestAppend:
+    """Test appending events."""
+
+    @pytest.mark.asyncio
+    async def test_append_events_single_copy(self, mock_pool):
+        """A batch is written with one COPY and numbered after the stream head."""
+        store = IVCUEventStore(mock_pool)
+        conn = mock_pool.conn
+
+        events = await store.append_events(IVCU_ID, [
+            (EventType.CONTRACT_ADDED, {"contract": {"type": "pre"}}),
+            (EventType.COST_INCURRED, {"amount": 0.01}),
+            (EventType.COST_INCURRED, {"amount": 0.02}),
+        ])
+
+        assert [e.sequence_number for e in events] == [3, 4, 5]
+        assert len(conn.copies) == 1
+        records = conn.copies[0][1]
+        assert [r[2] for r in records] == [3, 4, 5]
+        assert records[1][3] == "cost_incurred"
+
+    @pytest.mark.asyncio
+    async def test_append_event_uses_batch_path(self, mock_pool):
+        store = IVCUEventStore(mock_pool)
+        conn = mock_pool.conn
+
+        event = await store.append_event(IVCU_ID, EventType.INTENT_CREATED, {"raw_intent": "Test"})
+
+        assert event.sequence_number == 3
+        assert len(conn.copies[-1][1]) == 1
+
+    @pytest.mark.asyncio
+    async def test_append_events_memory_fallback(self):
+        store = IVCUEventStore()
+
+        await store.append_event(IVCU_ID, EventType.INTENT_CREATED, {"raw_intent": "Test"})
+        events = await store.append_events(IVCU_ID, [
+            (EventType.CONTRACT_ADDED, {"contract": {}}),
+            (EventType.COST_INCURRED, {"amount": 0.5}),
+        ], expected_version=1)
+
+        assert [e.sequence_number for e in events] == [2, 3]
+        state = await store.get_state(IVCU_ID)
+        assert state.version == 3
+        assert state.total_cost == 0.5
+
+        with pytest.raises(ConcurrencyError):
+            await store.append_events(IVCU_ID, [(EventType.COST_INCURRED, {})], expected_version=1)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_appends_coalesce(self, mock_pool):
+        """Concurrent producers on one stream are written with a single COPY."""
+        store = IVCUEventStore(mock_pool)
+        conn = mock_pool.conn
+
+        events = await asyncio.gather(*(
+            store.append_event(IVCU_ID, EventType.COST_INCURRED, {"amount": i})
+            for i in range(500)
+        ))
+        await store.close()
+
+        assert len(conn.copies) == 1
+        assert [e.event_data["amount"] for e in events] == list(range(500))
+        assert events[-1].sequence_number == 502
+
+    @pytest.mark.asyncio
+    async def test_queued_append_raises_conflict(self):
+        store = IVCUEventStore()
+
+        await store.append_event(IVCU_ID, EventType.INTENT_CREATED, {"raw_intent": "Test"})
+        with pytest.raises(ConcurrencyError):
+            await store.append_event(IVCU_ID, EventType.COST_INCURRED, {}, expected_version=0)
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_stale_conditional_append_does_not_block_plain_append(self):
+        """A failed version check rejects only its own append, not the next queued one."""
+        store = IVCUEventStore()
+
+        await store.append_event(IVCU_ID, EventType.INTENT_CREATED, {"raw_intent": "Test"})
+        stale, plain = await asyncio.gather(
+            store.append_event(IVCU_ID, EventType.COST_INCURRED, {"amount": 1.0}, expected_version=0),
+            store.append_event(IVCU_ID, EventType.COST_INCURRED, {"amount": 2.0}),
+            return_exceptions=True
+        )
+        await store.close()
+
+        assert isinstance(stale, ConcurrencyError)
+        assert plain.sequence_number == 2
+        assert [e.event_data.get("amount") for e in await store.get_events(IVCU_ID)] == [None, 2.0]
+
+    @pytest.mark.asyncio
+    async def test_get_events_decodes_jsonb_text(self, mock_pool):
+        """Rows with JSONB as text or already decoded both yield dict payloads."""
+        store = IVCUEventStore(mock_pool)
+        conn = mock_pool.conn
+        row = {
+            "id": uuid.uuid4(),
+            "ivcu_id": uuid.UUID(IVCU_ID),
+            "event_type": "intent_created",
+            "timestamp": now_us(),
+            "actor_id": None,
+        }
+        conn.rows = [
+            dict(row, sequence_number=1, event_data='{"raw_intent": "Test", "language": "python"}'),
+            dict(row, sequence_number=2, event_type="cost_incurred", event_data={"amount": 0.5}),
+        ]
+
+        state = await store.get_state(IVCU_ID)
+
+        assert state.raw_intent == "Test"
+        assert state.language == "python"
+        assert state.total_cost == 0.5
+
+
+class TestProjection:
+    """Test state reconstruction with the snapshot cache."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_accelerates_projection(self, monkeypatch):
+        """A repeat projection replays only the events after the last snapshot."""
+        store = IVCUEventStore()
+        await store.append_events(IVCU_ID, [(EventType.COST_INCURRED, {"amount": 1.0})] * 10_010)
+
+        applied = []
+        original = IVCUState._apply
+        def counting_apply(state, event):
+            applied.append(event.sequence_number)
+            original(state, event)
+        monkeypatch.setattr(IVCUState, "_apply", counting_apply)
+
+        first = await store.get_state(IVCU_ID)
+        assert len(applied) == 10_010
+
+        applied.clear()
+        second = await store.get_state(IVCU_ID)
+        assert applied == list(range(10_001, 10_011))
+        assert second.version == first.version == 10_010
+        assert second.total_cost == first.total_cost == 10_010.0
+
+    @pytest.mark.asyncio
+    async def test_get_state_up_to_version(self):
+        store = IVCUEventStore()
+        await store.append_event(IVCU_ID, EventType.INTENT_CREATED, {"raw_intent": "v1"})
+        await store.append_events(IVCU_ID, [(EventType.COST_INCURRED, {"amount": 1.0})] * 120)
+        await store.append_event(IVCU_ID, EventType.INTENT_REFINED, {"new_intent": "v2"})
+        await store.close()
+
+        latest = await store.get_state(IVCU_ID)
+        assert latest.raw_intent == "v2"
+
+        undone = await store.get_state(IVCU_ID, up_to_version=75)
+        assert undone.version == 75
+        assert undone.raw_intent == "v1"
+        assert undone.total_cost == 74.0
+
+    @pytest.mark.asyncio
+    async def test_undo_replays_only_past_snapshot(self, monkeypatch):
+        """Undo to any version replays at most one snapshot interval and shares candidates."""
+        store = IVCUEventStore()
+        await store.append_event(IVCU_ID, EventType.CANDIDATE_GENERATED, {"candidate_id": "c1", "code": "pass"})
+        await store.append_events(IVCU_ID, [(EventType.COST_INCURRED, {"amount": 1.0})] * 9_999)
+        latest = await store.get_state(IVCU_ID)
+
+        applied = []
+        original = IVCUState._apply
+        def counting_apply(state, event):
+            applied.append(event.sequence_number)
+            original(state, event)
+        monkeypatch.setattr(IVCUState, "_apply", counting_apply)
+
+        undone = await store.get_state(IVCU_ID, up_to_version=5_025)
+
+        assert applied == list(range(5_001, 5_026))
+        assert undone.version == 5_025
+        assert undone.candidates[0] is latest.candidates[0]
+
+    @pytest.mark.asyncio
+    async def test_get_state_returns_private_copy(self):
+        """Mutating a returned state never leaks into cached snapshots."""
+        store = IVCUEventStore()
+        await store.append_event(IVCU_ID, EventType.CONTRACT_ADDED, {"contract": {"type": "pre"}})
+        await store.append_events(IVCU_ID, [(EventType.COST_INCURRED, {"amount": 1.0})] * 99)
+
+        for up_to_version in (None, 50, 100):
+            state = await store.get_state(IVCU_ID, up_to_version)
+            state.contracts.clear()
+            state.status = "hacked"
+            again = await store.get_state(IVCU_ID, up_to_version)
+            assert again is not state
+            assert len(again.contracts) == 1
+            assert again.status != "hacked"
+
+    def test_apply_events_leaves_source_state_untouched(self):
+        def event(seq, event_type, data):
+            return IVCUEvent(str(seq), IVCU_ID, seq, event_type, data, now_us())
+
+        base = IVCUState(id=IVCU_ID).apply_events([
+            event(1, EventType.INTENT_CREATED, {"raw_intent": "Sort"}),
+            event(2, EventType.CANDIDATE_GENERATED, {"candidate_id": "c1", "code": "pass"}),
+        ])
+        verified = base.apply_events([
+            event(3, EventType.VERIFICATION_COMPLETED, {"candidate_id": "c1", "passed": True}),
+            event(4, EventType.COST_INCURRED, {"amount": 0.25}),
+        ])
+
+        assert verified.version == 4
+        assert verified.candidates[0]["verification_passed"] is True
+        assert verified.total_cost == 0.25
+        assert base.version == 2
+        assert base.candidates[0]["verification_passed"] is False
+
+    def test_verification_tracks_candidates_across_runs(self):
+        def event(seq, event_type, data):
+            return IVCUEvent(str(seq), IVCU_ID, seq, event_type, data, now_us())
+
+        base = IVCUState(id=IVCU_ID).apply_events([
+            event(1, EventType.CANDIDATE_GENERATED, {"candidate_id": "c1", "code": "a"}),
+            event(2, EventType.CANDIDATE_GENERATED, {"candidate_id": "c2", "code": "b"}),
+        ])
+        state = base.apply_events([
+            event(3, EventType.VERIFICATION_COMPLETED, {"candidate_id": "c2", "passed": True}),
+            event(4, EventType.CANDIDATE_GENERATED, {"candidate_id": "c1", "code": "c"}),
+            event(5, EventType.VERIFICATION_COMPLETED, {"candidate_id": "c1", "passed": True}),
+            event(6, EventType.INTENT_REFINED, {"new_intent": "v2", "clear_candidates": True}),
+            event(7, EventType.CANDIDATE_GENERATED, {"candidate_id": "c2", "code": "d"}),
+            event(8, EventType.VERIFICATION_COMPLETED, {"candidate_id": "c2", "score": 0.5}),
+        ])
+        before_refine = base.apply_events([
+            event(3, EventType.VERIFICATION_COMPLETED, {"candidate_id": "c2", "passed": True}),
+            event(4, EventType.CANDIDATE_GENERATED, {"candidate_id": "c1", "code": "c"}),
+            event(5, EventType.VERIFICATION_COMPLETED, {"candidate_id": "c1", "passed": True}),
+        ])
+
+        assert [c["verification_passed"] for c in before_refine.candidates] == [True, True, True]
+        assert [(c["code"], c["verification_score"]) for c in state.candidates] == [("d", 0.5)]
+        assert [c["verification_passed"] for c in base.candidates] == [False, False]
+
+    def test_project_many_matches_per_ivcu(self):
+        ivcu_ids = [str(uuid.UUID(int=n)) for n in range(1, 4)]
+        streams = {
+            ivcu_id: [
+                IVCUEvent(f"{n}-1", ivcu_id, 1, EventType.INTENT_CREATED, {"raw_intent": f"intent {n}"}, now_us()),
+                IVCUEvent(f"{n}-2", ivcu_id, 2, EventType.CANDIDATE_GENERATED, {"candidate_id": "c1", "code": "pass"}, now_us()),
+                *[
+                    IVCUEvent(f"{n}-{seq}", ivcu_id, seq, EventType.COST_INCURRED, {"amount": 0.5}, now_us())
+                    for seq in range(3, 3 + n)
+                ],
+            ]
+            for n, ivcu_id in enumerate(ivcu_ids, start=1)
+        }
+
+        states = project_many([event for stream in streams.values() for event in stream])
+
+        assert set(states) == set(ivcu_ids)
+        for ivcu_id, stream in streams.items():
+            assert states[ivcu_id] == IVCUState(id=ivcu_id).apply_events(stream)
+
+
+# Run with: pytest test_event_store.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
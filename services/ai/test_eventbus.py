@@ -0,0 +1,58 @@
+"""
+Tests for the JetStream Event Bus
+
+Uses a fake JetStream context; no NATS server needed.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+import sys
+sys.path.insert(0, '.')
+
+from eventbus import JetStreamEventBus
+
+
+class FakeJetStream:
+    """Records published payloads and acks each with the next sequence."""
+
+    def __init__(self):
+        self.payloads = []
+
+    async def publish(self, subject, payload, headers=None):
+        self.payloads.append((subject, payload))
+        return SimpleNamespace(seq=len(self.payloads))
+
+
+def _bus():
+    bus = JetStreamEventBus("nats://unused:4222")
+    bus._js = FakeJetStream()
+    return bus
+
+
+@pytest.mark.asyncio
+async def test_publish_paths_share_envelope():
+    """Dicts and pre-encoded objects, awaited or not, arrive in one format."""
+    bus = _bus()
+    data = {"id": "sdo-1", "status": "verified"}
+
+    await bus.publish("gen.created", data)
+    await bus.publish("gen.created", orjson.dumps(data))
+    assert bus.publish_nowait("gen.created", data)
+    assert bus.publish_nowait("gen.created", orjson.dumps(data))
+    await asyncio.gather(*bus._pending_publishes)
+
+    messages = [orjson.loads(payload) for _, payload in bus._js.payloads]
+    assert len(messages) == 4
+    for message in messages:
+        assert message.pop("_subject") == "gen.created"
+        assert message.pop("_timestamp")
+        assert message == data
+
+
+def test_encode_empty_object_and_rejects_non_objects():
+    assert set(orjson.loads(JetStreamEventBus._encode("gen.x", b"{ }"))) == {"_timestamp", "_subject"}
+    with pytest.raises(ValueError):
+        JetStreamEventBus._encode("gen.x", b"[1, 2]")
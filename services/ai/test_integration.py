@@ -1,10 +1,28 @@
-import requests
-import json
-import time
+import asyncio
+import sys
+
+import httpx
+import orjson
 
 API_URL = "http://localhost:8000"
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+async def _post(client: httpx.AsyncClient, path: str, payload: dict) -> httpx.Response:
+    return await client.post(path, content=orjson.dumps(payload), headers=JSON_HEADERS)
+
 
 def test_generate_flow():
+    asyncio.run(run_flows(1))
+
+
+async def run_flows(count: int):
+    """Run the generation flow count times concurrently over one pooled client."""
+    async with httpx.AsyncClient(base_url=API_URL, timeout=60) as client:
+        await asyncio.gather(*(generate_flow(client) for _ in range(count)))
+
+
+async def generate_flow(client: httpx.AsyncClient):
     print("Testing Generation Flow...")
     
     # 1. Parse Intent
@@ -14,7 +32,7 @@ def test_generate_flow():
     }
     
     print(f"1. Parsing intent: {intent_payload['intent']}")
-    parse_res = requests.post(f"{API_URL}/parse-intent", json=intent_payload)
+    parse_res = await _post(client, "/parse-intent", intent_payload)
     
     if parse_res.status_code != 200:
         print(f"Parse Error: {parse_res.status_code} - {parse_res.text}")
@@ -33,8 +51,8 @@ def test_generate_flow():
     }
     
     print(f"2. Generating candidates for SDO {sdo_id}...")
-    # Increase timeout for generation
-    response = requests.post(f"{API_URL}/generate/parallel", json=gen_payload, timeout=60)
+    # Client timeout is raised to 60s for generation
+    response = await _post(client, "/generate/parallel", gen_payload)
     
     if response.status_code != 200:
         print(f"Generate Error: {response.status_code} - {response.text}")
@@ -96,7 +114,8 @@ def test_generate_flow():
     pass
 
 if __name__ == "__main__":
+    # Optional argument: number of concurrent flows for regression runs
     try:
-        test_generate_flow()
+        asyncio.run(run_flows(int(sys.argv[1]) if len(sys.argv) > 1 else 1))
     except Exception as e:
         print(f"Test failed: {e}")
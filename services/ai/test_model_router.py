@@ -175,6 +175,28 @@ class TestCostOracle:
         # Should suggest cheaper alternatives
         assert len(estimate.cheaper_alternatives) > 0 or len(estimate.more_accurate_alternatives) > 0
     
+    def test_estimate_cost_batch_matches_single(self):
+        """Test that a batch estimate equals per-request estimates."""
+        oracle = CostOracle()
+        oracle.set_daily_budget("user-1", Decimal("1.00"))
+        requests = [
+            ("deepseek-v3", "Sort a list", "simple"),
+            ("gpt-4o", "Build a REST API with auth", "complex"),
+            ("deepseek-v3", "Parse a CSV file", "medium"),
+        ]
+        
+        batch = oracle.estimate_cost_batch(
+            [r[0] for r in requests], [r[1] for r in requests], [r[2] for r in requests],
+            user_id="user-1"
+        )
+        
+        assert batch == [
+            oracle.estimate_cost(model_id, text, complexity, user_id="user-1")
+            for model_id, text, complexity in requests
+        ]
+        with pytest.raises(ValueError):
+            oracle.estimate_cost_batch(["deepseek-v3", "no-such-model"], ["a", "b"])
+    
     def test_effective_cost_calculation(self):
         """Test accuracy-first effective cost calculation."""
         oracle = CostOracle()
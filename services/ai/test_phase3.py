@@ -2,88 +2,140 @@
 Test suite for Phase 3 components: Cache, Router, Policy.
 """
 import unittest
-import asyncio
 import sys
 import os
+
+import pytest
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from cache import SemanticCache, CacheEntry, _cosine_similarity
+from cache import SemanticCache, CacheEntry, HNSWLIB_AVAILABLE, _cosine_similarity
 from router import LLMRouter, MockProvider, ChatRequest, ChatMessage, RoutingRule
 from policy import PolicyEngine, PolicyPhase, PolicySeverity
 
 
-class TestSemanticCache(unittest.TestCase):
+class TestSemanticCache(unittest.IsolatedAsyncioTestCase):
     """Test the SemanticCache class."""
     
+    pytestmark = pytest.mark.xdist_group(name="phase3_cache")
+    
+    @classmethod
+    def setUpClass(cls):
+        cls._cache = SemanticCache(max_size=10, enable_cleanup=False)
+    
     def setUp(self):
-        self.cache = SemanticCache(max_size=10, enable_cleanup=False)
+        self.cache = self._cache
+        self.cache.clear()
     
-    def test_cache_set_get(self):
+    async def test_cache_set_get(self):
         """Test basic set and get."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        async def run():
-            key = await self.cache.set(
-                query="Create fibonacci function",
-                response="def fib(n): return n",
-                model="gpt-4"
-            )
-            self.assertIsNotNone(key)
-            
-            entry = await self.cache.get("Create fibonacci function", "gpt-4")
-            self.assertIsNotNone(entry)
-            self.assertEqual(entry.response, "def fib(n): return n")
+        key = await self.cache.set(
+            query="Create fibonacci function",
+            response="def fib(n): return n",
+            model="gpt-4"
+        )
+        self.assertIsNotNone(key)
         
-        loop.run_until_complete(run())
-        loop.close()
+        entry = await self.cache.get("Create fibonacci function", "gpt-4")
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.response, "def fib(n): return n")
     
-    def test_cache_miss(self):
+    async def test_cache_miss(self):
         """Test cache miss."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        entry = await self.cache.get("Unknown query", "gpt-4")
+        self.assertIsNone(entry)
+    
+    async def test_cache_stats(self):
+        """Test cache statistics."""
+        await self.cache.set("q1", "r1", "model")
+        await self.cache.get("q1", "model")  # Hit
+        await self.cache.get("q2", "model")  # Miss
+        
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertGreater(stats["hit_rate"], 0)
+    
+    async def test_cache_eviction(self):
+        """Test LRU eviction."""
+        # Fill cache to max
+        for i in range(12):  # Max is 10
+            await self.cache.set(f"query{i}", f"response{i}", "model")
+        
+        # Should have evicted oldest
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["size"], 10)
+    
+    async def test_semantic_match(self):
+        """Test similarity lookup over the embedding index."""
+        await self.cache.set("sort list", "sorted(x)", "model", embedding=[1.0, 0.1, 0.0])
+        await self.cache.set("reverse list", "x[::-1]", "model", embedding=[0.0, 1.0, 0.1])
+        await self.cache.set("sort other", "x.sort()", "other", embedding=[1.0, 0.0, 0.0])
         
-        async def run():
-            entry = await self.cache.get("Unknown query", "gpt-4")
-            self.assertIsNone(entry)
+        entry = await self.cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0])
+        self.assertEqual(entry.response, "sorted(x)")
         
-        loop.run_until_complete(run())
-        loop.close()
+        self.cache.delete(entry.key)
+        entry = await self.cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0])
+        self.assertIsNone(entry)
+        self.assertEqual(self.cache.stats()["semantic_hits"], 1)
     
-    def test_cache_stats(self):
-        """Test cache statistics."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    async def test_clear_reuses_index(self):
+        """Test that clear() empties the cache but keeps the index buffer."""
+        await self.cache.set("sort list", "sorted(x)", "model", embedding=[1.0, 0.1, 0.0])
+        matrix = self.cache._indexes[3]._matrix
         
-        async def run():
-            await self.cache.set("q1", "r1", "model")
-            await self.cache.get("q1", "model")  # Hit
-            await self.cache.get("q2", "model")  # Miss
-            
-            stats = self.cache.stats()
-            self.assertEqual(stats["hits"], 1)
-            self.assertEqual(stats["misses"], 1)
-            self.assertGreater(stats["hit_rate"], 0)
+        self.cache.clear()
+        self.assertIs(self.cache._indexes[3]._matrix, matrix)
+        self.assertIsNone(await self.cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0]))
         
-        loop.run_until_complete(run())
-        loop.close()
+        await self.cache.set("reverse list", "x[::-1]", "model", embedding=[0.0, 1.0, 0.1, 0.0])
+        entry = await self.cache.get("flip a list", "model", embedding=[0.0, 0.9, 0.1, 0.0])
+        self.assertEqual(entry.response, "x[::-1]")
     
-    def test_cache_eviction(self):
-        """Test LRU eviction."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    async def test_semantic_match_mixed_dimensions(self):
+        """Test that embeddings of each dimension stay searchable, before and after eviction."""
+        await self.cache.set("sort list", "sorted(x)", "model", embedding=[1.0, 0.1, 0.0])
+        await self.cache.set("reverse list", "x[::-1]", "model", embedding=[0.0, 1.0, 0.1, 0.0])
         
-        async def run():
-            # Fill cache to max
-            for i in range(12):  # Max is 10
-                await self.cache.set(f"query{i}", f"response{i}", "model")
-            
-            # Should have evicted oldest
-            stats = self.cache.stats()
-            self.assertLessEqual(stats["size"], 10)
+        entry = await self.cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0])
+        self.assertEqual(entry.response, "sorted(x)")
+        entry = await self.cache.get("flip a list", "model", embedding=[0.0, 0.9, 0.1, 0.0])
+        self.assertEqual(entry.response, "x[::-1]")
+        
+        # Evict everything from before, then index a third dimension
+        for i in range(10):
+            await self.cache.set(f"query{i}", f"response{i}", "model")
+        await self.cache.set("dedupe list", "set(x)", "model", embedding=[0.0, 0.0, 1.0, 0.0, 0.1])
+        entry = await self.cache.get("unique items", "model", embedding=[0.0, 0.0, 0.9, 0.0, 0.1])
+        self.assertEqual(entry.response, "set(x)")
+        self.assertIsNone(await self.cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0]))
+    
+    async def test_semantic_match_int8(self):
+        """Test similarity lookup with int8-quantized embeddings."""
+        cache = SemanticCache(max_size=10, enable_cleanup=False, cache_precision="int8")
+        await cache.set("sort list", "sorted(x)", "model", embedding=[1.0, 0.1, 0.0])
+        await cache.set("reverse list", "x[::-1]", "model", embedding=[0.0, 1.0, 0.1])
         
-        loop.run_until_complete(run())
-        loop.close()
+        entry = await cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0])
+        self.assertEqual(entry.response, "sorted(x)")
+        entry = await cache.get("flip a list", "model", embedding=[0.0, 0.9, 0.1])
+        self.assertEqual(entry.response, "x[::-1]")
+    
+    @unittest.skipUnless(HNSWLIB_AVAILABLE, "hnswlib not installed")
+    async def test_semantic_match_hnsw(self):
+        """Test similarity lookup through the HNSW index, including slot reuse."""
+        cache = SemanticCache(max_size=10, enable_cleanup=False, backend="hnsw")
+        await cache.set("sort list", "sorted(x)", "model", embedding=[1.0, 0.1, 0.0])
+        await cache.set("reverse list", "x[::-1]", "model", embedding=[0.0, 1.0, 0.1])
+        
+        entry = await cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0])
+        self.assertEqual(entry.response, "sorted(x)")
+        
+        cache.delete(entry.key)
+        self.assertIsNone(await cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0]))
+        await cache.set("sort desc", "sorted(x)[::-1]", "model", embedding=[1.0, 0.0, 0.1])
+        entry = await cache.get("order a list", "model", embedding=[0.9, 0.1, 0.0])
+        self.assertEqual(entry.response, "sorted(x)[::-1]")
     
     def test_cosine_similarity(self):
         """Test cosine similarity calculation."""
@@ -95,10 +147,12 @@ class TestSemanticCache(unittest.TestCase):
         self.assertAlmostEqual(_cosine_similarity(a, c), 0.0)
 
 
-class TestLLMRouter(unittest.TestCase):
+class TestLLMRouter(unittest.IsolatedAsyncioTestCase):
     """Test the LLMRouter class."""
     
-    def setUp(self):
+    pytestmark = pytest.mark.xdist_group(name="phase3_router")
+    
+    async def asyncSetUp(self):
         self.router = LLMRouter()
         self.mock = MockProvider()
         self.router.register_provider("mock", self.mock)
@@ -117,22 +171,15 @@ class TestLLMRouter(unittest.TestCase):
         provider = self.router.route(request)
         self.assertEqual(provider.name, "mock")
     
-    def test_chat_request(self):
+    async def test_chat_request(self):
         """Test actual chat request through router."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        async def run():
-            request = ChatRequest(
-                messages=[ChatMessage(role="user", content="Create a function")],
-                model="mock-fast"
-            )
-            response = await self.router.chat(request)
-            self.assertEqual(response.provider, "mock")
-            self.assertIn("generated_function", response.content.lower())
-        
-        loop.run_until_complete(run())
-        loop.close()
+        request = ChatRequest(
+            messages=[ChatMessage(role="user", content="Create a function")],
+            model="mock-fast"
+        )
+        response = await self.router.chat(request)
+        self.assertEqual(response.provider, "mock")
+        self.assertIn("generated_function", response.content.lower())
     
     def test_routing_rules(self):
         """Test routing rules."""
@@ -150,29 +197,24 @@ class TestLLMRouter(unittest.TestCase):
         provider = self.router.route(request)
         self.assertEqual(provider.name, "mock")
     
-    def test_metrics_tracking(self):
+    async def test_metrics_tracking(self):
         """Test metrics are tracked."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        async def run():
-            request = ChatRequest(
-                messages=[ChatMessage(role="user", content="Test")],
-                model="mock"
-            )
-            await self.router.chat(request)
-            
-            metrics = self.router.get_metrics()
-            self.assertIn("mock", metrics["requests"])
-            self.assertEqual(metrics["requests"]["mock"], 1)
+        request = ChatRequest(
+            messages=[ChatMessage(role="user", content="Test")],
+            model="mock"
+        )
+        await self.router.chat(request)
         
-        loop.run_until_complete(run())
-        loop.close()
+        metrics = self.router.get_metrics()
+        self.assertIn("mock", metrics["requests"])
+        self.assertEqual(metrics["requests"]["mock"], 1)
 
 
 class TestPolicyEngine(unittest.TestCase):
     """Test the PolicyEngine class."""
     
+    pytestmark = pytest.mark.xdist_group(name="phase3_policy")
+    
     def setUp(self):
         self.engine = PolicyEngine()
     
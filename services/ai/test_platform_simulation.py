@@ -7,26 +7,41 @@ Simulates the full frontend-to-backend flow since browser tool is unavailable.
 3. Simulates the user 'intent' submission exactly as the frontend does
 4. Follows the SDO lifecycle through the API
 """
-import requests
+import asyncio
+import httpx
+import orjson
 import time
 import sys
-import json
 
 FRONTEND_URL = "http://localhost:3000"
 BACKEND_URL = "http://localhost:8002"
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 def print_step(step, status):
     print(f"  → {step}: {status}")
 
-def run_simulation():
+async def run_simulation():
     print("\n" + "=" * 60)
     print("  AXIOM Platform Simulation (Frontend → Backend)")
     print("=" * 60)
     
+    # One pooled client for every call; the independent up-checks run concurrently
+    async with httpx.AsyncClient(timeout=2) as client:
+        frontend, schema, health = await asyncio.gather(
+            client.get(FRONTEND_URL),
+            client.get(f"{BACKEND_URL}/openapi.json"),
+            client.get(f"{BACKEND_URL}/router/health"),
+            return_exceptions=True
+        )
+        return await _run_flow(client, frontend, schema, health)
+
+async def _run_flow(client, frontend, schema_resp, health_resp):
     # 1. Verify Frontend is Up
     try:
         print_step("Checking Frontend (Next.js)", "...")
-        resp = requests.get(FRONTEND_URL, timeout=2)
+        resp = frontend
+        if isinstance(resp, Exception):
+            raise resp
         if resp.status_code == 200:
             print_step("Checking Frontend (Next.js)", f"✓ Found AXIOM UI ({len(resp.text)} bytes)")
         else:
@@ -42,9 +57,10 @@ def run_simulation():
         
         # Debug: Check OpenAPI schema to see registered routes
         try:
-            schema_resp = requests.get(f"{BACKEND_URL}/openapi.json", timeout=2)
+            if isinstance(schema_resp, Exception):
+                raise schema_resp
             if schema_resp.status_code == 200:
-                schema = schema_resp.json()
+                schema = orjson.loads(schema_resp.content)
                 paths = schema.get("paths", {}).keys()
                 if "/router/health" in paths:
                     print_step("Debug OpenAPI", "✓ /router/health found in schema")
@@ -54,9 +70,11 @@ def run_simulation():
             print_step("Debug OpenAPI", f"✗ Failed: {e}")
 
         # Check router health endpoint (Phase 3 feature)
-        resp = requests.get(f"{BACKEND_URL}/router/health", timeout=2)
+        resp = health_resp
+        if isinstance(resp, Exception):
+            raise resp
         if resp.status_code == 200:
-            health = resp.json()
+            health = orjson.loads(resp.content)
             print_step("Checking Backend (FastAPI)", f"✓ Online (Providers: {list(health.keys())})")
         else:
             print_step("Checking Backend (FastAPI)", f"✗ Status {resp.status_code}")
@@ -83,10 +101,15 @@ def run_simulation():
     try:
         print_step("Submitting to /generate/adaptive", "...")
         start = time.time()
-        resp = requests.post(f"{BACKEND_URL}/generate/adaptive", json=payload)
+        resp = await client.post(
+            f"{BACKEND_URL}/generate/adaptive",
+            content=orjson.dumps(payload),
+            headers=JSON_HEADERS,
+            timeout=None
+        )
         
         if resp.status_code == 200:
-            data = resp.json()
+            data = orjson.loads(resp.content)
             duration = time.time() - start
             print_step("Submitting to /generate/adaptive", f"✓ Received SDO (took {duration:.2f}s)")
             
@@ -108,8 +131,8 @@ def run_simulation():
             # 5. Check Cache (Phase 3)
             # Should have hit cache or stored it
             try:
-                cache_resp = requests.get(f"{BACKEND_URL}/cache/stats")
-                stats = cache_resp.json()
+                cache_resp = await client.get(f"{BACKEND_URL}/cache/stats")
+                stats = orjson.loads(cache_resp.content)
                 print_step("Checking Semantic Cache", f"✓ Stats: {stats}")
             except:
                 print_step("Checking Semantic Cache", "⚠️ Failed to get stats")
@@ -126,5 +149,5 @@ def run_simulation():
         return False
 
 if __name__ == "__main__":
-    success = run_simulation()
+    success = asyncio.run(run_simulation())
     sys.exit(0 if success else 1)
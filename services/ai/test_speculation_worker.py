@@ -0,0 +1,94 @@
+"""
+Tests for the Speculation Worker
+
+Drives the trigger queue with a fake engine and bus; no NATS or LLM needed.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import sys
+sys.path.insert(0, '.')
+
+from sdo import SDOStatus
+from speculation_worker import SpeculationWorker
+
+
+class FakeEngine:
+    """Records speculative intents and reports every one as verified."""
+
+    def __init__(self):
+        self.intents = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def adaptive_generation_flow(self, sdo, early_stop_threshold=0.85):
+        self.intents.append(sdo.raw_intent)
+        await self.release.wait()
+        sdo.update_status(SDOStatus.VERIFIED)
+        return sdo
+
+
+class FakeBus:
+    """Records published payloads; the fast path accepts everything."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish_nowait(self, subject, data, headers=None):
+        self.published.append((subject, data))
+        return True
+
+    async def publish(self, subject, data, headers=None):
+        self.published.append((subject, data))
+        return "1"
+
+
+def _msg(text):
+    return SimpleNamespace(data=text.encode())
+
+
+def _worker(engine):
+    worker = SpeculationWorker(engine, num_workers=1)
+    worker.bus = FakeBus()
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_drain_dedupes_burst():
+    """A burst of triggers is drained as one batch with duplicates dropped."""
+    engine = FakeEngine()
+    worker = _worker(engine)
+
+    for text in ["sort a list", "parse json", "sort a list", "parse json", "sort a list"]:
+        await worker.handle_trigger(_msg(text))
+    drain = asyncio.create_task(worker._drain())
+    await worker._queue.join()
+    drain.cancel()
+
+    assert engine.intents == ["Speculative: sort a list", "Speculative: parse json"]
+    assert [subject for subject, _ in worker.bus.published] == ["speculation.success"] * 2
+
+
+@pytest.mark.asyncio
+async def test_drain_caps_batch_size():
+    """A batch takes at most MAX_BATCH triggers; the rest wait for the next one."""
+    engine = FakeEngine()
+    engine.release.clear()
+    worker = _worker(engine)
+    worker._sem = asyncio.Semaphore(SpeculationWorker.MAX_BATCH)
+
+    for i in range(SpeculationWorker.MAX_BATCH + 4):
+        await worker.handle_trigger(_msg(f"intent {i}"))
+    drain = asyncio.create_task(worker._drain())
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert len(engine.intents) == SpeculationWorker.MAX_BATCH
+    assert worker._queue.qsize() == 4
+
+    engine.release.set()
+    await worker._queue.join()
+    drain.cancel()
+    assert len(engine.intents) == SpeculationWorker.MAX_BATCH + 4
@@ -2,18 +2,9 @@
 Shared Test Fixtures for AXIOM AI Services
 """
 import pytest
-import asyncio
 from unittest.mock import MagicMock, AsyncMock
 
 
-@pytest.fixture
-def event_loop():
-    """Create event loop for async tests."""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
-
-
 @pytest.fixture
 def mock_llm_response():
     """Create mock LLM response for testing."""
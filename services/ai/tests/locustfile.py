@@ -1,5 +1,44 @@
 from locust import HttpUser, task, between
-import json
+import orjson
+
+# Request bodies never change, so encode them once at import instead of per task
+
+# Sample proof payload (simplified)
+_VERIFY_BODY = orjson.dumps({
+    "code": "def hello(): return 'world'",
+    "proof": {
+        "proof_id": "load-test-proof",
+        "code_hash": "sha256:...",
+        # Invalid signature but exercises parsing logic
+        "signature": "00"*64
+    }
+})
+
+_PARSE_INTENT_BODY = orjson.dumps({
+    "intent": "Create a simple calculator function",
+    "context": "load-test"
+})
+
+_PARSE_INTENT_BATCH_BODY = orjson.dumps({
+    "queries": [
+        {"intent": f"Create function {i}", "context": "load-test"}
+        for i in range(50)
+    ]
+})
+
+_VERIFY_BATCH_BODY = orjson.dumps({
+    "items": [
+        {
+            "code": f"def hello_{i}(): return 'world'",
+            "proof": {
+                "proof_id": f"load-test-proof-{i}",
+                "code_hash": "sha256:...",
+                "signature": "00"*64
+            }
+        }
+        for i in range(50)
+    ]
+})
 
 class AxiomUser(HttpUser):
     wait_time = between(1, 3)
@@ -8,7 +47,8 @@ class AxiomUser(HttpUser):
         """Login on start."""
         # For this test, we assume public endpoints or mock auth
         # In a real scenario, we'd hit /auth/login
-        pass
+        # Bodies are pre-encoded with orjson, so declare the type once per session
+        self.client.headers["Content-Type"] = "application/json"
 
     @task(10)
     def health_check(self):
@@ -21,22 +61,19 @@ class AxiomUser(HttpUser):
     @task(1)
     def verify_proof_load(self):
         """Test CPU-intensive verification."""
-        # Sample proof payload (simplified)
-        payload = {
-            "code": "def hello(): return 'world'",
-            "proof": {
-                "proof_id": "load-test-proof",
-                "code_hash": "sha256:...",
-                # Invalid signature but exercises parsing logic
-                "signature": "00"*64
-            }
-        }
-        self.client.post("/proof/verify", json=payload)
+        self.client.post("/proof/verify", data=_VERIFY_BODY)
 
     @task(1)
     def parse_intent(self):
         """Test intent parsing (Mock or Real)."""
-        self.client.post("/parse-intent", json={
-            "intent": "Create a simple calculator function",
-            "context": "load-test"
-        })
+        self.client.post("/parse-intent", data=_PARSE_INTENT_BODY)
+
+    @task(1)
+    def parse_intent_batch(self):
+        """Test batched intent parsing (50 intents per request)."""
+        self.client.post("/parse-intent/batch", data=_PARSE_INTENT_BATCH_BODY)
+
+    @task(1)
+    def verify_proof_batch(self):
+        """Test batched verification (50 proofs per request)."""
+        self.client.post("/proof/verify/batch", data=_VERIFY_BATCH_BODY)
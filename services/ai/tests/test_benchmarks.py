@@ -8,31 +8,40 @@ Focused on validating performance targets:
 """
 import pytest
 import asyncio
+import functools
 import time
-import statistics
-from typing import List
+
+import numpy as np
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warmup():
+    """Import and exercise projection and catalog paths once so no benchmark times cold starts."""
+    from events import IVCUState
+    from models.catalog import get_model
+    from models.cost_oracle import CostOracle
+
+    # Same builder and projection path the projection benchmarks time, so
+    # every event handler has run once
+    IVCUState(id="warm").apply_events(list(_build_events(10, "warm")))
+    get_model("deepseek-v3")
+    CostOracle().estimate_cost("deepseek-v3", "warm up")
 
 
 # ============================================================================
 # TIER 0 BENCHMARKS
 # ============================================================================
 
-class TestTier0Benchmarks:
-    """Benchmark Tier 0 (Tree-sitter) performance."""
-    
-    ITERATIONS = 10  # Run each test multiple times for accuracy
-    TARGET_MS = 10.0  # Target performance
-    
-    @pytest.fixture
-    def code_samples(self):
-        """Generate code samples of varying sizes."""
-        return {
-            "tiny": "x = 1",
-            "small": """
+@pytest.fixture(scope="module")
+def code_samples():
+    """Generate code samples of varying sizes (built once per module)."""
+    return {
+        "tiny": "x = 1",
+        "small": """
 def hello(name: str) -> str:
     return f"Hello, {name}!"
 """,
-            "medium": """
+        "medium": """
 class Calculator:
     def __init__(self):
         self.result = 0
@@ -58,8 +67,8 @@ class Calculator:
     def reset(self):
         self.result = 0
 """,
-            "large": "\n".join([
-                f"""
+        "large": "\n".join([
+            f"""
 def function_{i}(x: int, y: int) -> int:
     '''Docstring for function {i}'''
     result = x + y + {i}
@@ -68,162 +77,195 @@ def function_{i}(x: int, y: int) -> int:
     else:
         return result
 """ for i in range(50)
-            ]),
-        }
+        ]),
+    }
+
+
+class TestTier0Benchmarks:
+    """Benchmark Tier 0 (Tree-sitter) performance."""
+    
+    ITERATIONS = 10  # Run each test multiple times for accuracy
+    TARGET_MS = 10.0  # Target performance
+    
+    @pytest.fixture(scope="class")
+    def servicer(self):
+        """One long-lived servicer, as in production, shared by every benchmark."""
+        from grpc_server.verification_service import VerificationServicer
+        return VerificationServicer()
     
-    @pytest.mark.asyncio
-    async def test_tier0_tiny_code(self, code_samples):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_tier0_tiny_code(self, servicer, code_samples):
         """Benchmark Tier 0 with tiny code."""
-        times = await self._benchmark_tier0(code_samples["tiny"])
+        times = await self._benchmark_tier0(servicer, code_samples["tiny"])
         self._report("tiny", times)
-        assert statistics.mean(times) < self.TARGET_MS * 2
+        assert times.mean() < self.TARGET_MS * 2
     
-    @pytest.mark.asyncio
-    async def test_tier0_small_code(self, code_samples):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_tier0_small_code(self, servicer, code_samples):
         """Benchmark Tier 0 with small code."""
-        times = await self._benchmark_tier0(code_samples["small"])
+        times = await self._benchmark_tier0(servicer, code_samples["small"])
         self._report("small", times)
-        assert statistics.mean(times) < self.TARGET_MS * 2
+        assert times.mean() < self.TARGET_MS * 2
     
-    @pytest.mark.asyncio
-    async def test_tier0_medium_code(self, code_samples):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_tier0_medium_code(self, servicer, code_samples):
         """Benchmark Tier 0 with medium code."""
-        times = await self._benchmark_tier0(code_samples["medium"])
+        times = await self._benchmark_tier0(servicer, code_samples["medium"])
         self._report("medium", times)
-        assert statistics.mean(times) < self.TARGET_MS * 3
+        assert times.mean() < self.TARGET_MS * 3
     
-    @pytest.mark.asyncio
-    async def test_tier0_large_code(self, code_samples):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_tier0_large_code(self, servicer, code_samples):
         """Benchmark Tier 0 with large code (50 functions)."""
-        times = await self._benchmark_tier0(code_samples["large"])
+        times = await self._benchmark_tier0(servicer, code_samples["large"])
         self._report("large", times)
-        assert statistics.mean(times) < self.TARGET_MS * 5  # Allow more slack for large files
+        assert times.mean() < self.TARGET_MS * 5  # Allow more slack for large files
     
-    async def _benchmark_tier0(self, code: str) -> List[float]:
-        """Run Tier 0 verification multiple times and collect timings."""
-        from grpc_server.verification_service import VerificationServicer
-        from unittest.mock import MagicMock
-        
-        servicer = VerificationServicer()
-        times = []
+    async def _benchmark_tier0(self, servicer, code: str) -> np.ndarray:
+        """Run Tier 0 verification multiple times and collect timings (ms)."""
+        # Integer nanoseconds in a preallocated array keep the timed loop lean
+        times_ns = np.empty(self.ITERATIONS, dtype=np.int64)
         
-        # Warm up
-        await servicer.QuickVerify({"code": code, "language": "python"}, MagicMock())
+        # Warm up. Time the uncached verification: QuickVerify would serve
+        # every iteration after this from its result cache
+        await servicer._quick_verify(code, "python")
         
-        for _ in range(self.ITERATIONS):
-            start = time.perf_counter()
-            await servicer.QuickVerify({"code": code, "language": "python"}, MagicMock())
-            elapsed = (time.perf_counter() - start) * 1000
-            times.append(elapsed)
+        for i in range(self.ITERATIONS):
+            start = time.perf_counter_ns()
+            await servicer._quick_verify(code, "python")
+            times_ns[i] = time.perf_counter_ns() - start
         
-        return times
+        return times_ns / 1e6
     
-    def _report(self, name: str, times: List[float]):
+    def _report(self, name: str, times: np.ndarray):
         """Print benchmark report."""
         print(f"\n[Tier 0 Benchmark: {name}]")
-        print(f"  Min:    {min(times):.3f}ms")
-        print(f"  Max:    {max(times):.3f}ms")
-        print(f"  Mean:   {statistics.mean(times):.3f}ms")
-        print(f"  Median: {statistics.median(times):.3f}ms")
+        print(f"  Min:    {times.min():.3f}ms")
+        print(f"  Max:    {times.max():.3f}ms")
+        print(f"  Mean:   {times.mean():.3f}ms")
+        print(f"  Median: {np.median(times):.3f}ms")
+        print(f"  P99:    {np.percentile(times, 99):.3f}ms")
         if len(times) > 1:
-            print(f"  StdDev: {statistics.stdev(times):.3f}ms")
+            print(f"  StdDev: {times.std(ddof=1):.3f}ms")
 
 
 # ============================================================================
 # STATE PROJECTION BENCHMARKS
 # ============================================================================
 
+@functools.lru_cache(maxsize=None)
+def _build_events(event_count: int, ivcu_id: str) -> tuple:
+    """Build the projection event stream for a size once and reuse it across tests."""
+    from events import EventType, IVCUEvent
+    from events.model import now_us
+    
+    timestamp = now_us()
+    
+    def event(sequence_number, event_type, data):
+        return IVCUEvent(f"{ivcu_id}-{sequence_number}", ivcu_id, sequence_number, event_type, data, timestamp)
+    
+    # Create events
+    events = [
+        event(1, EventType.INTENT_CREATED, {
+            "raw_intent": "Initial intent"
+        })
+    ]
+    
+    for i in range(event_count - 1):
+        sequence_number = i + 2
+        if i % 5 == 0:
+            events.append(event(sequence_number, EventType.INTENT_REFINED, {
+                "new_intent": f"Refinement {i}"
+            }))
+        elif i % 5 == 1:
+            events.append(event(sequence_number, EventType.CONTRACT_ADDED, {
+                "contract": {
+                    "contract_type": "precondition",
+                    "expression": f"x > {i}"
+                }
+            }))
+        elif i % 5 == 2:
+            events.append(event(sequence_number, EventType.CANDIDATE_GENERATED, {
+                "candidate_id": f"cand-{i}",
+                "code": f"def func_{i}(): pass",
+                "model_id": "deepseek-v3"
+            }))
+        elif i % 5 == 3:
+            events.append(event(sequence_number, EventType.VERIFICATION_COMPLETED, {
+                "candidate_id": f"cand-{i-1}",
+                "passed": True,
+                "score": 0.9,
+                "results": {"tier": "tier_1"}
+            }))
+        else:
+            events.append(event(sequence_number, EventType.COST_INCURRED, {
+                "amount": 0.001
+            }))
+    
+    return tuple(events)
+
+
 class TestProjectionBenchmarks:
     """Benchmark event sourcing state projection."""
     
+    # Sizes share no state, so each gets its own xdist group; with five or
+    # more workers each size runs on its own worker, beside the file's group
+    @pytest.mark.xdist_group(name="projection_10")
     def test_projection_10_events(self):
         """Benchmark projection with 10 events."""
         times = self._benchmark_projection(10)
         self._report(10, times)
-        assert statistics.mean(times) < 5.0  # <5ms for 10 events
+        assert times.mean() < 5.0  # <5ms for 10 events
     
+    @pytest.mark.xdist_group(name="projection_50")
     def test_projection_50_events(self):
         """Benchmark projection with 50 events."""
         times = self._benchmark_projection(50)
         self._report(50, times)
-        assert statistics.mean(times) < 25.0  # <25ms for 50 events
+        assert times.mean() < 25.0  # <25ms for 50 events
     
+    @pytest.mark.xdist_group(name="projection_100")
     def test_projection_100_events(self):
         """Benchmark projection with 100 events."""
         times = self._benchmark_projection(100)
         self._report(100, times)
-        assert statistics.mean(times) < 50.0  # <50ms for 100 events
+        assert times.mean() < 50.0  # <50ms for 100 events
     
+    @pytest.mark.xdist_group(name="projection_500")
     def test_projection_500_events(self):
         """Benchmark projection with 500 events (stress test)."""
         times = self._benchmark_projection(500)
         self._report(500, times)
-        assert statistics.mean(times) < 250.0  # <250ms for 500 events
+        assert times.mean() < 250.0  # <250ms for 500 events
     
-    def _benchmark_projection(self, event_count: int, iterations: int = 5) -> List[float]:
+    def _benchmark_projection(self, event_count: int, iterations: int = 5) -> np.ndarray:
         """Run projection benchmark."""
-        from ivcu_events import IVCUEventType, IVCUStateProjector, create_event
+        from events import IVCUState
         
-        projector = IVCUStateProjector()
         ivcu_id = f"bench-{event_count}"
+        events = list(_build_events(event_count, ivcu_id))
         
-        # Create events
-        events = [
-            create_event(ivcu_id, IVCUEventType.INTENT_CREATED, {
-                "raw_intent": "Initial intent"
-            })
-        ]
-        
-        for i in range(event_count - 1):
-            if i % 5 == 0:
-                events.append(create_event(ivcu_id, IVCUEventType.INTENT_REFINED, {
-                    "refined_intent": f"Refinement {i}"
-                }))
-            elif i % 5 == 1:
-                events.append(create_event(ivcu_id, IVCUEventType.CONTRACT_ADDED, {
-                    "contract_type": "precondition",
-                    "expression": f"x > {i}"
-                }))
-            elif i % 5 == 2:
-                events.append(create_event(ivcu_id, IVCUEventType.CANDIDATE_GENERATED, {
-                    "candidate_id": f"cand-{i}",
-                    "code": f"def func_{i}(): pass",
-                    "tokens_used": 50,
-                    "cost": 0.001
-                }))
-            elif i % 5 == 3:
-                events.append(create_event(ivcu_id, IVCUEventType.VERIFICATION_COMPLETED, {
-                    "candidate_id": f"cand-{i-1}",
-                    "tier": "tier_1",
-                    "passed": True,
-                    "confidence": 0.9
-                }))
-            else:
-                events.append(create_event(ivcu_id, IVCUEventType.MODEL_UPGRADED, {
-                    "from_model_id": "model-a",
-                    "to_model_id": "model-b",
-                    "reason": "retry"
-                }))
-        
-        times = []
+        times_ns = np.empty(iterations, dtype=np.int64)
         
         # Warm up
-        projector.project(events)
+        state = IVCUState(id=ivcu_id).apply_events(events)
+        assert state.version == event_count
         
-        for _ in range(iterations):
-            start = time.perf_counter()
-            state = projector.project(events)
-            elapsed = (time.perf_counter() - start) * 1000
-            times.append(elapsed)
+        for i in range(iterations):
+            start = time.perf_counter_ns()
+            state = IVCUState(id=ivcu_id).apply_events(events)
+            times_ns[i] = time.perf_counter_ns() - start
         
-        return times
+        # np.empty leaves garbage in any slot the loop missed
+        assert (times_ns > 0).all()
+        return times_ns / 1e6
     
-    def _report(self, event_count: int, times: List[float]):
+    def _report(self, event_count: int, times: np.ndarray):
         """Print benchmark report."""
         print(f"\n[Projection Benchmark: {event_count} events]")
-        print(f"  Min:    {min(times):.3f}ms")
-        print(f"  Mean:   {statistics.mean(times):.3f}ms")
-        print(f"  Max:    {max(times):.3f}ms")
+        print(f"  Min:    {times.min():.3f}ms")
+        print(f"  Mean:   {times.mean():.3f}ms")
+        print(f"  Max:    {times.max():.3f}ms")
 
 
 # ============================================================================
@@ -238,14 +280,14 @@ class TestModelRoutingBenchmarks:
         from models.catalog import get_model
         
         iterations = 1000
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
         
         for _ in range(iterations):
             get_model("deepseek-v3")
             get_model("claude-sonnet-4")
             get_model("gpt-4o-mini")
         
-        elapsed = (time.perf_counter() - start) * 1000
+        elapsed = (time.perf_counter_ns() - start) / 1e6
         per_lookup = elapsed / (iterations * 3)
         
         print(f"\n[Model Lookup Benchmark]")
@@ -259,13 +301,13 @@ class TestModelRoutingBenchmarks:
         from models.catalog import get_models_by_tier, ModelTier
         
         iterations = 1000
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
         
         for _ in range(iterations):
             get_models_by_tier(ModelTier.BALANCED)
             get_models_by_tier(ModelTier.HIGH_ACCURACY)
         
-        elapsed = (time.perf_counter() - start) * 1000
+        elapsed = (time.perf_counter_ns() - start) / 1e6
         per_filter = elapsed / (iterations * 2)
         
         print(f"\n[Tier Filtering Benchmark]")
@@ -281,7 +323,7 @@ class TestModelRoutingBenchmarks:
         oracle = CostOracle()
         iterations = 100
         
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
         
         for _ in range(iterations):
             oracle.estimate_cost(
@@ -290,7 +332,7 @@ class TestModelRoutingBenchmarks:
                 complexity="medium"
             )
         
-        elapsed = (time.perf_counter() - start) * 1000
+        elapsed = (time.perf_counter_ns() - start) / 1e6
         per_estimate = elapsed / iterations
         
         print(f"\n[Cost Estimation Benchmark]")
@@ -298,6 +340,27 @@ class TestModelRoutingBenchmarks:
         print(f"  Per estimate: {per_estimate:.4f}ms")
         
         assert per_estimate < 1.0  # <1ms per estimate
+    
+    def test_cost_estimation_batch_performance(self):
+        """Benchmark batched cost estimation."""
+        from models.cost_oracle import CostOracle
+        
+        oracle = CostOracle()
+        iterations = 100
+        model_ids = ["deepseek-v3", "claude-sonnet", "gpt-4o-mini"] * (iterations // 3 + 1)
+        model_ids = model_ids[:iterations]
+        intent_texts = ["Create a function"] * iterations
+        
+        start = time.perf_counter_ns()
+        oracle.estimate_cost_batch(model_ids, intent_texts)
+        elapsed = (time.perf_counter_ns() - start) / 1e6
+        per_estimate = elapsed / iterations
+        
+        print(f"\n[Batch Cost Estimation Benchmark]")
+        print(f"  Total:       {elapsed:.3f}ms for {iterations} estimates")
+        print(f"  Per estimate: {per_estimate:.4f}ms")
+        
+        assert per_estimate < 1.0  # <1ms per estimate
 
 
 # ============================================================================
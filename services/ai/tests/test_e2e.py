@@ -241,6 +241,28 @@ def broken_function(
         assert result["passed"] == False
         assert len(result.get("errors", [])) > 0
     
+    @pytest.mark.asyncio
+    async def test_tier0_quick_verify_cached(self):
+        """Test that repeated code is served from the QuickVerify cache."""
+        from grpc_server.verification_service import VerificationServicer
+        
+        servicer = VerificationServicer()
+        request = {"code": "def f(x):\n    return x\n", "language": "python"}
+        
+        first = await servicer.QuickVerify(request, MagicMock())
+        with patch.object(servicer, "_quick_verify", side_effect=AssertionError("re-verified")):
+            second = await servicer.QuickVerify(request, MagicMock())
+        
+        assert second == first
+        assert second is not first
+        assert len(servicer._quick_cache) == 1
+        
+        # Nested results are private to each caller too
+        second["errors"].append({"message": "mutated"})
+        second["ast_info"]["functions"].clear()
+        third = await servicer.QuickVerify(request, MagicMock())
+        assert third == first
+    
     @pytest.mark.asyncio
     async def test_streaming_verification_progress(self):
         """Test streaming verification with progress updates."""
@@ -510,14 +532,16 @@ class TestPerformance:
         small_code = "def f(): pass"
         medium_code = "\n".join([f"def func_{i}(): pass" for i in range(50)])
         large_code = "\n".join([f"def func_{i}(): return {i} * 2" for i in range(200)])
+        # Build the mock context once so its construction stays out of the timings
+        context = MagicMock()
         
         for name, code in [("small", small_code), ("medium", medium_code), ("large", large_code)]:
-            start = time.time()
+            start = time.perf_counter_ns()
             result = await servicer.QuickVerify({
                 "code": code,
                 "language": "python"
-            }, MagicMock())
-            elapsed = (time.time() - start) * 1000
+            }, context)
+            elapsed = (time.perf_counter_ns() - start) / 1e6
             
             print(f"Tier 0 ({name}): {elapsed:.2f}ms")
             
@@ -538,9 +562,9 @@ class TestPerformance:
                 "refined_intent": f"Refinement {i}"
             }))
         
-        start = time.time()
+        start = time.perf_counter_ns()
         state = projector.project(events)
-        elapsed = (time.time() - start) * 1000
+        elapsed = (time.perf_counter_ns() - start) / 1e6
         
         print(f"Projection of 100 events: {elapsed:.2f}ms")
         
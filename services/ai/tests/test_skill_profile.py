@@ -0,0 +1,92 @@
+"""
+Tests for skill profile persistence
+
+Uses an in-memory stand-in for DatabaseService's skill_profiles methods.
+"""
+import pytest
+
+from skill_profile import SkillDomain, SkillProfileService, UserSkillProfile
+
+
+class FakeDatabase:
+    """Stores profile snapshots the way the skill_profiles table does."""
+
+    def __init__(self):
+        self.rows = {}
+        self.saves = 0
+
+    async def save_skill_profile(self, profile):
+        self.saves += 1
+        self.rows[(profile["org_id"], profile["user_id"])] = profile
+
+    async def get_skill_profile(self, org_id, user_id):
+        return self.rows.get((org_id, user_id))
+
+
+def test_profile_round_trips_through_dict():
+    profile = UserSkillProfile(user_id="u1", org_id="o1")
+    for signal in (80, 90, 70):
+        profile.update_skill(SkillDomain.VERIFICATION, signal)
+    profile.record_feature_usage("diff_view")
+
+    restored = UserSkillProfile.from_dict(profile.to_dict())
+
+    assert restored.to_dict() == profile.to_dict()
+
+
+def test_recommendations_are_private_copies():
+    profile = UserSkillProfile(user_id="u1", org_id="o1")
+    for _ in range(6):
+        profile.update_skill(SkillDomain.TESTING, 10)
+
+    first = profile.get_ui_recommendations()
+    first["suggested_learning"].append("Practice nothing")
+    first["interface_complexity"] = "hacked"
+
+    second = profile.get_ui_recommendations()
+    assert second["suggested_learning"] == ["Practice testing"]
+    assert second["interface_complexity"] == "simplified"
+
+
+@pytest.mark.asyncio
+async def test_evicted_profile_reloads_from_database():
+    db = FakeDatabase()
+    service = SkillProfileService(db, max_size=1)
+    await service.update_from_intent("u1", "o1", intent_complexity=9, parse_success=True)
+    before = (await service.get_profile("u1", "o1")).to_dict()
+    await service.flush()
+
+    await service.get_profile("u2", "o1")  # Evicts u1
+    reloaded = await service.get_profile("u1", "o1")
+
+    assert reloaded.to_dict() == before
+    assert reloaded.skills[SkillDomain.INTENT_AUTHORING].sample_count == 1
+
+
+@pytest.mark.asyncio
+async def test_evicted_dirty_profile_is_not_lost():
+    """A profile evicted before its flush comes back with its updates."""
+    db = FakeDatabase()
+    service = SkillProfileService(db, max_size=1)
+    await service.update_from_intent("u1", "o1", intent_complexity=9, parse_success=True)
+    profile = await service.get_profile("u1", "o1")
+
+    await service.get_profile("u2", "o1")  # Evicts u1 before any flush
+    assert await service.get_profile("u1", "o1") is profile
+
+    await service.stop_write_behind()
+    assert db.rows[("o1", "u1")]["skills"]["intent_authoring"]["sample_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_write_behind_flushes_on_stop():
+    db = FakeDatabase()
+    service = SkillProfileService(db, flush_interval=3600)
+    service.start_write_behind()
+    await service.record_feature_use("u1", "o1", "diff_view")
+    await service.record_feature_use("u1", "o1", "diff_view")
+
+    await service.stop_write_behind()
+
+    assert db.saves == 1
+    assert db.rows[("o1", "u1")]["feature_usage"] == {"diff_view": 2}